@@ -0,0 +1,68 @@
+# bench_can.py
+
+from can_bus.can_manager import CANManager
+from can_bus.messages import default_registry
+from benchmarks.harness import benchmark
+
+
+@benchmark("can.send_message.virtual")
+def _():
+    sender = CANManager(channel="bench_send", interface="virtual")
+    payload = bytes(range(8))
+    yield lambda: sender.send_message(0x123, payload)
+    sender.shutdown()
+
+
+@benchmark("can.send_receive.virtual")
+def _():
+    sender = CANManager(channel="bench_roundtrip", interface="virtual")
+    receiver = CANManager(channel="bench_roundtrip", interface="virtual")
+    payload = bytes(range(8))
+
+    def roundtrip():
+        sender.send_message(0x123, payload)
+        return receiver.receive_message(timeout=1.0)
+
+    yield roundtrip
+    sender.shutdown()
+    receiver.shutdown()
+
+
+@benchmark("can.codec.encode")
+def _():
+    registry = default_registry()
+    yield lambda: registry.encode("imu", accel_x=0.5, accel_y=-0.1, yaw_rate=3.0)
+
+
+@benchmark("can.codec.decode")
+def _():
+    registry = default_registry()
+    message = registry.encode("imu", accel_x=0.5, accel_y=-0.1, yaw_rate=3.0)
+    yield lambda: registry.decode(message)
+
+
+@benchmark("can.trace_replay_decode.1000")
+def _():
+    import numpy as np
+    from can_bus.trace import TraceReplayer
+    from telemetry.records import CAN_FRAME_DTYPE, can_record
+
+    # A recorded burst of sensor traffic, pushed through a virtual bus and decoded.
+    registry = default_registry()
+    trace = np.array([can_record(registry.encode("imu", accel_x=k / 1000, accel_y=0.0, yaw_rate=1.0))
+                      for k in range(1000)], dtype=CAN_FRAME_DTYPE)
+    receiver = CANManager(channel="bench_replay", interface="virtual")
+    replayer = TraceReplayer(trace, channel="bench_replay", speed=None)
+
+    def replay_and_decode():
+        replayer.replay()
+        decoded = 0
+        message = receiver.bus.recv(timeout=0)
+        while message is not None:
+            decoded += receiver.decode(message) is not None
+            message = receiver.bus.recv(timeout=0)
+        return decoded
+
+    yield replay_and_decode
+    replayer.stop()
+    receiver.shutdown()
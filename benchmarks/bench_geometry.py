@@ -0,0 +1,146 @@
+# bench_geometry.py
+
+import math
+import random
+import threading
+import numpy as np
+
+from gps_coordinate import BuoyPosition, GPSPoint, ObjectiveCoordinate, PathPlanner, ShipPosition
+from gps_coordinate.geofence import CircularGeofence, PolygonalGeofence
+from gps_coordinate.estimator import PositionEstimator
+from gps_coordinate.projection import LocalProjection
+from benchmarks.harness import benchmark
+
+# Tihanyi rév / Szántódi rév
+TIHANY = (46.88868997786068, 17.89171566948177)
+SZANTOD = (46.87993481783788, 17.89972984313507)
+
+
+def _ring(center: tuple[float, float], radius_deg: float, n: int) -> list[GPSPoint]:
+    lat0, lon0 = center
+    return [
+        GPSPoint(lat0 + radius_deg * math.cos(2 * math.pi * k / n), lon0 + radius_deg * math.sin(2 * math.pi * k / n))
+        for k in range(n)
+    ]
+
+
+@benchmark("gps.haversine_distance")
+def _():
+    a, b = GPSPoint(*TIHANY), GPSPoint(*SZANTOD)
+    yield lambda: a.haversine_distance(b)
+
+
+@benchmark("geofence.circular.contains")
+def _():
+    fence = CircularGeofence(GPSPoint(*TIHANY), 5000)
+    point = GPSPoint(*SZANTOD)
+    yield lambda: fence.contains(point)
+
+
+@benchmark("geofence.polygonal.contains.4")
+def _():
+    fence = PolygonalGeofence(_ring(TIHANY, 0.05, 4))
+    point = GPSPoint(*SZANTOD)
+    yield lambda: fence.contains(point)
+
+
+@benchmark("geofence.polygonal.contains.5000")
+def _():
+    fence = PolygonalGeofence(_ring(TIHANY, 0.05, 5000))
+    point = GPSPoint(*SZANTOD)
+    yield lambda: fence.contains(point)
+
+
+@benchmark("geofence.polygonal.time_to_boundary.5000")
+def _():
+    fence = PolygonalGeofence(_ring(TIHANY, 0.05, 5000))
+    point = GPSPoint(*TIHANY)
+    yield lambda: fence.time_to_boundary(point, 30.0, 5.0, horizon_s=60.0)
+
+
+@benchmark("geofence.polygonal.times_to_boundary.64_headings")
+def _():
+    # Scoring candidate headings in one control tick, on a race course sized fence.
+    fence = PolygonalGeofence(_ring(TIHANY, 0.05, 40))
+    point = GPSPoint(*TIHANY)
+    headings = np.linspace(0.0, 360.0, 64, endpoint=False)
+    yield lambda: fence.times_to_boundary(point, headings, 5.0, horizon_s=60.0)
+
+
+@benchmark("buoy.is_within_radius")
+def _():
+    buoy = BuoyPosition(*TIHANY, 2000)
+    point = GPSPoint(*SZANTOD)
+    yield lambda: buoy.is_within_radius(point)
+
+
+@benchmark("ship_position.update_position.contended")
+def _():
+    ship = ShipPosition()
+    old_geofence = ship.geofence
+    ship.geofence = CircularGeofence(GPSPoint(*TIHANY), 5000)
+    target = ObjectiveCoordinate(*SZANTOD)
+
+    # Readers hammering the position, as control / telemetry / geofence threads would.
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            ship.get_coordinates()
+
+    readers = [threading.Thread(target=reader, daemon=True) for _ in range(4)]
+    for t in readers:
+        t.start()
+
+    yield lambda: ship.update_position(target)
+
+    stop.set()
+    for t in readers:
+        t.join()
+    ship.geofence = old_geofence
+
+
+def _course(buoys: int) -> tuple[PathPlanner, LocalProjection]:
+    # 2 x 2 km fence with an island, buoys scattered over it.
+    projection = LocalProjection(*TIHANY)
+    ring = [GPSPoint(*projection.inverse(x, y)) for x, y in [(-1000, -1000), (1000, -1000), (1000, 1000), (-1000, 1000)]]
+    island = [GPSPoint(*projection.inverse(x, y)) for x, y in [(-300, -300), (300, -300), (300, -100), (-300, -100)]]
+    rng = random.Random(1)
+    obstacles = [BuoyPosition(*projection.inverse(rng.uniform(-900, 900), rng.uniform(-900, 900)), rng.uniform(5, 20))
+                 for _ in range(buoys)]
+    return PathPlanner(PolygonalGeofence(ring, [island]), obstacles), projection
+
+
+@benchmark("path_planner.plan.60")
+def _():
+    planner, projection = _course(60)
+    start, goal = GPSPoint(*projection.inverse(0, -600)), GPSPoint(*projection.inverse(0, 600))
+    yield lambda: planner.plan(start, goal)
+
+
+@benchmark("path_planner.add_remove_buoy.60")
+def _():
+    planner, projection = _course(60)
+    buoy = BuoyPosition(*projection.inverse(100, 500), 10)
+
+    def replan():
+        planner.add_buoy(buoy)
+        planner.remove_buoy(buoy)
+
+    yield replan
+
+
+@benchmark("estimator.imu_compass_predict")
+def _():
+    # One control tick worth of fusion: IMU + compass frame, then the estimate for control.
+    now = [0.0]
+    estimator = PositionEstimator(clock=lambda: now[0])
+    estimator.update_gps(*TIHANY)
+
+    def tick():
+        now[0] += 0.01
+        estimator.update_imu(0.1, 0.0, 1.0)
+        estimator.update_heading(45.0)
+        estimator.predict()
+
+    yield tick
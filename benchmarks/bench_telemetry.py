@@ -0,0 +1,13 @@
+# bench_telemetry.py
+
+import tempfile
+from benchmarks.harness import benchmark
+from telemetry import TelemetryRecorder
+
+
+@benchmark("telemetry.record_state")
+def _():
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = TelemetryRecorder(directory)
+        yield lambda: recorder.record_state(46.8887, 17.8917, heading=90.0, throttle=0.5, rudder=-2.0, waypoint=3)
+        recorder.close()
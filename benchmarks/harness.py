@@ -0,0 +1,155 @@
+# harness.py
+"""Tiny, dependency-free micro-benchmark harness (so it also runs on the boat's board).
+
+Register a benchmark as a generator that does its setup, yields the callable to time,
+then tears down:
+
+    @benchmark("geofence.circular.contains")
+    def _():
+        fence = CircularGeofence(...)
+        yield lambda: fence.contains(point)
+"""
+
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Generator, Optional
+
+BenchmarkFactory = Callable[[], Generator[Callable[[], object], None, None]]
+
+BENCHMARKS: dict[str, BenchmarkFactory] = {}
+
+
+def benchmark(name: str):
+    def register(factory: BenchmarkFactory) -> BenchmarkFactory:
+        if name in BENCHMARKS:
+            raise ValueError(f"Benchmark '{name}' is already registered")
+        BENCHMARKS[name] = factory
+        return factory
+    return register
+
+
+def _time_one(func: Callable[[], object], rounds: int, min_round_time: float) -> dict:
+    timer = timeit.Timer(func)
+
+    # Calls per round, so that one round lasts at least `min_round_time`.
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_round_time or number >= 1_000_000:
+            break
+        number *= 2
+
+    per_call = [t / number for t in timer.repeat(repeat=rounds, number=number)]
+    return {
+        "mean_s": statistics.fmean(per_call),
+        "median_s": statistics.median(per_call),
+        "min_s": min(per_call),
+        "stdev_s": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        "rounds": rounds,
+        "number": number,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(selected: Optional[list[str]] = None, rounds: int = 7, min_round_time: float = 0.05) -> dict:
+    """
+    Run the registered benchmarks (all, or those whose name starts with one of `selected`).
+
+    Returns:
+        dict: `{"meta": {...}, "results": {name: stats}}`, times are seconds per call.
+    """
+    results = {}
+    for name, factory in BENCHMARKS.items():
+        if selected and not any(name.startswith(prefix) for prefix in selected):
+            continue
+
+        # Code under test may still print; keep paying for it, but not on the terminal.
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            fixture = factory()
+            func = next(fixture)
+            try:
+                results[name] = _time_one(func, rounds, min_round_time)
+            finally:
+                # Resume the generator past its 'yield' to run the teardown.
+                next(fixture, None)
+
+    return {
+        "meta": {
+            "revision": _git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10) -> list[dict]:
+    """
+    Compare median times of benchmarks present in both runs.
+
+    Returns:
+        list[dict]: One row per benchmark with `ratio` (current / baseline) and
+            `regressed` set when the slowdown is above `threshold` (0.10 == 10 %).
+    """
+    rows = []
+    for name, stats in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+
+        ratio = stats["median_s"] / old["median_s"] if old["median_s"] else float("inf")
+        rows.append({
+            "name": name,
+            "baseline_s": old["median_s"],
+            "current_s": stats["median_s"],
+            "ratio": ratio,
+            "regressed": ratio > 1.0 + threshold,
+        })
+    return rows
+
+
+def save(results: dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def format_results(results: dict) -> str:
+    lines = [f"{'benchmark':<45} {'median':>12} {'min':>12} {'stdev':>10}"]
+    for name, stats in results["results"].items():
+        lines.append(
+            f"{name:<45} {stats['median_s'] * 1e6:>10.2f}us {stats['min_s'] * 1e6:>10.2f}us "
+            f"{stats['stdev_s'] * 1e6:>8.2f}us"
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(rows: list[dict]) -> str:
+    lines = [f"{'benchmark':<45} {'baseline':>12} {'current':>12} {'ratio':>7}"]
+    for row in rows:
+        flag = "  << REGRESSION" if row["regressed"] else ""
+        lines.append(
+            f"{row['name']:<45} {row['baseline_s'] * 1e6:>10.2f}us {row['current_s'] * 1e6:>10.2f}us "
+            f"{row['ratio']:>6.2f}x{flag}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,50 @@
+# run.py
+"""Run the benchmark suite and optionally compare against an earlier run.
+
+    python -m benchmarks.run --output bench/HEAD.json
+    python -m benchmarks.run --compare bench/main.json --threshold 0.15
+
+Exits with status 1 if any benchmark got slower than the threshold allows.
+"""
+
+import argparse
+import sys
+from loguru import logger
+
+from benchmarks import harness
+# Importing the modules registers their benchmarks.
+from benchmarks import bench_can, bench_geometry, bench_telemetry  # noqa: F401
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="SolarBoat hot-path benchmarks")
+    parser.add_argument("select", nargs="*", help="Only run benchmarks whose name starts with one of these")
+    parser.add_argument("--output", "-o", help="Write results as JSON to this file")
+    parser.add_argument("--compare", "-c", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown, 0.10 == 10%% (default)")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-round-time", type=float, default=0.05, help="Seconds per round (default 0.05)")
+    args = parser.parse_args(argv)
+
+    # Benchmarks measure the code, not the sinks: only warnings and up reach stderr.
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    results = harness.run_benchmarks(args.select, rounds=args.rounds, min_round_time=args.min_round_time)
+    print(harness.format_results(results))
+
+    if args.output:
+        harness.save(results, args.output)
+
+    if args.compare:
+        rows = harness.compare(harness.load(args.compare), results, args.threshold)
+        print()
+        print(harness.format_comparison(rows))
+        if any(row["regressed"] for row in rows):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+from threading import Lock
+from typing import Optional
+
+import can
+from loguru import logger
+
+from can_bus.io_pipeline import FrameCallback, RxDispatcher, TxBatcher
+
+STANDARD_ID_MASK = 0x7FF
+EXTENDED_ID_MASK = 0x1FFFFFFF
+
+
+class _Channel:
+    """
+    One open bus with its RX notifier, TX thread and the filters of the drivers on it.
+    """
+
+    def __init__(self, bus: can.BusABC, tx_queue_size: int, tx_batch_size: int):
+        self.bus = bus
+        self.dispatcher = RxDispatcher(maxsize=None)
+        self.notifier: Optional[can.Notifier] = None
+        self.tx = TxBatcher(bus, maxsize=tx_queue_size, batch_size=tx_batch_size)
+        self.tx.start()
+        self.filters: dict[object, list[dict]] = {}  # owner -> filters
+
+    def apply_filters(self) -> None:
+        merged = [f for filters in self.filters.values() for f in filters]
+        # No filters means "receive everything" to python-can; drop the filters only when nobody listens.
+        self.bus.set_filters(merged or None)
+
+    def start_rx(self) -> None:
+        if self.notifier is None:
+            self.notifier = can.Notifier(self.bus, [self.dispatcher], timeout=0.1)
+
+    def shutdown(self) -> None:
+        if self.notifier is not None:
+            self.notifier.stop()
+        self.tx.stop()
+        self.bus.shutdown()
+
+
+class BusPool:
+    """
+    Opens each CAN channel once and shares it between the device drivers on it.
+
+    Every channel gets one `can.Notifier` (RX) and one `TxBatcher` (TX) thread, opened
+    on first use. Drivers attach with the arbitration IDs they listen to: the pool sets
+    the union as the bus's receive filters, which socketcan applies in the kernel, so
+    frames nobody listens to never reach Python; the rest are dispatched by ID, so a
+    driver's callback only runs for its own frames.
+
+    Args:
+        interface (str, optional): python-can interface of every channel. Defaults to 'virtual'.
+        bitrate (int, optional): Defaults to 500000.
+        tx_queue_size (int, optional): Max queued TX frames per channel. Defaults to 256.
+        tx_batch_size (int, optional): Max frames sent per TX wakeup. Defaults to 32.
+        **bus_kwargs: Passed on to `can.interface.Bus`.
+    """
+
+    def __init__(self, interface: str = "virtual", bitrate: int = 500000, tx_queue_size: int = 256,
+                 tx_batch_size: int = 32, **bus_kwargs):
+        self.interface = interface
+        self.bitrate = bitrate
+        self.tx_queue_size = tx_queue_size
+        self.tx_batch_size = tx_batch_size
+        self.bus_kwargs = bus_kwargs
+        self._channels: dict[str, _Channel] = {}
+        self._lock = Lock()
+
+    @property
+    def channels(self) -> list[str]:
+        return list(self._channels)
+
+    def _channel(self, channel: str) -> _Channel:
+        opened = self._channels.get(channel)
+        if opened is not None:
+            return opened
+
+        with self._lock:
+            opened = self._channels.get(channel)
+            if opened is None:
+                bus = can.interface.Bus(channel=channel, interface=self.interface, bitrate=self.bitrate,
+                                        **self.bus_kwargs)
+                opened = _Channel(bus, self.tx_queue_size, self.tx_batch_size)
+                self._channels[channel] = opened
+                logger.info(f"Opened CAN channel '{channel}' ({self.interface})")
+            return opened
+
+    def bus(self, channel: str) -> can.BusABC:
+        """
+        The shared bus of `channel`, opened if needed.
+        """
+        return self._channel(channel).bus
+
+    def subscribe(self, channel: str, owner, ids: list[tuple[int, bool]], callback: FrameCallback) -> None:
+        """
+        Call `callback(message)` on the RX thread for every frame with one of `ids`
+        (`(arbitration_id, is_extended_id)` pairs), and let those IDs through the bus filter.
+        """
+        opened = self._channel(channel)
+        with self._lock:
+            opened.filters[owner] = [
+                {"can_id": can_id, "can_mask": EXTENDED_ID_MASK if extended else STANDARD_ID_MASK,
+                 "extended": extended}
+                for can_id, extended in ids
+            ]
+            opened.apply_filters()
+            for can_id, _ in ids:
+                opened.dispatcher.add_callback(can_id, callback)
+            opened.start_rx()
+
+    def unsubscribe(self, channel: str, owner, ids: list[tuple[int, bool]], callback: FrameCallback) -> None:
+        opened = self._channels.get(channel)
+        if opened is None:
+            return
+        with self._lock:
+            if opened.filters.pop(owner, None) is None:
+                return
+            for can_id, _ in ids:
+                opened.dispatcher.remove_callback(can_id, callback)
+            opened.apply_filters()
+
+    def add_tap(self, channel: str, callback: FrameCallback) -> None:
+        """
+        Call `callback` for every frame received on `channel` (e.g. to record them).
+        Only sees what the drivers' filters let through.
+        """
+        opened = self._channel(channel)
+        opened.dispatcher.add_callback(None, callback)
+        opened.start_rx()
+
+    def send(self, channel: str, message: can.Message) -> bool:
+        """
+        Queue a frame on `channel`'s TX thread. Never blocks; False if the TX queue is full.
+        The message must not be modified afterwards.
+        """
+        return self._channel(channel).tx.submit(message)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            channels, self._channels = self._channels, {}
+        for name, opened in channels.items():
+            opened.shutdown()
+            logger.info(f"Closed CAN channel '{name}'")
@@ -1,16 +1,22 @@
+import copy
+import time
+import warnings
+
 import can
 from loguru import logger
-import os
+from typing import Optional
 
-LOG_PATH = os.path.abspath(os.path.join("logging", "CAN_logs.log"))
+from can_bus.codec import MessageRegistry
+from can_bus.io_pipeline import FrameCallback, RxDispatcher, TxBatcher
+from can_bus.messages import default_registry
+from can_bus.trace import TraceRecorder
+from can_bus.tx_scheduler import TxPolicy, TxScheduler
+from runtime.metrics import METRICS
 
-logger.add(
-    LOG_PATH,
-    level="DEBUG",
-    rotation="500 KB",
-    backtrace=True,
-    diagnose=True
-)
+_SEND_SECONDS = METRICS.histogram("can_send_seconds", "Duration of a blocking CAN send")
+_FRAMES_SENT = METRICS.counter("can_frames_sent_total", "CAN frames put on the bus", path="direct")
+_SEND_ERRORS = METRICS.counter("can_send_errors_total", "CAN sends that failed", path="direct")
+_FRAMES_RECEIVED = METRICS.counter("can_frames_received_total", "CAN frames handed to the application")
 
 
 class CANManager:
@@ -18,48 +24,236 @@ class CANManager:
     def __init__(
         self,
         channel: str = "default_channel",
-        bustype: str = "socketcan",
+        bustype: Optional[str] = None,
         bitrate: int = 500000,
-        interface: str = 'virtual',
+        interface: Optional[str] = None,
+        registry: Optional[MessageRegistry] = None,
+        tx_policy: TxPolicy = TxPolicy(),
     ):
         """
-        Initialize the CAN manager.
+        Initialize the CAN manager on a single channel. For several channels and
+        per-device drivers, see `bus_pool.BusPool` and `device_drivers`.
 
         Args:
             channel (str, optional): Defaults to "default_channel".
-            bustype (str, optional): Defaults to "socketcan".
+            bustype (str, optional): Deprecated alias of `interface` (python-can 3 naming).
             bitrate (int, optional): Defaults to 500000.
-            interface (str, optional): Defaults to 'virtual'.
+            interface (str, optional): python-can interface, e.g. 'socketcan'. Defaults to 'virtual'.
+            registry (MessageRegistry, optional): Frame layouts. Defaults to `messages.default_registry()`.
+            tx_policy (TxPolicy, optional): Default dedup / rate limit of commands, see `set_tx_policy`.
         """
+        if bustype is not None:
+            warnings.warn("CANManager(bustype=...) is deprecated, use interface=...", DeprecationWarning, stacklevel=2)
+            if interface is not None and interface != bustype:
+                raise ValueError(f"Conflicting bustype '{bustype}' and interface '{interface}'")
+
         self.channel = channel
-        self.bustype = bustype
         self.bitrate = bitrate
-        self.interface = interface
+        self.interface = interface or bustype or "virtual"
+        self.registry = registry or default_registry()
 
         self.bus = can.interface.Bus(
             channel=self.channel,
-            bustype=self.bustype,
             bitrate=self.bitrate,
             interface=self.interface
         )
 
-    def send_message(self, arbitration_id: int, data: bytes):
+        self._notifier: Optional[can.Notifier] = None
+        self._rx: Optional[RxDispatcher] = None
+        self._tx: Optional[TxBatcher] = None
+        self._recorder: Optional[TraceRecorder] = None
+        # Commands (send_command / queue_command) go through the scheduler; raw frames do not.
+        self.tx_scheduler = TxScheduler(self._send_scheduled, default_policy=tx_policy)
+
+    @property
+    def background_io(self) -> bool:
+        return self._notifier is not None
+
+    def start_background_io(self, rx_queue_size: int = 256, tx_queue_size: int = 256, tx_batch_size: int = 32):
         """
-        Send a CAN message.
+        Switch to non-blocking mode: a `can.Notifier` thread fills a bounded RX queue
+        (and fires per-ID callbacks), and a TX thread drains queued frames in batches.
+
+        Args:
+            rx_queue_size (int, optional): Max buffered RX frames, oldest dropped first. Defaults to 256.
+            tx_queue_size (int, optional): Max queued TX frames. Defaults to 256.
+            tx_batch_size (int, optional): Max frames sent per TX wakeup. Defaults to 32.
         """
         if not self.bus:
             raise can.exceptions.CanOperationError(f"Bus was not initiated!")
+        if self.background_io:
+            return
+
+        self._rx = RxDispatcher(maxsize=rx_queue_size)
+        if self._recorder is not None:
+            self._rx.add_callback(None, self._recorder)
+        self._tx = TxBatcher(self.bus, maxsize=tx_queue_size, batch_size=tx_batch_size)
+        self._tx.start()
+        self._notifier = can.Notifier(self.bus, [self._rx], timeout=0.1)
+
+    def stop_background_io(self):
+        if not self.background_io:
+            return
+
+        self._notifier.stop()
+        self._tx.stop()
+        self._notifier = None
+        self._tx = None
+
+    @property
+    def recording(self) -> bool:
+        return self._recorder is not None
+
+    def start_recording(self, path: str) -> TraceRecorder:
+        """
+        Record every frame received or sent from now on to a trace file (see `trace.TraceRecorder`
+        for the formats). Received frames are recorded as they arrive, also in background mode;
+        sent ones when they are sent (or queued, in background mode), stamped with `time.time()`.
+        """
+        if self._recorder is not None:
+            raise RuntimeError(f"Already recording to {self._recorder.path}")
+
+        self._recorder = TraceRecorder(path)
+        if self._rx is not None:
+            self._rx.add_callback(None, self._recorder)
+        return self._recorder
+
+    def stop_recording(self):
+        if self._recorder is None:
+            return
+        if self._rx is not None:
+            self._rx.remove_callback(None, self._recorder)
+        self._recorder.stop()
+        self._recorder = None
+
+    def _record_tx(self, message: can.Message):
+        if self._recorder is not None:
+            # A copy: `message` may already be queued for the TX thread, or be the caller's own
+            # (e.g. the registry's cached one). Built messages carry timestamp 0.0; received
+            # ones are stamped by the bus, on the wall clock.
+            record = copy.copy(message)
+            record.timestamp = time.time()
+            record.is_rx = False
+            self._recorder(record)
+
+    def add_callback(self, arbitration_id: int, callback: FrameCallback):
+        """
+        Call `callback(message)` on the RX thread for every frame with `arbitration_id`.
+        Requires `start_background_io`.
+        """
+        if not self.background_io:
+            raise RuntimeError("Callbacks need background I/O, call 'start_background_io' first.")
+        self._rx.add_callback(arbitration_id, callback)
+
+    def remove_callback(self, arbitration_id: int, callback: FrameCallback):
+        if self._rx:
+            self._rx.remove_callback(arbitration_id, callback)
+
+    def queue_message(self, arbitration_id: int, data: bytes) -> bool:
+        """
+        Non-blocking send. Falls back to `send_message` without background I/O.
+        Returns False if the TX queue is full and the frame was dropped.
+        A trace being recorded gets the frame when it is queued, not when the TX thread sends it.
+        """
+        if not self.background_io:
+            self.send_message(arbitration_id, data)
+            return True
+
+        message = can.Message(
+            arbitration_id=arbitration_id,
+            data=data,
+            is_extended_id=False
+        )
+        queued = self._tx.submit(message)
+        if queued:
+            self._record_tx(message)
+        return queued
 
+    def set_tx_policy(self, name: str | int, min_interval: float = 0.0, heartbeat: Optional[float] = 1.0,
+                      priority: int = 0):
+        """
+        How often a command (by message name or arbitration ID) may go out, see `TxPolicy`.
+        E.g. `set_tx_policy("rudder_command", min_interval=0.05, heartbeat=0.5, priority=0)`.
+        """
+        arbitration_id = self.registry[name].arbitration_id if isinstance(name, str) else name
+        self.tx_scheduler.set_policy(arbitration_id, TxPolicy(min_interval, heartbeat, priority))
+
+    def _send_scheduled(self, message: can.Message) -> bool:
+        if not self.background_io:
+            return self.send_frame(message)
+
+        queued = self._tx.submit(message)
+        if queued:
+            self._record_tx(message)
+        return queued
+
+    def _command(self, name: str, values: dict) -> bool:
+        spec = self.registry[name]
+        # A fresh message: the scheduler may hold on to it, the registry's cached one is reused.
+        message = can.Message(arbitration_id=spec.arbitration_id, data=spec.encode_bytes(**values),
+                              is_extended_id=spec.is_extended_id)
+        self.tx_scheduler.flush()
+        return self.tx_scheduler.submit(message)
+
+    def send_command(self, name: str, **values) -> bool:
+        """
+        Encode a registered message (e.g. `send_command("rudder_command", angle=5.0)`) and send it,
+        unless the TX scheduler holds it back: an unchanged command goes out again only on its
+        heartbeat, and one within its minimum interval waits for `flush_tx`.
+        Returns True if the frame was sent now.
+        """
+        return self._command(name, values)
+
+    def queue_command(self, name: str, **values) -> bool:
+        """
+        Non-blocking `send_command`, see `queue_message`. Returns True if the frame was queued now.
+        """
+        return self._command(name, values)
+
+    def flush_tx(self) -> int:
+        """
+        Send the commands the TX scheduler held back whose interval has passed, most urgent
+        first. Call once per control tick. Returns the number of frames sent.
+        """
+        return self.tx_scheduler.flush()
+
+    def decode(self, message: can.Message) -> Optional[tuple[str, dict]]:
+        """
+        Decode a received frame to `(name, values)`, or None if its ID is not registered.
+        """
+        return self.registry.decode(message)
+
+    def send_message(self, arbitration_id: int, data: bytes):
+        """
+        Send a CAN message.
+        """
         message = can.Message(
             arbitration_id=arbitration_id,
             data=data,
             is_extended_id=False
         )
+        self.send_frame(message)
+
+    def send_frame(self, message: can.Message) -> bool:
+        """
+        Send an already built `can.Message` (e.g. one returned by the registry).
+        Returns False if the send failed.
+        """
+        if not self.bus:
+            raise can.exceptions.CanOperationError(f"Bus was not initiated!")
+
         try:
-            self.bus.send(message)
-            print(f"Message sent: {message}")
+            with _SEND_SECONDS.time():
+                self.bus.send(message)
         except can.CanError as e:
-            print(f"Failed to send message: {e}")
+            _SEND_ERRORS.inc()
+            logger.error(f"Failed to send message: {e}")
+            return False
+
+        _FRAMES_SENT.inc()
+        self._record_tx(message)
+        logger.debug("Message sent: {}", message)
+        return True
 
     def receive_message(self, timeout: float = 1.0):
         """
@@ -68,29 +262,38 @@ class CANManager:
         if not self.bus:
             raise can.exceptions.CanOperationError(f"Bus was not initiated!")
 
-        message = self.bus.recv(timeout=timeout)
+        if self.background_io:
+            # The notifier thread owns bus.recv; read from its queue instead.
+            message = self._rx.get(timeout=timeout)
+        else:
+            message = self.bus.recv(timeout=timeout)
+            if message and self._recorder is not None:
+                self._recorder(message)
+
         if message:
-            print(f"Message received: {message}")
+            _FRAMES_RECEIVED.inc()
+            logger.debug("Message received: {}", message)
         else:
-            print("No message received within the timeout.")
+            logger.debug("No message received within the timeout.")
         return message
 
     def shutdown(self):
         """
         Shutdown the CAN manager and clean up resources.
         """
+        self.stop_background_io()
+        self.stop_recording()
         if self.bus:
             self.bus.shutdown()
-            print("CAN bus shut down.")
+            logger.info(f"CAN bus '{self.channel}' shut down")
 
 
 if __name__ == "__main__":
     can_manager = CANManager(
         channel="vcan0",
-        bustype="socketcan",
+        interface="socketcan",
         bitrate=500000
     )
-    PAYLOAD: list[int] = [k for k in range(5)]
-    can_manager.send_message(arbitration_id=0x123, data=PAYLOAD)
+    can_manager.send_command("engine_command", throttle=25.0, enabled=1)
     can_manager.receive_message(timeout=2.0)
-    can_manager
+    can_manager.shutdown()
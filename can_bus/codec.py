@@ -0,0 +1,184 @@
+import struct
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:
+    import can
+
+# struct format characters allowed for signals, and whether they hold integers.
+_SIGNAL_FORMATS = {
+    "b": True, "B": True,
+    "h": True, "H": True,
+    "i": True, "I": True,
+    "e": False, "f": False,
+}
+
+
+@dataclass(frozen=True)
+class Signal:
+    """
+    One field of a CAN frame, DBC style: `physical = raw * scale + offset`.
+
+    Args:
+        name (str): Keyword used when encoding / key in the decoded dict.
+        fmt (str): struct format character of the raw value (e.g. "h" for int16).
+        scale (float, optional): Defaults to 1.0.
+        offset (float, optional): Defaults to 0.0.
+        unit (str, optional): For documentation only. Defaults to "".
+    """
+    name: str
+    fmt: str
+    scale: float = 1.0
+    offset: float = 0.0
+    unit: str = ""
+
+    def __post_init__(self):
+        if self.fmt not in _SIGNAL_FORMATS:
+            raise ValueError(f"Unsupported signal format '{self.fmt}' for signal '{self.name}'")
+        if self.scale == 0:
+            raise ValueError(f"Signal '{self.name}' has zero scale")
+
+    @property
+    def is_integer(self) -> bool:
+        return _SIGNAL_FORMATS[self.fmt]
+
+
+class MessageSpec:
+    """
+    Layout of one arbitration ID, compiled once into a `struct.Struct`.
+
+    Encoding packs straight into a preallocated `bytearray`, which is also the
+    `data` of a cached `can.Message`, so the hot path allocates no new frame.
+    The cached message is overwritten by the next `encode` call: send it before
+    encoding again, or use `encode_bytes` when the frame is queued for later.
+    """
+
+    def __init__(self, name: str, arbitration_id: int, signals: Iterable[Signal],
+                 byte_order: str = "<", is_extended_id: bool = False):
+        self.name = name
+        self.arbitration_id = arbitration_id
+        self.signals = tuple(signals)
+        self.is_extended_id = is_extended_id
+
+        if byte_order not in ("<", ">"):
+            raise ValueError("byte_order must be '<' (little endian) or '>' (big endian)")
+
+        self._struct = struct.Struct(byte_order + "".join(s.fmt for s in self.signals))
+        if self._struct.size > 8:
+            raise ValueError(f"Message '{name}' is {self._struct.size} bytes, classic CAN allows 8")
+
+        self.length = self._struct.size
+        self._names = tuple(s.name for s in self.signals)
+
+        # Only scaled signals pay for the conversion.
+        self._scaled = tuple(
+            (index, s.scale, s.offset, s.is_integer)
+            for index, s in enumerate(self.signals)
+            if s.scale != 1.0 or s.offset != 0.0
+        )
+
+        self._buffer = bytearray(self.length)
+        self._view = memoryview(self._buffer)
+        # python-can is only loaded once a layout is built: importing the frame names is free.
+        import can
+        self._message = can.Message(
+            arbitration_id=arbitration_id,
+            data=self._buffer,
+            is_extended_id=is_extended_id
+        )
+
+    def _to_raw(self, values: dict) -> list:
+        try:
+            raw = [values[name] for name in self._names]
+        except KeyError as e:
+            raise KeyError(f"Missing signal {e} for message '{self.name}'") from None
+
+        for index, scale, offset, is_integer in self._scaled:
+            value = (raw[index] - offset) / scale
+            raw[index] = round(value) if is_integer else value
+        return raw
+
+    def encode_into(self, buffer, offset: int = 0, **values) -> None:
+        """
+        Pack the physical `values` into any writable buffer (bytearray, memoryview, ...).
+        """
+        try:
+            self._struct.pack_into(buffer, offset, *self._to_raw(values))
+        except struct.error as e:
+            raise ValueError(f"Cannot encode message '{self.name}': {e}") from None
+
+    def encode(self, **values) -> "can.Message":
+        """
+        Encode into the cached `can.Message` of this spec and return it.
+        """
+        self.encode_into(self._buffer, **values)
+        return self._message
+
+    def encode_bytes(self, **values) -> bytes:
+        """
+        Encode into a fresh `bytes` object, safe to keep or queue.
+        """
+        self.encode_into(self._buffer, **values)
+        return bytes(self._view)
+
+    def decode_raw(self, data) -> tuple:
+        return self._struct.unpack_from(data)
+
+    def decode(self, data) -> dict:
+        raw = self._struct.unpack_from(data)
+        if not self._scaled:
+            return dict(zip(self._names, raw))
+
+        physical = list(raw)
+        for index, scale, offset, _ in self._scaled:
+            physical[index] = raw[index] * scale + offset
+        return dict(zip(self._names, physical))
+
+    def __repr__(self):
+        return f"MessageSpec(name={self.name}, id={self.arbitration_id:#x}, signals={list(self._names)})"
+
+
+class MessageRegistry:
+    """
+    Lookup of `MessageSpec`s by name and by arbitration ID.
+    """
+
+    def __init__(self, specs: Iterable[MessageSpec] = ()):
+        self._by_name: dict[str, MessageSpec] = {}
+        self._by_id: dict[int, MessageSpec] = {}
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec: MessageSpec) -> MessageSpec:
+        if spec.name in self._by_name:
+            raise ValueError(f"Message name '{spec.name}' is already registered")
+        if spec.arbitration_id in self._by_id:
+            raise ValueError(f"Arbitration ID {spec.arbitration_id:#x} is already registered")
+
+        self._by_name[spec.name] = spec
+        self._by_id[spec.arbitration_id] = spec
+        return spec
+
+    def __getitem__(self, name: str) -> MessageSpec:
+        return self._by_name[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def __iter__(self):
+        return iter(self._by_name.values())
+
+    def by_id(self, arbitration_id: int) -> Optional[MessageSpec]:
+        return self._by_id.get(arbitration_id)
+
+    def encode(self, name: str, **values) -> "can.Message":
+        return self._by_name[name].encode(**values)
+
+    def decode(self, message: "can.Message") -> Optional[tuple[str, dict]]:
+        """
+        Returns `(name, values)`, or None for arbitration IDs we know nothing about.
+        """
+        spec = self._by_id.get(message.arbitration_id)
+        if spec is None:
+            return None
+        return spec.name, spec.decode(message.data)
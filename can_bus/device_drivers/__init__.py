@@ -0,0 +1,7 @@
+"""Per-device drivers on top of `can_bus.bus_pool.BusPool`."""
+
+from can_bus.device_drivers.base import DeviceDriver
+from can_bus.device_drivers.actuators import EngineDriver, RudderDriver
+from can_bus.device_drivers.sensors import CompassDriver, ImuDriver
+
+__all__ = ["DeviceDriver", "EngineDriver", "RudderDriver", "CompassDriver", "ImuDriver"]
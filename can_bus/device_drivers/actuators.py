@@ -0,0 +1,45 @@
+from typing import Optional
+
+from can_bus.device_drivers.base import DeviceDriver
+from can_bus.messages import ENGINE_COMMAND, ENGINE_STATUS, RUDDER_COMMAND
+
+
+class EngineDriver(DeviceDriver):
+    """
+    Motor controller: takes throttle commands, reports rpm / current / voltage / temperature.
+    """
+
+    rx_messages = (ENGINE_STATUS,)
+    tx_messages = (ENGINE_COMMAND,)
+
+    def set_throttle(self, throttle: float, enabled: bool = True) -> bool:
+        """
+        Args:
+            throttle (float): -100 .. 100 %, negative is reverse.
+            enabled (bool, optional): Defaults to True.
+        """
+        return self.send(ENGINE_COMMAND, throttle=throttle, enabled=int(enabled))
+
+    def stop(self) -> bool:
+        # Always goes out, also if the last command already was a stop.
+        self.tx_scheduler.forget(self.registry[ENGINE_COMMAND].arbitration_id)
+        return self.send(ENGINE_COMMAND, throttle=0.0, enabled=0)
+
+    @property
+    def rpm(self) -> Optional[int]:
+        return self.value(ENGINE_STATUS, "rpm")
+
+
+class RudderDriver(DeviceDriver):
+    """
+    Rudder servo. Command only.
+    """
+
+    tx_messages = (RUDDER_COMMAND,)
+
+    def set_angle(self, angle: float) -> bool:
+        """
+        Args:
+            angle (float): Degrees, positive is starboard.
+        """
+        return self.send(RUDDER_COMMAND, angle=angle)
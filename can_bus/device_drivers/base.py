@@ -0,0 +1,152 @@
+import time
+from threading import Lock
+from typing import Callable, Optional
+
+import can
+from loguru import logger
+
+from can_bus.bus_pool import BusPool
+from can_bus.codec import MessageRegistry
+from can_bus.messages import default_registry
+from can_bus.tx_scheduler import TxPolicy, TxScheduler
+
+
+class DeviceDriver:
+    """
+    One device on a CAN channel of a `BusPool`.
+
+    Subclasses list the registry messages they receive (`rx_messages`) and send
+    (`tx_messages`). Attaching subscribes to exactly the RX IDs, so the bus filter and
+    the dispatcher only wake this driver for its own frames. Received frames are decoded
+    and kept as the latest values per message; override `on_message` (or `add_listener`)
+    to react to them.
+
+    Sent frames go through a `TxScheduler`: a command recomputed every control tick only
+    takes bus time when it changes (or its heartbeat is due). Send and `flush_tx` from one
+    thread, the control loop.
+
+    Args:
+        pool (BusPool): Where the channel lives.
+        channel (str): CAN channel the device is on.
+        registry (MessageRegistry, optional): Defaults to `messages.default_registry()`.
+        tx_policy (TxPolicy, optional): Default dedup / rate limit of the sent messages, see `set_tx_policy`.
+    """
+
+    rx_messages: tuple[str, ...] = ()
+    tx_messages: tuple[str, ...] = ()
+
+    def __init__(self, pool: BusPool, channel: str, registry: Optional[MessageRegistry] = None,
+                 tx_policy: TxPolicy = TxPolicy()):
+        self.pool = pool
+        self.channel = channel
+        self.registry = registry or default_registry()
+
+        self.latest: dict[str, dict] = {}
+        self.updated_at: dict[str, float] = {}
+        self.frames_received = 0
+        self._lock = Lock()
+        self._listeners: list[Callable[[str, dict], None]] = []
+        self.tx_scheduler = TxScheduler(self._send_frame, default_policy=tx_policy)
+
+        self._rx_ids = [(self.registry[name].arbitration_id, self.registry[name].is_extended_id)
+                        for name in self.rx_messages]
+        self.attached = False
+        self.attach()
+
+    @property
+    def rx_ids(self) -> list[int]:
+        return [can_id for can_id, _ in self._rx_ids]
+
+    def attach(self) -> None:
+        if self.attached:
+            return
+        if self._rx_ids:
+            self.pool.subscribe(self.channel, self, self._rx_ids, self._on_frame)
+        self.attached = True
+
+    def detach(self) -> None:
+        if not self.attached:
+            return
+        if self._rx_ids:
+            self.pool.unsubscribe(self.channel, self, self._rx_ids, self._on_frame)
+        self.attached = False
+
+    def _on_frame(self, message: can.Message) -> None:
+        # Runs on the channel's RX thread.
+        decoded = self.registry.decode(message)
+        if decoded is None:
+            return
+
+        name, values = decoded
+        with self._lock:
+            self.latest[name] = values
+            self.updated_at[name] = time.monotonic()
+            self.frames_received += 1
+        self.on_message(name, values)
+        for listener in self._listeners:
+            listener(name, values)
+
+    def on_message(self, name: str, values: dict) -> None:
+        """
+        Hook for subclasses, called on the RX thread for every decoded frame.
+        """
+
+    def add_listener(self, listener: Callable[[str, dict], None]) -> None:
+        """
+        Also call `listener(name, values)` on the RX thread for every decoded frame.
+        """
+        self._listeners.append(listener)
+
+    def value(self, name: str, signal: str, max_age: Optional[float] = None):
+        """
+        Latest value of `signal` in message `name`, or None if never received
+        (or older than `max_age` seconds).
+        """
+        with self._lock:
+            values = self.latest.get(name)
+            updated = self.updated_at.get(name, 0.0)
+        if values is None or (max_age is not None and time.monotonic() - updated > max_age):
+            return None
+        return values[signal]
+
+    def set_tx_policy(self, name: str, min_interval: float = 0.0, heartbeat: Optional[float] = 1.0,
+                      priority: int = 0) -> None:
+        """
+        How often one of `tx_messages` may go out, see `TxPolicy`.
+        """
+        if name not in self.tx_messages:
+            raise ValueError(f"{type(self).__name__} does not send '{name}'")
+        self.tx_scheduler.set_policy(self.registry[name].arbitration_id, TxPolicy(min_interval, heartbeat, priority))
+
+    def send(self, name: str, **values) -> bool:
+        """
+        Encode and queue one of `tx_messages`, unless the TX scheduler holds it back: an
+        unchanged command goes out again only on its heartbeat, and one within its minimum
+        interval waits for `flush_tx`. Never blocks; True if the frame was queued now.
+        """
+        if name not in self.tx_messages:
+            raise ValueError(f"{type(self).__name__} does not send '{name}'")
+
+        spec = self.registry[name]
+        # A fresh message: the spec's cached one is reused by the next encode, the scheduler may hold on to it.
+        message = can.Message(arbitration_id=spec.arbitration_id, data=spec.encode_bytes(**values),
+                              is_extended_id=spec.is_extended_id)
+        self.tx_scheduler.flush()
+        return self.tx_scheduler.submit(message)
+
+    def flush_tx(self) -> int:
+        """
+        Send the commands held back whose interval has passed. Call once per control tick.
+        Returns the number of frames sent.
+        """
+        return self.tx_scheduler.flush()
+
+    def _send_frame(self, message: can.Message) -> bool:
+        sent = self.pool.send(self.channel, message)
+        if not sent:
+            name = self.registry.by_id(message.arbitration_id).name
+            logger.warning(f"{type(self).__name__}: TX queue full, '{name}' dropped")
+        return sent
+
+    def __repr__(self):
+        return f"{type(self).__name__}(channel={self.channel!r}, rx={[hex(i) for i in self.rx_ids]})"
@@ -0,0 +1,28 @@
+from typing import Optional
+
+from can_bus.device_drivers.base import DeviceDriver
+from can_bus.messages import COMPASS, IMU
+
+
+class CompassDriver(DeviceDriver):
+
+    rx_messages = (COMPASS,)
+
+    @property
+    def heading(self) -> Optional[float]:
+        """
+        Degrees clockwise from north, None until the first frame.
+        """
+        return self.value(COMPASS, "heading")
+
+
+class ImuDriver(DeviceDriver):
+
+    rx_messages = (IMU,)
+
+    @property
+    def yaw_rate(self) -> Optional[float]:
+        """
+        deg/s, None until the first frame.
+        """
+        return self.value(IMU, "yaw_rate")
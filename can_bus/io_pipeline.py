@@ -0,0 +1,151 @@
+from collections import defaultdict
+from queue import Empty, Full, Queue
+from threading import Event, Lock, Thread
+from typing import Callable, Optional
+
+import can
+from loguru import logger
+
+from runtime.metrics import METRICS
+
+_RX_DROPPED = METRICS.counter("can_rx_dropped_total", "Received CAN frames dropped from the full RX queue")
+_CALLBACK_ERRORS = METRICS.counter("can_callback_errors_total", "CAN RX callbacks that raised")
+_RX_ERRORS = METRICS.counter("can_rx_errors_total", "Errors on the CAN RX thread")
+_FRAMES_SENT = METRICS.counter("can_frames_sent_total", "CAN frames put on the bus", path="batched")
+_SEND_ERRORS = METRICS.counter("can_send_errors_total", "CAN sends that failed", path="batched")
+_TX_QUEUE_FULL = METRICS.counter("can_tx_queue_full_total", "CAN frames refused by the full TX queue")
+
+FrameCallback = Callable[[can.Message], None]
+
+
+class RxDispatcher(can.Listener):
+    """
+    Receives frames on the `can.Notifier` thread.
+
+    Every frame is handed to the callbacks registered for its arbitration ID (and to
+    those registered for `None`, i.e. every ID), then put into a bounded queue. When the
+    queue is full the oldest frame is dropped, so a slow consumer never blocks the bus
+    reader. With `maxsize=None` there is no queue, only callbacks.
+    """
+
+    def __init__(self, maxsize: Optional[int] = 256):
+        self.queue: Optional[Queue[can.Message]] = Queue(maxsize=maxsize) if maxsize is not None else None
+        self.dropped = 0
+        self._callbacks: dict[Optional[int], list[FrameCallback]] = defaultdict(list)
+        self._callbacks_lock = Lock()
+
+    def add_callback(self, arbitration_id: Optional[int], callback: FrameCallback) -> None:
+        with self._callbacks_lock:
+            self._callbacks[arbitration_id].append(callback)
+
+    def remove_callback(self, arbitration_id: Optional[int], callback: FrameCallback) -> None:
+        with self._callbacks_lock:
+            self._callbacks[arbitration_id].remove(callback)
+
+    def _call(self, callbacks: list[FrameCallback], msg: can.Message) -> None:
+        for callback in tuple(callbacks):
+            try:
+                callback(msg)
+            except Exception:
+                _CALLBACK_ERRORS.inc()
+                logger.exception(f"CAN callback failed for ID {msg.arbitration_id:#x}")
+
+    def on_message_received(self, msg: can.Message) -> None:
+        callbacks = self._callbacks.get(msg.arbitration_id)
+        if callbacks:
+            self._call(callbacks, msg)
+        callbacks = self._callbacks.get(None)
+        if callbacks:
+            self._call(callbacks, msg)
+
+        if self.queue is None:
+            return
+        while True:
+            try:
+                self.queue.put_nowait(msg)
+                return
+            except Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                    _RX_DROPPED.inc()
+                except Empty:
+                    pass
+
+    def get(self, timeout: Optional[float] = None) -> Optional[can.Message]:
+        """
+        Pop the oldest received frame. `timeout=None` or `0` does not wait.
+        """
+        if self.queue is None:
+            return None
+        try:
+            if not timeout:
+                return self.queue.get_nowait()
+            return self.queue.get(timeout=timeout)
+        except Empty:
+            return None
+
+    def on_error(self, exc: Exception) -> None:
+        _RX_ERRORS.inc()
+        logger.error(f"CAN receive error: {exc}")
+
+
+class TxBatcher(Thread):
+    """
+    Background sender. `submit` never blocks; the worker wakes up once per burst
+    and drains up to `batch_size` queued frames onto the bus in one go.
+    """
+
+    def __init__(self, bus: can.BusABC, maxsize: int = 256, batch_size: int = 32):
+        super().__init__(name="can-tx", daemon=True)
+        self.bus = bus
+        self.batch_size = batch_size
+        self.queue: Queue[can.Message] = Queue(maxsize=maxsize)
+        self.sent = 0
+        self.failed = 0
+        self._stop_event = Event()
+
+    def submit(self, message: can.Message) -> bool:
+        """
+        Queue a frame for sending. Returns False if the TX queue is full.
+        """
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except Full:
+            _TX_QUEUE_FULL.inc()
+            logger.warning(f"CAN TX queue full, dropping frame {message.arbitration_id:#x}")
+            return False
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                batch = [self.queue.get(timeout=0.1)]
+            except Empty:
+                continue
+
+            self._send_batch(batch)
+
+        # Flush whatever was queued before stop() was called.
+        self._send_batch([])
+
+    def _send_batch(self, batch: list[can.Message]) -> None:
+        while len(batch) < self.batch_size or self._stop_event.is_set():
+            try:
+                batch.append(self.queue.get_nowait())
+            except Empty:
+                break
+
+        for message in batch:
+            try:
+                self.bus.send(message)
+                self.sent += 1
+                _FRAMES_SENT.inc()
+            except can.CanError as e:
+                self.failed += 1
+                _SEND_ERRORS.inc()
+                logger.error(f"Failed to send message: {e}")
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop_event.set()
+        self.join(timeout=timeout)
@@ -0,0 +1,47 @@
+"""Frame layouts of the devices on the boat's CAN bus.
+
+NOTE: the arbitration IDs and scalings are placeholders until the motor controller,
+rudder and sensor boards are fixed. Change them here and nowhere else.
+"""
+
+from can_bus.codec import MessageRegistry, MessageSpec, Signal
+
+# Actuator commands
+ENGINE_COMMAND = "engine_command"
+RUDDER_COMMAND = "rudder_command"
+
+# Sensor frames
+ENGINE_STATUS = "engine_status"
+IMU = "imu"
+COMPASS = "compass"
+
+
+def default_specs() -> list[MessageSpec]:
+    return [
+        MessageSpec(ENGINE_COMMAND, 0x101, [
+            Signal("throttle", "h", scale=0.01, unit="%"),     # -100 .. 100, negative is reverse
+            Signal("enabled", "B"),
+        ]),
+        MessageSpec(RUDDER_COMMAND, 0x102, [
+            Signal("angle", "h", scale=0.01, unit="deg"),      # positive is starboard
+        ]),
+        MessageSpec(ENGINE_STATUS, 0x181, [
+            Signal("rpm", "H"),
+            Signal("current", "h", scale=0.1, unit="A"),
+            Signal("voltage", "H", scale=0.01, unit="V"),
+            Signal("temperature", "b", unit="degC"),
+        ]),
+        MessageSpec(IMU, 0x201, [
+            Signal("accel_x", "h", scale=0.001, unit="m/s^2"),  # forward
+            Signal("accel_y", "h", scale=0.001, unit="m/s^2"),  # starboard
+            Signal("yaw_rate", "h", scale=0.01, unit="deg/s"),
+        ]),
+        MessageSpec(COMPASS, 0x202, [
+            Signal("heading", "H", scale=0.01, unit="deg"),    # 0 .. 360, clockwise from north
+        ]),
+    ]
+
+
+def default_registry() -> MessageRegistry:
+    # A fresh registry each time: every spec owns its own encode buffer.
+    return MessageRegistry(default_specs())
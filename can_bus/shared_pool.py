@@ -0,0 +1,248 @@
+import time
+from threading import Lock
+from typing import Optional
+
+import can
+import numpy as np
+from loguru import logger
+
+from can_bus.bus_pool import BusPool
+from can_bus.io_pipeline import FrameCallback, RxDispatcher
+from runtime.metrics import METRICS
+from runtime.shared_memory import SharedBlock, SharedRing
+from telemetry.records import CAN_EXTENDED_ID, CAN_FRAME_DTYPE, can_record
+
+_RING_DROPPED = METRICS.counter("can_shm_dropped_total", "CAN frames dropped from a full shared-memory ring")
+
+# Receive filters the decision process asks the CAN I/O process for, per channel.
+MAX_FILTER_IDS = 64
+FILTER_DTYPE = np.dtype([
+    ("count", "<u4"),
+    ("arbitration_id", "<u4", (MAX_FILTER_IDS,)),
+    ("extended", "u1", (MAX_FILTER_IDS,)),
+])
+
+
+def segment_names(prefix: str, channel: str) -> tuple[str, str, str]:
+    """
+    Shared-memory names of `channel`'s (RX ring, TX ring, filter block).
+    """
+    return f"{prefix}-{channel}-rx", f"{prefix}-{channel}-tx", f"{prefix}-{channel}-filters"
+
+
+def _message(record: np.void) -> can.Message:
+    dlc = int(record["dlc"])
+    return can.Message(timestamp=float(record["timestamp"]), arbitration_id=int(record["arbitration_id"]),
+                       is_extended_id=bool(record["flags"] & CAN_EXTENDED_ID),
+                       data=record["data"][:dlc].tobytes())
+
+
+class _SharedChannel:
+
+    def __init__(self, prefix: str, channel: str, ring_capacity: int):
+        rx_name, tx_name, filters_name = segment_names(prefix, channel)
+        self.rx = SharedRing(rx_name, CAN_FRAME_DTYPE, ring_capacity, create=True)
+        self.tx = SharedRing(tx_name, CAN_FRAME_DTYPE, ring_capacity, create=True)
+        self.filters_block = SharedBlock(filters_name, FILTER_DTYPE, create=True)
+        self.dispatcher = RxDispatcher(maxsize=None)
+        self.filters: dict[object, list[tuple[int, bool]]] = {}  # owner -> ids
+        self.tx_lock = Lock()
+        self.tx_dropped = 0
+
+    def publish_filters(self) -> None:
+        ids = sorted({pair for ids in self.filters.values() for pair in ids})
+        if len(ids) > MAX_FILTER_IDS:
+            raise ValueError(f"At most {MAX_FILTER_IDS} receive IDs per shared channel, got {len(ids)}")
+        record = np.zeros(1, dtype=FILTER_DTYPE)[0]
+        record["count"] = len(ids)
+        for i, (can_id, extended) in enumerate(ids):
+            record["arbitration_id"][i] = can_id
+            record["extended"][i] = extended
+        self.filters_block.write(record)
+
+    def close(self) -> None:
+        self.rx.close()
+        self.tx.close()
+        self.filters_block.close()
+
+
+class SharedBusPool:
+    """
+    The `BusPool` interface for a process that does not own the CAN buses.
+
+    The buses live in the CAN I/O process (`run_can_io`); this side only sees one
+    shared-memory ring per direction and channel, and a block with the receive IDs its
+    drivers subscribed to. `DeviceDriver`s attach to it unchanged, but their callbacks
+    run from `poll()` on the caller's thread instead of on an RX thread, so the decision
+    loop picks up received frames at a point of its own choosing.
+
+    The channels are fixed up front, because the I/O process opens them at start-up.
+
+    Args:
+        prefix (str): Shared-memory name prefix, unique per running instance.
+        channels (list[str]): CAN channels served by the I/O process.
+        ring_capacity (int, optional): Frames per ring and direction. Defaults to 1024.
+    """
+
+    def __init__(self, prefix: str, channels: list[str], ring_capacity: int = 1024):
+        self.prefix = prefix
+        self._channels: dict[str, _SharedChannel] = {}
+        self._lock = Lock()
+        try:
+            for channel in channels:
+                self._channels[channel] = _SharedChannel(prefix, channel, ring_capacity)
+        except BaseException:
+            self.shutdown()
+            raise
+
+    @property
+    def channels(self) -> list[str]:
+        return list(self._channels)
+
+    def _channel(self, channel: str) -> _SharedChannel:
+        opened = self._channels.get(channel)
+        if opened is None:
+            raise ValueError(f"Channel '{channel}' is not served by the CAN I/O process ({self.channels})")
+        return opened
+
+    def subscribe(self, channel: str, owner, ids: list[tuple[int, bool]], callback: FrameCallback) -> None:
+        """
+        Call `callback(message)` from `poll()` for every frame with one of `ids`
+        (`(arbitration_id, is_extended_id)` pairs), and let those IDs through the bus filter.
+        """
+        opened = self._channel(channel)
+        with self._lock:
+            opened.filters[owner] = list(ids)
+            opened.publish_filters()
+            for can_id, _ in ids:
+                opened.dispatcher.add_callback(can_id, callback)
+
+    def unsubscribe(self, channel: str, owner, ids: list[tuple[int, bool]], callback: FrameCallback) -> None:
+        opened = self._channels.get(channel)
+        if opened is None:
+            return
+        with self._lock:
+            if opened.filters.pop(owner, None) is None:
+                return
+            for can_id, _ in ids:
+                opened.dispatcher.remove_callback(can_id, callback)
+            opened.publish_filters()
+
+    def add_tap(self, channel: str, callback: FrameCallback) -> None:
+        """
+        Call `callback` from `poll()` for every frame received on `channel`.
+        Only sees what the drivers' filters let through.
+        """
+        self._channel(channel).dispatcher.add_callback(None, callback)
+
+    def send(self, channel: str, message: can.Message) -> bool:
+        """
+        Hand a frame to the I/O process. Never blocks; False if the TX ring is full.
+        """
+        opened = self._channel(channel)
+        with opened.tx_lock:  # The ring takes one producer; drivers may send from several threads.
+            sent = opened.tx.put(can_record(message, rx=False))
+        if not sent:
+            opened.tx_dropped += 1
+            _RING_DROPPED.inc()
+            logger.warning(f"CAN TX ring of '{channel}' full, dropping frame {message.arbitration_id:#x}")
+        return sent
+
+    def poll(self, max_frames: Optional[int] = None) -> int:
+        """
+        Dispatch the frames received since the last call (at most `max_frames` per channel).
+        Returns the number of frames dispatched.
+        """
+        dispatched = 0
+        for opened in self._channels.values():
+            for record in opened.rx.drain(max_frames):
+                opened.dispatcher.on_message_received(_message(record))
+                dispatched += 1
+        return dispatched
+
+    def shutdown(self) -> None:
+        with self._lock:
+            channels, self._channels = self._channels, {}
+        for opened in channels.values():
+            opened.close()
+
+
+class _ForwardedChannel:
+    """
+    I/O-process side of one channel: RX frames go into the ring, the ring's TX frames onto the bus.
+    """
+
+    def __init__(self, pool: BusPool, prefix: str, channel: str):
+        rx_name, tx_name, filters_name = segment_names(prefix, channel)
+        self.pool = pool
+        self.channel = channel
+        self.rx = SharedRing(rx_name, CAN_FRAME_DTYPE)
+        self.tx = SharedRing(tx_name, CAN_FRAME_DTYPE)
+        self.filters_block = SharedBlock(filters_name, FILTER_DTYPE)
+        self.filters_sequence = 0
+        self.ids: list[tuple[int, bool]] = []
+        pool.bus(channel)
+
+    def _forward(self, message: can.Message) -> None:
+        # Runs on the channel's RX thread, the only producer of the ring.
+        if not self.rx.put(can_record(message)):
+            _RING_DROPPED.inc()
+
+    def sync_filters(self) -> None:
+        sequence = self.filters_block.sequence
+        if sequence == self.filters_sequence:
+            return
+        record = self.filters_block.read()
+        self.filters_sequence = sequence
+        count = int(record["count"])
+        ids = [(int(can_id), bool(extended))
+               for can_id, extended in zip(record["arbitration_id"][:count], record["extended"][:count])]
+
+        self.pool.unsubscribe(self.channel, self, self.ids, self._forward)
+        self.ids = ids
+        if ids:
+            self.pool.subscribe(self.channel, self, ids, self._forward)
+        logger.debug("Forwarding {} IDs on '{}'", len(ids), self.channel)
+
+    def send_pending(self, max_frames: int) -> int:
+        records = self.tx.drain(max_frames)
+        for record in records:
+            self.pool.send(self.channel, _message(record))
+        return len(records)
+
+    def close(self) -> None:
+        self.rx.close()
+        self.tx.close()
+        self.filters_block.close()
+
+
+def run_can_io(prefix: str, channels: list[str], stop, interface: str = "virtual", bitrate: int = 500000,
+               idle_sleep: float = 0.001, batch_size: int = 32, **bus_kwargs) -> None:
+    """
+    Body of the CAN I/O process: owns the buses and moves frames between them and the
+    shared-memory rings created by a `SharedBusPool` with the same `prefix` and `channels`.
+    Returns once `stop` (a `multiprocessing.Event`) is set, after sending what is left in the TX rings.
+    """
+    pool = BusPool(interface=interface, bitrate=bitrate, tx_batch_size=batch_size, **bus_kwargs)
+    forwarded = []
+    try:
+        for channel in channels:
+            forwarded.append(_ForwardedChannel(pool, prefix, channel))
+        logger.info(f"CAN I/O serving {channels} ({interface})")
+
+        while not stop.is_set():
+            busy = False
+            for channel in forwarded:
+                channel.sync_filters()
+                busy |= channel.send_pending(batch_size) > 0
+            if not busy:
+                time.sleep(idle_sleep)
+
+        # Frames queued right before the stop (e.g. the engine-off command) still go out.
+        for channel in forwarded:
+            while channel.send_pending(batch_size):
+                pass
+    finally:
+        pool.shutdown()
+        for channel in forwarded:
+            channel.close()
@@ -0,0 +1,231 @@
+"""Record CAN traffic to a trace file and replay it onto a (virtual) bus.
+
+Three trace formats, picked by file extension:
+
+- `.blf` / `.asc`: python-can's Vector formats, readable by CANalyzer and friends.
+- anything else: the compact binary format of the telemetry log, i.e. a chunk header
+  followed by packed `CAN_FRAME_DTYPE` records (22 bytes per frame). A `can-*.tlm`
+  chunk written by `TelemetryRecorder` is a valid trace, and a trace is memory-mapped,
+  not parsed, when replayed.
+"""
+
+import os
+import time
+from threading import Event, Lock, Thread
+from typing import Iterator, Optional
+
+import can
+import numpy as np
+from loguru import logger
+
+from runtime.metrics import METRICS
+from telemetry.records import (CAN_EXTENDED_ID, CAN_FRAME_DTYPE, CAN_RX, HEADER_SIZE, can_record, pack_header,
+                               unpack_header)
+
+_FRAMES_REPLAYED = METRICS.counter("can_frames_replayed_total", "CAN frames replayed from a trace")
+
+VECTOR_FORMATS = (".blf", ".asc")
+TRACE_STREAM = "can"
+
+
+def _is_vector(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in VECTOR_FORMATS
+
+
+def record_message(record: np.void) -> can.Message:
+    """
+    A `can.Message` from a `CAN_FRAME_DTYPE` record.
+    """
+    flags = int(record["flags"])
+    return can.Message(
+        timestamp=float(record["timestamp"]),
+        arbitration_id=int(record["arbitration_id"]),
+        is_extended_id=bool(flags & CAN_EXTENDED_ID),
+        is_rx=bool(flags & CAN_RX),
+        data=record["data"][:record["dlc"]].tobytes(),
+    )
+
+
+class TraceRecorder(can.Listener):
+    """
+    Writes every frame it is given to a trace file.
+
+    A `can.Listener`, so it can be added to a `can.Notifier`, passed to `BusPool.add_tap`
+    or called directly (`recorder(message)`, e.g. for sent frames). The compact format is
+    buffered in a preallocated record array and written `buffer_records` frames at a time.
+
+    Args:
+        path (str): Trace file; `.blf` and `.asc` select python-can's writers.
+        buffer_records (int, optional): Frames per write of the compact format. Defaults to 1024.
+    """
+
+    def __init__(self, path: str, buffer_records: int = 1024):
+        self.path = path
+        self.frames = 0
+        self._lock = Lock()
+        self._writer: Optional[can.Listener] = None
+        self._file = None
+
+        if _is_vector(path):
+            self._writer = can.Logger(path)
+        else:
+            self._file = open(path, "wb")
+            self._file.write(pack_header(TRACE_STREAM, CAN_FRAME_DTYPE))
+            self._buffer = np.zeros(buffer_records, dtype=CAN_FRAME_DTYPE)
+            self._pending = 0
+        logger.info(f"Recording CAN trace to {path}")
+
+    @property
+    def closed(self) -> bool:
+        return self._writer is None and self._file is None
+
+    def on_message_received(self, msg: can.Message) -> None:
+        with self._lock:
+            if self.closed:
+                return
+            self.frames += 1
+            if self._writer is not None:
+                self._writer.on_message_received(msg)
+                return
+
+            self._buffer[self._pending] = can_record(msg, rx=msg.is_rx)
+            self._pending += 1
+            if self._pending == len(self._buffer):
+                self._write_pending()
+
+    def _write_pending(self) -> None:
+        # Caller holds the lock.
+        self._file.write(memoryview(self._buffer[:self._pending]).cast("B"))
+        self._pending = 0
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._write_pending()
+                self._file.flush()
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                self._writer.stop()
+                self._writer = None
+            elif self._file is not None:
+                self._write_pending()
+                self._file.close()
+                self._file = None
+        logger.info(f"CAN trace {self.path}: {self.frames} frames")
+
+
+def load_trace(path: str) -> np.ndarray:
+    """
+    A trace as a `CAN_FRAME_DTYPE` array. Compact traces are memory-mapped (zero copy,
+    a trailing partial record is left out); BLF/ASC are converted.
+    """
+    if _is_vector(path):
+        with can.LogReader(path) as reader:
+            return np.array([can_record(message, rx=message.is_rx) for message in reader], dtype=CAN_FRAME_DTYPE)
+
+    with open(path, "rb") as file:
+        stream, itemsize = unpack_header(file.read(HEADER_SIZE))
+    if stream != TRACE_STREAM or itemsize != CAN_FRAME_DTYPE.itemsize:
+        raise ValueError(f"{path}: not a CAN trace (stream '{stream}', record size {itemsize})")
+
+    count = (os.path.getsize(path) - HEADER_SIZE) // itemsize
+    if count == 0:
+        return np.empty(0, dtype=CAN_FRAME_DTYPE)
+    return np.memmap(path, dtype=CAN_FRAME_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def read_trace(path: str) -> Iterator[can.Message]:
+    """
+    The frames of a trace as `can.Message` objects, in order.
+    """
+    for record in load_trace(path):
+        yield record_message(record)
+
+
+class TraceReplayer(Thread):
+    """
+    Pushes a recorded trace onto a bus, by default a `virtual` one, on a background thread,
+    so the decoders and control stack listening on that channel see the race again.
+
+    Frames keep their recorded spacing divided by `speed`: 1.0 is real time, 10.0 ten
+    times faster, None as fast as the bus takes them. Only received frames (`CAN_RX`) are
+    replayed unless `include_tx` is set, so our own old commands are not sent again.
+
+    Args:
+        trace (str | np.ndarray): Trace file, or `CAN_FRAME_DTYPE` records.
+        channel (str, optional): Channel to open a bus on. Defaults to "replay".
+        interface (str, optional): python-can interface of that bus. Defaults to 'virtual'.
+        speed (float, optional): Time scale, None for no pacing. Defaults to 1.0.
+        include_tx (bool, optional): Also replay frames recorded as sent. Defaults to False.
+        bus (can.BusABC, optional): Send on this bus instead of opening one (not shut down here).
+        clock / sleep: Injectable for tests. Default to `time.monotonic` / `Event.wait`.
+    """
+
+    def __init__(self, trace: str | np.ndarray, channel: str = "replay", interface: str = "virtual",
+                 speed: Optional[float] = 1.0, include_tx: bool = False, bus: Optional[can.BusABC] = None,
+                 clock=time.monotonic, sleep=None):
+        super().__init__(name="can-replay", daemon=True)
+        if speed is not None and speed <= 0:
+            raise ValueError(f"Replay speed must be positive or None, got {speed}")
+
+        records = load_trace(trace) if isinstance(trace, str) else trace
+        if not include_tx:
+            records = records[(records["flags"] & CAN_RX) != 0]
+        self.records = records
+        self.speed = speed
+        self.sent = 0
+        self.failed = 0
+        self.finished = Event()
+
+        self._own_bus = bus is None
+        self.bus = bus if bus is not None else can.Bus(channel=channel, interface=interface)
+        self._clock = clock
+        self._stop_event = Event()
+        self._sleep = sleep or self._stop_event.wait
+
+    def run(self) -> None:
+        try:
+            self.replay()
+        finally:
+            self.finished.set()
+
+    def replay(self) -> int:
+        """
+        Replay on the calling thread. Returns the number of frames sent.
+        """
+        if len(self.records) == 0:
+            return 0
+
+        # Offsets from the first frame, on the replay clock; computed for the whole trace at once.
+        due = None
+        if self.speed is not None:
+            due = (self.records["timestamp"] - self.records["timestamp"][0]) / self.speed
+        start = self._clock()
+        sent = 0
+
+        for index, record in enumerate(self.records):
+            if self._stop_event.is_set():
+                break
+            if due is not None:
+                delay = due[index] - (self._clock() - start)
+                if delay > 0:
+                    self._sleep(delay)
+
+            try:
+                self.bus.send(record_message(record))
+                sent += 1
+            except can.CanError as e:
+                self.failed += 1
+                logger.error(f"Replay send failed: {e}")
+        self.sent += sent
+        _FRAMES_REPLAYED.inc(sent)
+        return sent
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=timeout)
+        if self._own_bus:
+            self.bus.shutdown()
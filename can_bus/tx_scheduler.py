@@ -0,0 +1,133 @@
+import time
+from typing import Callable, NamedTuple, Optional
+
+import can
+
+from runtime.metrics import METRICS
+
+_SUPPRESSED = METRICS.counter("can_tx_suppressed_total", "Unchanged CAN frames not sent again")
+_DEFERRED = METRICS.counter("can_tx_deferred_total", "CAN frames held back by their minimum interval")
+
+
+class TxPolicy(NamedTuple):
+    """
+    How one arbitration ID may be sent.
+
+    min_interval: Seconds between two sends of the ID. A newer payload submitted sooner
+        waits in the scheduler (only the latest one) until `flush`.
+    heartbeat: An unchanged payload is sent again only after this many seconds, so the
+        device's command watchdog stays fed. None never repeats it, 0 never suppresses.
+    priority: Order of frames due in the same `flush`; lower goes first, as on the bus.
+    """
+    min_interval: float = 0.0
+    heartbeat: Optional[float] = 1.0
+    priority: int = 0
+
+
+class TxScheduler:
+    """
+    Transmit gate in front of a send function, keyed by arbitration ID.
+
+    Keeps the last payload sent per ID and drops repeats of it until its heartbeat is
+    due, and holds back IDs sent again within their minimum interval. Commands recomputed
+    every control tick then only take bus time when they change, which leaves the
+    bandwidth to the frames that do. Not thread-safe: submit and flush from one thread.
+
+    Args:
+        send (callable): `send(message) -> bool`, puts a frame on the bus (or its TX queue).
+        default_policy (TxPolicy, optional): For IDs without their own. Defaults to `TxPolicy()`.
+        clock (callable, optional): Defaults to `time.monotonic`.
+    """
+
+    def __init__(self, send: Callable[[can.Message], bool], default_policy: TxPolicy = TxPolicy(),
+                 clock: Callable[[], float] = time.monotonic):
+        self._send = send
+        self.default_policy = default_policy
+        self._clock = clock
+        self._policies: dict[int, TxPolicy] = {}
+        self._last: dict[int, tuple[bytes, float]] = {}  # ID -> (payload, sent at)
+        self._pending: dict[int, can.Message] = {}
+        self.sent = 0
+        self.suppressed = 0
+        self.deferred = 0
+
+    def set_policy(self, arbitration_id: int, policy: TxPolicy) -> None:
+        self._policies[arbitration_id] = policy
+
+    def policy(self, arbitration_id: int) -> TxPolicy:
+        return self._policies.get(arbitration_id, self.default_policy)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def submit(self, message: can.Message) -> bool:
+        """
+        Send `message` now if its policy allows. Returns True if it was sent; False if it
+        was suppressed as unchanged, held back for `flush`, or refused by `send`.
+        The message must not be modified afterwards.
+        """
+        key = message.arbitration_id
+        last = self._last.get(key)
+        if last is None:
+            return self._transmit(message, self._clock())
+
+        policy = self.policy(key)
+        now = self._clock()
+        payload, sent_at = last
+        if bytes(message.data) == payload:
+            # The device already has this; a newer value waiting for its slot is obsolete.
+            self._pending.pop(key, None)
+            if policy.heartbeat is None or now - sent_at < policy.heartbeat:
+                self.suppressed += 1
+                _SUPPRESSED.inc()
+                return False
+
+        if now - sent_at < policy.min_interval:
+            if key not in self._pending:
+                self.deferred += 1
+                _DEFERRED.inc()
+            self._pending[key] = message
+            return False
+
+        self._pending.pop(key, None)
+        return self._transmit(message, now)
+
+    def flush(self, max_frames: Optional[int] = None) -> int:
+        """
+        Send the held-back frames whose interval has passed, highest priority first
+        (at most `max_frames`; the rest stay for the next call). Returns the number sent.
+        """
+        if not self._pending:
+            return 0
+
+        now = self._clock()
+        due = [key for key in self._pending
+               if now - self._last[key][1] >= self.policy(key).min_interval]
+        due.sort(key=lambda key: (self.policy(key).priority, key))
+        if max_frames is not None:
+            due = due[:max_frames]
+
+        sent = 0
+        for key in due:
+            sent += self._transmit(self._pending.pop(key), now)
+        return sent
+
+    def forget(self, arbitration_id: Optional[int] = None) -> None:
+        """
+        Forget what was sent (for one ID, or all), e.g. after the device restarted,
+        so the next submit goes out whatever it holds.
+        """
+        if arbitration_id is None:
+            self._last.clear()
+            self._pending.clear()
+        else:
+            self._last.pop(arbitration_id, None)
+            self._pending.pop(arbitration_id, None)
+
+    def _transmit(self, message: can.Message, now: float) -> bool:
+        if not self._send(message):
+            return False
+        self._last[message.arbitration_id] = (bytes(message.data), now)
+        self.sent += 1
+        return True
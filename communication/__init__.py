@@ -0,0 +1,7 @@
+# __init__.py
+
+from .spool import DiskSpool
+from .uplink import Uplink
+from .server import UplinkServer
+
+__all__ = ["DiskSpool", "Uplink", "UplinkServer"]
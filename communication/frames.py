@@ -0,0 +1,114 @@
+# frames.py
+"""Wire format of the uplink.
+
+A frame is one batch of fixed-width telemetry records (see `telemetry.records`) of a
+single stream, compressed as a block:
+
+    header (HEADER.size bytes) | compressed records (payload_len bytes)
+
+The receiver answers every frame with its 4-byte sequence number (ACK) once stored.
+(session, sequence) identifies a frame, so a frame resent after a lost ACK can be dropped.
+"""
+
+import socket
+import struct
+import zlib
+from typing import NamedTuple
+import numpy as np
+
+from telemetry.records import STREAM_DTYPES
+
+try:
+    import zstandard
+except ImportError:  # Optional; zlib is always available.
+    zstandard = None
+
+MAGIC = b"SBUP"
+VERSION = 1
+
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+# magic, version, codec, stream, session, sequence, record count, payload length
+HEADER = struct.Struct("<4sBB8sIIII")
+ACK = struct.Struct("<I")
+
+
+class Frame(NamedTuple):
+    stream: str
+    session: int
+    sequence: int
+    records: np.ndarray
+
+
+def default_codec() -> int:
+    return CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+
+
+def compress(data: bytes, codec: int) -> bytes:
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if codec == CODEC_ZLIB:
+        return zlib.compress(data, 6)
+    return bytes(data)
+
+
+def decompress(data: bytes, codec: int) -> bytes:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("Frame is zstd compressed, but 'zstandard' is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    if codec == CODEC_RAW:
+        return data
+    raise ValueError(f"Unknown uplink codec {codec}")
+
+
+def encode_frame(stream: str, records: np.ndarray, session: int, sequence: int, codec: int) -> bytes:
+    payload = compress(memoryview(np.ascontiguousarray(records)).cast("B"), codec)
+    header = HEADER.pack(MAGIC, VERSION, codec, stream.encode(), session, sequence, len(records), len(payload))
+    return header + payload
+
+
+def parse_header(header: bytes) -> tuple[str, int, int, int, int, int]:
+    """
+    Returns (stream, codec, session, sequence, count, payload length).
+    """
+    magic, version, codec, stream, session, sequence, count, payload_len = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"Not an uplink frame (magic {magic!r})")
+    if version != VERSION:
+        raise ValueError(f"Unsupported uplink frame version {version}")
+    return stream.rstrip(b"\0").decode(), codec, session, sequence, count, payload_len
+
+
+def decode_frame(header: bytes, payload: bytes) -> Frame:
+    stream, codec, session, sequence, count, _ = parse_header(header)
+    dtype = STREAM_DTYPES.get(stream)
+    if dtype is None:
+        raise ValueError(f"Unknown telemetry stream '{stream}'")
+
+    records = np.frombuffer(decompress(payload, codec), dtype=dtype)
+    if len(records) != count:
+        raise ValueError(f"Frame {sequence} holds {len(records)} records, header says {count}")
+    return Frame(stream, session, sequence, records)
+
+
+def recv_exactly(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            raise ConnectionError("Connection closed mid-frame")
+        received += n
+    return bytes(buffer)
+
+
+def read_frame(sock: socket.socket) -> Frame:
+    header = recv_exactly(sock, HEADER.size)
+    payload_len = parse_header(header)[5]
+    return decode_frame(header, recv_exactly(sock, payload_len))
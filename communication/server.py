@@ -0,0 +1,110 @@
+# server.py
+
+import socket
+import socketserver
+from collections import defaultdict
+from threading import Lock, Thread
+import numpy as np
+from loguru import logger
+
+from .frames import ACK, read_frame
+
+
+class _FrameHandler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        server: UplinkServer = self.server
+        server.track(self.request, True)
+        try:
+            self._serve(server)
+        finally:
+            server.track(self.request, False)
+
+    def _serve(self, server: "UplinkServer"):
+        while True:
+            try:
+                frame = read_frame(self.request)
+            except (ConnectionError, OSError):
+                return
+            except ValueError:
+                logger.exception("Bad uplink frame from {}", self.client_address)
+                return
+
+            server.store(frame)
+            self.request.sendall(ACK.pack(frame.sequence))
+
+
+class UplinkServer(socketserver.ThreadingTCPServer):
+    """
+    Local stand-in for the shore side of the uplink: stores received records per
+    stream in memory and acknowledges every frame. Duplicates are acked but not stored.
+
+    Args:
+        address (tuple[str, int], optional): Port 0 picks a free port, see `address`.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int] = ("127.0.0.1", 0)):
+        super().__init__(address, _FrameHandler)
+        self._records: dict[str, list[np.ndarray]] = defaultdict(list)
+        self._seen: set[tuple[int, int]] = set()
+        self._connections: set[socket.socket] = set()
+        self._lock = Lock()
+        self._thread = None
+
+        self.frames = 0
+        self.duplicates = 0
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self.server_address[:2]
+
+    def track(self, connection: socket.socket, alive: bool) -> None:
+        with self._lock:
+            if alive:
+                self._connections.add(connection)
+            else:
+                self._connections.discard(connection)
+
+    def store(self, frame) -> None:
+        with self._lock:
+            key = (frame.session, frame.sequence)
+            if key in self._seen:
+                self.duplicates += 1
+                return
+            self._seen.add(key)
+            self._records[frame.stream].append(frame.records)
+            self.frames += 1
+
+    def records(self, stream: str) -> np.ndarray:
+        """
+        Every record received on `stream`, in arrival order.
+        """
+        with self._lock:
+            chunks = list(self._records.get(stream, ()))
+        if not chunks:
+            return np.empty(0)
+        return np.concatenate(chunks)
+
+    def start(self) -> "UplinkServer":
+        self._thread = Thread(target=self.serve_forever, name="uplink-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop listening and drop every client, like the link going down.
+        """
+        self.shutdown()
+        self.server_close()
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,93 @@
+# spool.py
+
+import os
+from bisect import bisect_right, insort
+from loguru import logger
+
+SUFFIX = ".frame"
+
+
+class DiskSpool:
+    """
+    Bounded, on-disk FIFO of encoded frames, keyed by sequence number.
+
+    One file per frame, written to a temporary name and renamed, so a power cut
+    leaves either the whole frame or nothing. Frames survive a restart. Once the
+    spool holds more than `max_bytes`, the oldest frames are dropped: during a long
+    outage the latest telemetry is the most useful.
+
+    Args:
+        directory (str): Created if missing.
+        max_bytes (int, optional): Defaults to 64 MiB.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.dropped = 0
+
+        self._sizes: dict[int, int] = {}
+        for name in os.listdir(directory):
+            if name.endswith(SUFFIX) and name[:-len(SUFFIX)].isdigit():
+                self._sizes[int(name[:-len(SUFFIX)])] = os.path.getsize(os.path.join(directory, name))
+            elif name.endswith(".tmp"):
+                os.remove(os.path.join(directory, name))  # Interrupted write
+
+        self._sequences = sorted(self._sizes)
+        self.nbytes = sum(self._sizes.values())
+
+    def __len__(self) -> int:
+        return len(self._sequences)
+
+    def __contains__(self, sequence: int) -> bool:
+        return sequence in self._sizes
+
+    @property
+    def sequences(self) -> list[int]:
+        return list(self._sequences)
+
+    def _path(self, sequence: int) -> str:
+        return os.path.join(self.directory, f"{sequence:010d}{SUFFIX}")
+
+    def put(self, sequence: int, frame: bytes) -> None:
+        path = self._path(sequence)
+        with open(path + ".tmp", "wb") as file:
+            file.write(frame)
+        os.replace(path + ".tmp", path)
+
+        if sequence not in self._sizes:
+            insort(self._sequences, sequence)
+        else:
+            self.nbytes -= self._sizes[sequence]
+        self._sizes[sequence] = len(frame)
+        self.nbytes += len(frame)
+
+        while self.nbytes > self.max_bytes and len(self._sequences) > 1:
+            oldest = self._sequences[0]
+            self.remove(oldest)
+            self.dropped += 1
+            logger.warning("Uplink spool full, dropped frame {}", oldest)
+
+    def get(self, sequence: int) -> bytes:
+        with open(self._path(sequence), "rb") as file:
+            return file.read()
+
+    def next_after(self, sequence: int) -> int | None:
+        """
+        Oldest spooled sequence number greater than `sequence`, or None.
+        """
+        index = bisect_right(self._sequences, sequence)
+        return self._sequences[index] if index < len(self._sequences) else None
+
+    def remove(self, sequence: int) -> None:
+        size = self._sizes.pop(sequence, None)
+        if size is None:
+            return
+
+        self._sequences.remove(sequence)
+        self.nbytes -= size
+        try:
+            os.remove(self._path(sequence))
+        except FileNotFoundError:
+            pass
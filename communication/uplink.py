@@ -0,0 +1,311 @@
+# uplink.py
+
+import math
+import os
+import socket
+import time
+from collections import deque
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from typing import Optional
+import numpy as np
+from loguru import logger
+
+from telemetry.records import STREAM_DTYPES, can_record, state_record
+from .frames import ACK, default_codec, encode_frame
+from .spool import DiskSpool
+
+
+class Uplink(Thread):
+    """
+    Telemetry uplink over an unreliable link (4G).
+
+    The control loop only calls `submit` / `record_state` / `record_can`, which never
+    block: records go into a bounded queue (oldest dropped when full). This thread
+    groups them into per-stream batches (`batch_records`, or whatever arrived within
+    `batch_interval` seconds), compresses every batch into a frame (see `frames.py`)
+    and sends it over TCP.
+
+    Frames stay in memory until the server acknowledges them. When the link drops,
+    every unacknowledged frame is written to a bounded `DiskSpool`, and new frames go
+    there too until the connection is back. After reconnecting, the spool is drained
+    oldest first, with at most `max_in_flight` unacknowledged frames on the wire, so
+    catching up never floods the link. Reconnects back off exponentially up to `max_backoff`.
+    Delivery is at-least-once; the server drops duplicates by (session, sequence).
+
+    Args:
+        host (str): Server address.
+        port (int): Server port.
+        spool_dir (str): Directory of the on-disk spool.
+        batch_records (int, optional): Max records per frame. Defaults to 200.
+        batch_interval (float, optional): Max seconds a record waits for its batch. Defaults to 1.0.
+        queue_size (int, optional): Max records waiting to be batched. Defaults to 10000.
+        max_spool_bytes (int, optional): Defaults to 64 MiB.
+        max_in_flight (int, optional): Unacknowledged frames on the wire. Defaults to 8.
+        codec (int, optional): `frames.CODEC_*`. Defaults to zstd if installed, zlib otherwise.
+        io_timeout (float, optional): Connect and send timeout, seconds. Defaults to 5.
+        max_backoff (float, optional): Max seconds between reconnect attempts. Defaults to 30.
+    """
+
+    _POLL_INTERVAL = 0.05
+    _MIN_BACKOFF = 0.5
+
+    def __init__(self, host: str, port: int, spool_dir: str, batch_records: int = 200, batch_interval: float = 1.0,
+                 queue_size: int = 10000, max_spool_bytes: int = 64 * 1024 * 1024, max_in_flight: int = 8,
+                 codec: Optional[int] = None, io_timeout: float = 5.0, max_backoff: float = 30.0):
+        super().__init__(name="uplink", daemon=True)
+        self.host = host
+        self.port = port
+        self.batch_records = batch_records
+        self.batch_interval = batch_interval
+        self.max_in_flight = max_in_flight
+        self.codec = default_codec() if codec is None else codec
+        self.io_timeout = io_timeout
+        self.max_backoff = max_backoff
+
+        self.session = int.from_bytes(os.urandom(4), "little")
+        self.spool = DiskSpool(spool_dir, max_spool_bytes)
+        self._sequence = (self.spool.sequences[-1] + 1) if len(self.spool) else 0
+
+        self._queue: Queue[tuple[str, tuple]] = Queue(maxsize=queue_size)
+        self._batches: dict[str, list[tuple]] = {stream: [] for stream in STREAM_DTYPES}
+        self._batch_started: dict[str, float] = {}
+
+        self._pending: deque[tuple[int, bytes]] = deque()          # Encoded, not sent yet
+        self._in_flight: deque[tuple[int, bytes, bool]] = deque()  # Sent, not acked; (seq, frame, spooled)
+        self._spool_cursor = -1
+        self._ack_buffer = bytearray()
+
+        self._sock: Optional[socket.socket] = None
+        self._backoff = self._MIN_BACKOFF
+        self._next_connect = 0.0
+        self._stop_event = Event()
+
+        self.dropped = 0
+        self.frames_sent = 0
+        self.frames_acked = 0
+        self.bytes_sent = 0
+        self.reconnects = 0
+
+    # Producer side (any thread) -------------------------------------------------------
+
+    def submit(self, stream: str, record: tuple) -> bool:
+        """
+        Queue a record (a tuple in the field order of the stream's dtype). Never blocks.
+        Returns False if the queue was full and the oldest record had to be dropped.
+        """
+        if stream not in STREAM_DTYPES:
+            raise KeyError(f"Unknown telemetry stream '{stream}'")
+
+        item = (stream, record)
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except Full:
+            pass
+
+        try:
+            self._queue.get_nowait()
+            self.dropped += 1
+        except Empty:
+            pass
+        try:
+            self._queue.put_nowait(item)
+        except Full:
+            self.dropped += 1
+        return False
+
+    def record_state(self, latitude: float, longitude: float, heading: float = math.nan,
+                     throttle: float = math.nan, rudder: float = math.nan, waypoint: int = -1,
+                     timestamp: Optional[float] = None) -> bool:
+        return self.submit("state", state_record(latitude, longitude, heading, throttle, rudder, waypoint, timestamp))
+
+    def record_can(self, message, rx: bool = True) -> bool:
+        return self.submit("can", can_record(message, rx))
+
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "queued": self._queue.qsize(),
+            "dropped": self.dropped,
+            "frames_sent": self.frames_sent,
+            "frames_acked": self.frames_acked,
+            "bytes_sent": self.bytes_sent,
+            "reconnects": self.reconnects,
+            "in_flight": len(self._in_flight),
+            "spooled_frames": len(self.spool),
+            "spool_bytes": self.spool.nbytes,
+            "spool_dropped": self.spool.dropped,
+        }
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the thread. Whatever is not acknowledged by then is kept in the spool for the next run.
+        """
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    # Uplink thread --------------------------------------------------------------------
+
+    def run(self) -> None:
+        try:
+            while not self._stop_event.is_set():
+                # While frames are on the wire, waiting happens on the socket (in `_pump`).
+                busy = self._sock is not None and (self._in_flight or self._has_unsent())
+                self._collect(0 if busy else self._POLL_INTERVAL)
+                self._seal_batches(force=False)
+
+                if self._sock is None and time.monotonic() >= self._next_connect:
+                    self._connect()
+                if self._sock is not None:
+                    self._pump()
+        finally:
+            self._collect(0)
+            self._seal_batches(force=True)
+            if self._sock is not None:
+                self._pump()
+            self._disconnect()
+            self._spill()
+
+    def _collect(self, timeout: float) -> None:
+        # Wait for the first record only, then take whatever else is already there.
+        try:
+            item = self._queue.get(timeout=timeout) if timeout else self._queue.get_nowait()
+        except Empty:
+            return
+
+        while True:
+            stream, record = item
+            batch = self._batches[stream]
+            if not batch:
+                self._batch_started[stream] = time.monotonic()
+            batch.append(record)
+            if len(batch) >= self.batch_records:
+                self._seal(stream)
+
+            try:
+                item = self._queue.get_nowait()
+            except Empty:
+                return
+
+    def _seal_batches(self, force: bool) -> None:
+        now = time.monotonic()
+        for stream, batch in self._batches.items():
+            if batch and (force or now - self._batch_started[stream] >= self.batch_interval):
+                self._seal(stream)
+
+    def _seal(self, stream: str) -> None:
+        batch = self._batches[stream]
+        records = np.array(batch, dtype=STREAM_DTYPES[stream])
+        batch.clear()
+
+        sequence = self._sequence
+        self._sequence = (self._sequence + 1) & 0xFFFFFFFF
+        frame = encode_frame(stream, records, self.session, sequence, self.codec)
+
+        if self._sock is None:
+            self.spool.put(sequence, frame)
+        else:
+            self._pending.append((sequence, frame))
+
+    def _connect(self) -> None:
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.io_timeout)
+        except OSError as e:
+            self._next_connect = time.monotonic() + self._backoff
+            logger.debug("Uplink connect to {}:{} failed ({}), retry in {:.1f} s", self.host, self.port, e, self._backoff)
+            self._backoff = min(self._backoff * 2, self.max_backoff)
+            return
+
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+        self._backoff = self._MIN_BACKOFF
+        self._spool_cursor = -1
+        self._ack_buffer.clear()
+        self.reconnects += 1
+        logger.info("Uplink connected to {}:{}, {} frames spooled", self.host, self.port, len(self.spool))
+
+    def _disconnect(self) -> None:
+        if self._sock is None:
+            return
+        try:
+            self._sock.close()
+        finally:
+            self._sock = None
+            self._next_connect = time.monotonic() + self._backoff
+        self._spill()
+
+    def _spill(self) -> None:
+        # Everything not acknowledged goes to disk. Spooled in-flight frames are already there.
+        for sequence, frame, spooled in self._in_flight:
+            if not spooled:
+                self.spool.put(sequence, frame)
+        self._in_flight.clear()
+
+        for sequence, frame in self._pending:
+            self.spool.put(sequence, frame)
+        self._pending.clear()
+
+    def _has_unsent(self) -> bool:
+        return bool(self._pending) or self.spool.next_after(self._spool_cursor) is not None
+
+    def _next_frame(self) -> Optional[tuple[int, bytes, bool]]:
+        # Spooled frames are older than anything pending, so they go first.
+        sequence = self.spool.next_after(self._spool_cursor)
+        if sequence is not None:
+            self._spool_cursor = sequence
+            return sequence, self.spool.get(sequence), True
+        if self._pending:
+            sequence, frame = self._pending.popleft()
+            return sequence, frame, False
+        return None
+
+    def _pump(self) -> None:
+        try:
+            while len(self._in_flight) < self.max_in_flight:
+                item = self._next_frame()
+                if item is None:
+                    break
+                sequence, frame, spooled = item
+                # Counted in flight before sending: a half-sent frame is resent from the spool.
+                self._in_flight.append(item)
+                self._sock.sendall(frame)
+                self.frames_sent += 1
+                self.bytes_sent += len(frame)
+
+            if self._in_flight:
+                # Wait a little for ACKs if there is nothing else to do.
+                window_full = len(self._in_flight) >= self.max_in_flight
+                self._read_acks(self._POLL_INTERVAL if window_full or not self._has_unsent() else 0)
+        except OSError as e:
+            logger.warning("Uplink to {}:{} lost: {}", self.host, self.port, e)
+            self._disconnect()
+
+    def _read_acks(self, timeout: float) -> None:
+        self._sock.settimeout(timeout)
+        try:
+            data = self._sock.recv(ACK.size * self.max_in_flight)
+        except (BlockingIOError, TimeoutError):
+            return
+        finally:
+            self._sock.settimeout(self.io_timeout)
+
+        if not data:
+            raise ConnectionError("Server closed the connection")
+        self._ack_buffer += data
+
+        while len(self._ack_buffer) >= ACK.size and self._in_flight:
+            (acked,) = ACK.unpack_from(self._ack_buffer)
+            del self._ack_buffer[:ACK.size]
+
+            sequence, _, spooled = self._in_flight.popleft()
+            if acked != sequence:
+                raise ConnectionError(f"ACK for frame {acked}, expected {sequence}")
+            if spooled:
+                self.spool.remove(sequence)
+            self.frames_acked += 1
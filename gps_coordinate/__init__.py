@@ -1,8 +1,24 @@
 # __init__.py
 
-from .base import GPSPoint
+from importlib import import_module
+
+from .base import GPSPoint, haversine_many
 from .ship_position import ShipPosition
 from .buoy import BuoyPosition
 from .objective import ObjectiveCoordinate
+from .coordinate_array import CoordinateArray, CoordinateView
+from .buoy_index import BuoyIndex
+
+# Imported on first use: the planner pulls in shapely, which the position/control path does not need.
+_LAZY = {"PathPlanner": ".path_planner"}
+
+__all__ = ["GPSPoint", "haversine_many", "ShipPosition", "BuoyPosition", "ObjectiveCoordinate",
+           "CoordinateArray", "CoordinateView", "BuoyIndex", "PathPlanner"]
+
 
-__all__ = ["GPSPoint", "ShipPosition", "BuoyPosition", "ObjectiveCoordinate"]
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
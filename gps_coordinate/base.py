@@ -3,19 +3,11 @@
 from threading import Lock
 from math import radians, cos, sin, asin, sqrt
 from loguru import logger
+import numpy as np
 import warnings
-import os
 
-# Setup logging
-LOG_PATH = os.path.abspath(os.path.join("logging", "coordinates.log"))
 
-logger.add(
-    LOG_PATH,
-    level="DEBUG",
-    rotation="500 KB",
-    backtrace=True,
-    diagnose=True
-)
+EARTH_RADIUS_M = 6371000  # Earth radius in meters
 
 
 class GPSPoint:
@@ -24,8 +16,7 @@ class GPSPoint:
         self.latitude = latitude
         self.longitude = longitude
 
-        msg = f"Initialized GPSPoint: ({self.latitude}, {self.longitude})"
-        logger.debug(msg)
+        logger.debug("Initialized GPSPoint: ({}, {})", latitude, longitude)
 
     def get_coordinates(self):
         with self._lock:
@@ -35,7 +26,7 @@ class GPSPoint:
         with self._lock:
             lat, lon = coords.get_coordinates()
 
-            logger.debug(f"Setting coordinates from ({self.latitude}, {self.longitude}) to ({lat}, {lon})")
+            logger.debug("Setting coordinates from ({}, {}) to ({}, {})", self.latitude, self.longitude, lat, lon)
             self.latitude = lat
             self.longitude = lon
 
@@ -48,8 +39,7 @@ class GPSPoint:
                       Use the more OOP 'set_coordinates' instead.", DeprecationWarning)
 
         with self._lock:
-            msg = f"Setting coordinates from ({self.latitude}, {self.longitude}) to ({lat}, {lon})"
-            logger.debug(msg)
+            logger.debug("Setting coordinates from ({}, {}) to ({}, {})", self.latitude, self.longitude, lat, lon)
             self.latitude = lat
             self.longitude = lon
 
@@ -58,22 +48,53 @@ class GPSPoint:
         IDK hogy kell-e, de itt van.
         """
 
-        logger.debug(f"Calculating distance from {self} to {other}")
-
-        lat1 = radians(self.latitude)
-        lon1 = radians(self.longitude)
-        lat2 = radians(other.latitude)
-        lon2 = radians(other.longitude)
-
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-
-        a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-        c = 2 * asin(sqrt(a))
-        radius = 6371000  # Earth radius in meters
-        distance = radius * c
-        logger.debug(f"Calculated Haversine distance: {distance:.2f} meters")
+        distance = haversine(self.latitude, self.longitude, other.latitude, other.longitude)
+        logger.debug("Calculated Haversine distance from {} to {}: {:.2f} meters", self, other, distance)
         return distance
 
     def __repr__(self):
         return f"GPSPoint(lat={self.latitude}, lon={self.longitude})"
+
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Haversine distance (in meters) between two (lat, lon) pairs given in degrees.
+    """
+    lat1 = radians(lat1)
+    lon1 = radians(lon1)
+    lat2 = radians(lat2)
+    lon2 = radians(lon2)
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
+    c = 2 * asin(sqrt(a))
+    return EARTH_RADIUS_M * c
+
+
+def haversine_many(origin: GPSPoint, lats, lons) -> np.ndarray:
+    """
+    Vectorized haversine distance (in meters) from `origin` to every (lat, lon) pair.
+
+    Args:
+        origin (GPSPoint): Reference point.
+        lats (array-like): Latitudes in degrees.
+        lons (array-like): Longitudes in degrees.
+
+    Returns:
+        np.ndarray: Distances in meters, same shape as the broadcast inputs.
+    """
+    lat0, lon0 = origin.get_coordinates()
+
+    lat1 = np.radians(lat0)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    lon2 = np.radians(np.asarray(lons, dtype=np.float64))
+
+    dlat = lat2 - lat1
+    dlon = lon2 - np.radians(lon0)
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    # Rounding can push 'a' a hair above 1.0 for antipodal points.
+    c = 2 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+    return EARTH_RADIUS_M * c
@@ -1,20 +1,11 @@
 # buoy.py
 
-import os
+from math import hypot
+from typing import Optional
 from .base import GPSPoint
+from .projection import LocalProjection
 from loguru import logger
 
-# Setup logging
-LOG_PATH = os.path.abspath(os.path.join("logging", "coordinates.log"))
-
-logger.add(
-    LOG_PATH,
-    level="DEBUG",
-    rotation="500 KB",
-    backtrace=True,
-    diagnose=True
-)
-
 
 class BuoyPosition(GPSPoint):
     """
@@ -24,14 +15,22 @@ class BuoyPosition(GPSPoint):
     def __init__(self, latitude: float, longitude: float, radius: float):
         super().__init__(latitude, longitude)
         self.radius = radius
+        # The plane around the buoy, with the coordinates it was built for; see `_projection`.
+        self._plane: Optional[tuple[tuple[float, float], LocalProjection]] = None
+
+        logger.debug("Initialized BuoyPosition at ({}, {}) with radius {}m", latitude, longitude, radius)
 
-        msg = f"Initialized BuoyPosition at ({self.latitude}, {self.longitude}) with radius {self.radius}m"
-        logger.debug(msg)
+    def _projection(self) -> LocalProjection:
+        # Kept on the buoy: a shared LRU would thrash on courses with more buoys than it holds.
+        coordinates = self.get_coordinates()
+        if self._plane is None or self._plane[0] != coordinates:
+            self._plane = (coordinates, LocalProjection(*coordinates))
+        return self._plane[1]
 
     def is_within_radius(self, point: GPSPoint) -> bool:
-        distance = self.haversine_distance(point)
+        # Buoy radii are tens of meters: the plane around the buoy is exact enough.
+        distance = hypot(*self._projection().forward(*point.get_coordinates()))
         result = distance <= self.radius
 
-        msg = f"Checking if point {point} is within {self.radius}m of buoy: {result}"
-        logger.debug(msg)
+        logger.debug("Checking if point {} is within {}m of buoy: {}", point, self.radius, result)
         return result
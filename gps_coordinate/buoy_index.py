@@ -0,0 +1,194 @@
+# buoy_index.py
+
+from collections import defaultdict
+from math import floor, hypot, inf
+from typing import Iterable, Optional
+from loguru import logger
+
+from .base import GPSPoint
+from .buoy import BuoyPosition
+from .projection import LocalProjection
+
+Cell = tuple[int, int]
+
+
+class BuoyIndex:
+    """
+    Spatial hash of buoys on a local east/north plane (meters).
+
+    Buoys are bucketed into square cells of `cell_size` meters, so a query only looks
+    at the cells around the point instead of every buoy on the course. Insert and
+    remove are O(1), which suits buoys being added mid-race.
+
+    Args:
+        buoys (Iterable[BuoyPosition], optional): Bulk load.
+        cell_size (float, optional): Meters. Roughly the typical query distance works best. Defaults to 50.
+        origin (GPSPoint, optional): Plane origin. Defaults to the first buoy added.
+    """
+
+    def __init__(self, buoys: Iterable[BuoyPosition] = (), cell_size: float = 50.0,
+                 origin: Optional[GPSPoint] = None):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+
+        self.cell_size = cell_size
+        self._projection = LocalProjection(*origin.get_coordinates()) if origin is not None else None
+        self._cells: dict[Cell, set[BuoyPosition]] = defaultdict(set)
+        self._entries: dict[BuoyPosition, tuple[float, float, Cell]] = {}
+        # These two never shrink on removal; queries just look a bit further than needed.
+        self._max_radius = 0.0
+        self._cell_bounds: Optional[list[int]] = None  # min_x, min_y, max_x, max_y
+
+        self.extend(buoys)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, buoy: BuoyPosition) -> bool:
+        return buoy in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def _cell(self, east: float, north: float) -> Cell:
+        return floor(east / self.cell_size), floor(north / self.cell_size)
+
+    def _project(self, point: GPSPoint) -> tuple[float, float]:
+        return self._projection.forward(*point.get_coordinates())
+
+    def add(self, buoy: BuoyPosition) -> None:
+        if buoy in self._entries:
+            return
+        if self._projection is None:
+            self._projection = LocalProjection(*buoy.get_coordinates())
+
+        east, north = self._project(buoy)
+        cell = self._cell(east, north)
+        self._cells[cell].add(buoy)
+        self._entries[buoy] = (east, north, cell)
+        self._max_radius = max(self._max_radius, buoy.radius)
+
+        x, y = cell
+        if self._cell_bounds is None:
+            self._cell_bounds = [x, y, x, y]
+        else:
+            bounds = self._cell_bounds
+            bounds[0], bounds[1] = min(bounds[0], x), min(bounds[1], y)
+            bounds[2], bounds[3] = max(bounds[2], x), max(bounds[3], y)
+
+        logger.debug("Indexed buoy {} in cell {}", buoy, cell)
+
+    def extend(self, buoys: Iterable[BuoyPosition]) -> None:
+        for buoy in buoys:
+            self.add(buoy)
+
+    def remove(self, buoy: BuoyPosition) -> None:
+        _, _, cell = self._entries.pop(buoy)
+        bucket = self._cells[cell]
+        bucket.discard(buoy)
+        if not bucket:
+            del self._cells[cell]
+
+    def _candidates(self, east: float, north: float, distance: float):
+        # Clamped to the occupied cells before flooring, so a huge (or infinite) distance stays cheap.
+        size = self.cell_size
+        low_x, low_y, high_x, high_y = self._cell_bounds
+        min_x, max_x = floor(max((east - distance) / size, low_x)), floor(min((east + distance) / size, high_x))
+        min_y, max_y = floor(max((north - distance) / size, low_y)), floor(min((north + distance) / size, high_y))
+        if min_x > max_x or min_y > max_y:
+            return
+
+        if (max_x - min_x + 1) * (max_y - min_y + 1) > len(self._entries):
+            # More cells than buoys (sparse course, long query): checking every buoy is cheaper.
+            yield from self._entries
+            return
+
+        cells = self._cells
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                bucket = cells.get((x, y))
+                if bucket:
+                    yield from bucket
+
+    def within(self, point: GPSPoint, distance_m: float) -> list[tuple[BuoyPosition, float]]:
+        """
+        Buoys whose center is within `distance_m` of `point`, nearest first, with their distances.
+        """
+        if not self._entries:
+            return []
+
+        east, north = self._project(point)
+        found = []
+        for buoy in self._candidates(east, north, distance_m):
+            b_east, b_north, _ = self._entries[buoy]
+            distance = hypot(b_east - east, b_north - north)
+            if distance <= distance_m:
+                found.append((buoy, distance))
+
+        found.sort(key=lambda item: item[1])
+        return found
+
+    def nearest(self, point: GPSPoint, max_distance_m: float = inf) -> Optional[tuple[BuoyPosition, float]]:
+        """
+        Nearest buoy (by center) and its distance, or None if there is none within `max_distance_m`.
+        """
+        if not self._entries:
+            return None
+
+        east, north = self._project(point)
+        cx, cy = self._cell(east, north)
+        best, best_distance = None, inf
+
+        # Search rings of cells outwards. Everything in ring r is at least (r - 1) cells away.
+        ring = 0
+        max_ring = self._max_ring(cx, cy)
+        while ring <= max_ring:
+            if (ring - 1) * self.cell_size > min(best_distance, max_distance_m):
+                break
+
+            for cell in self._ring_cells(cx, cy, ring):
+                for buoy in self._cells.get(cell, ()):
+                    b_east, b_north, _ = self._entries[buoy]
+                    distance = hypot(b_east - east, b_north - north)
+                    if distance < best_distance:
+                        best, best_distance = buoy, distance
+            ring += 1
+
+        if best is None or best_distance > max_distance_m:
+            return None
+        return best, best_distance
+
+    def _max_ring(self, cx: int, cy: int) -> int:
+        # Ring that reaches the farthest occupied cell; bounds the search on sparse courses.
+        min_x, min_y, max_x, max_y = self._cell_bounds
+        return max(abs(cx - min_x), abs(cx - max_x), abs(cy - min_y), abs(cy - max_y))
+
+    @staticmethod
+    def _ring_cells(cx: int, cy: int, ring: int):
+        if ring == 0:
+            yield cx, cy
+            return
+        for x in range(cx - ring, cx + ring + 1):
+            yield x, cy - ring
+            yield x, cy + ring
+        for y in range(cy - ring + 1, cy + ring):
+            yield cx - ring, y
+            yield cx + ring, y
+
+    def violations(self, point: GPSPoint, clearance_m: float = 0.0) -> list[BuoyPosition]:
+        """
+        Buoys whose radius (plus `clearance_m`) contains `point`.
+        """
+        if not self._entries:
+            return []
+
+        east, north = self._project(point)
+        violated = []
+        for buoy in self._candidates(east, north, self._max_radius + clearance_m):
+            b_east, b_north, _ = self._entries[buoy]
+            if hypot(b_east - east, b_north - north) <= buoy.radius + clearance_m:
+                violated.append(buoy)
+        return violated
+
+    def any_violated(self, point: GPSPoint, clearance_m: float = 0.0) -> bool:
+        return bool(self.violations(point, clearance_m))
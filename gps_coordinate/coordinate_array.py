@@ -0,0 +1,175 @@
+# coordinate_array.py
+
+from typing import Iterable, Iterator, Optional
+import numpy as np
+
+from .base import GPSPoint, haversine, haversine_many
+from .projection import LocalProjection
+
+
+COORDINATE_DTYPE = np.dtype([("lat", np.float64), ("lon", np.float64)])
+
+
+class CoordinateView:
+    """
+    Lightweight, read-only view of a single row of a `CoordinateArray`.
+
+    Quacks like a `GPSPoint` (latitude, longitude, get_coordinates, haversine_distance),
+    but holds no lock, no `__dict__` and does not log on construction.
+    """
+
+    __slots__ = ("_data", "_index")
+
+    def __init__(self, data: np.ndarray, index: int):
+        self._data = data
+        self._index = index
+
+    @property
+    def latitude(self) -> float:
+        return float(self._data["lat"][self._index])
+
+    @property
+    def longitude(self) -> float:
+        return float(self._data["lon"][self._index])
+
+    def get_coordinates(self) -> tuple[float, float]:
+        row = self._data[self._index]
+        return float(row["lat"]), float(row["lon"])
+
+    def haversine_distance(self, other) -> float:
+        lat, lon = self.get_coordinates()
+        return haversine(lat, lon, other.latitude, other.longitude)
+
+    def to_gps_point(self) -> GPSPoint:
+        return GPSPoint(*self.get_coordinates())
+
+    def __eq__(self, other) -> bool:
+        if not hasattr(other, "get_coordinates"):
+            return NotImplemented
+        return self.get_coordinates() == other.get_coordinates()
+
+    def __hash__(self) -> int:
+        return hash(self.get_coordinates())
+
+    def __repr__(self):
+        lat, lon = self.get_coordinates()
+        return f"CoordinateView(lat={lat}, lon={lon})"
+
+
+class CoordinateArray:
+    """
+    Compact, growable store of (lat, lon) pairs backed by a structured NumPy array.
+
+    Meant for routes and track logs, where allocating one `GPSPoint` per fix
+    (lock + `__dict__` + log line each) does not scale. Indexing returns a
+    `CoordinateView`, which can be passed anywhere a `GPSPoint` is read.
+    """
+
+    _MIN_CAPACITY = 16
+
+    def __init__(self, lats: Optional[Iterable[float]] = None, lons: Optional[Iterable[float]] = None,
+                 capacity: int = 0):
+        lats = np.asarray([] if lats is None else lats, dtype=np.float64).ravel()
+        lons = np.asarray([] if lons is None else lons, dtype=np.float64).ravel()
+
+        if lats.shape != lons.shape:
+            raise ValueError(f"lats and lons must have the same length ({lats.size} != {lons.size})")
+
+        self._size = lats.size
+        self._data = np.empty(max(capacity, self._size), dtype=COORDINATE_DTYPE)
+        self._data["lat"][:self._size] = lats
+        self._data["lon"][:self._size] = lons
+
+    @classmethod
+    def from_points(cls, points: Iterable) -> "CoordinateArray":
+        """
+        Build from anything exposing `get_coordinates()` (GPSPoint, views, ...).
+        """
+        coords = [p.get_coordinates() for p in points]
+        if not coords:
+            return cls()
+
+        lats, lons = zip(*coords)
+        return cls(lats, lons)
+
+    @property
+    def lats(self) -> np.ndarray:
+        return self._data["lat"][:self._size]
+
+    @property
+    def lons(self) -> np.ndarray:
+        return self._data["lon"][:self._size]
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    def to_xy(self) -> np.ndarray:
+        """
+        (N, 2) float64 array of (lat, lon) rows, e.g. for shapely.
+        """
+        return np.column_stack((self.lats, self.lons))
+
+    def append(self, latitude: float, longitude: float) -> None:
+        if self._size == len(self._data):
+            self._grow(self._size + 1)
+
+        self._data[self._size] = (latitude, longitude)
+        self._size += 1
+
+    def extend(self, lats: Iterable[float], lons: Iterable[float]) -> None:
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        lons = np.asarray(lons, dtype=np.float64).ravel()
+
+        if lats.shape != lons.shape:
+            raise ValueError(f"lats and lons must have the same length ({lats.size} != {lons.size})")
+
+        end = self._size + lats.size
+        if end > len(self._data):
+            self._grow(end)
+
+        self._data["lat"][self._size:end] = lats
+        self._data["lon"][self._size:end] = lons
+        self._size = end
+
+    def to_local(self, projection: LocalProjection) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (east, north) arrays in meters on the given local plane.
+        """
+        return projection.forward_many(self.lats, self.lons)
+
+    def distances_from(self, origin) -> np.ndarray:
+        """
+        Haversine distance (in meters) from `origin` to every stored point.
+        """
+        return haversine_many(origin, self.lats, self.lons)
+
+    def _grow(self, min_capacity: int) -> None:
+        # Amortized doubling, like list.
+        capacity = max(min_capacity, 2 * len(self._data), self._MIN_CAPACITY)
+        data = np.empty(capacity, dtype=COORDINATE_DTYPE)
+        data[:self._size] = self._data[:self._size]
+        self._data = data
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            selected = self._data[:self._size][index]
+            return CoordinateArray(selected["lat"], selected["lon"])
+
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("CoordinateArray index out of range")
+
+        return CoordinateView(self._data, index)
+
+    def __iter__(self) -> Iterator[CoordinateView]:
+        data = self._data
+        for index in range(self._size):
+            yield CoordinateView(data, index)
+
+    def __repr__(self):
+        return f"CoordinateArray(size={self._size})"
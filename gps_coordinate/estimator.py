@@ -0,0 +1,353 @@
+# estimator.py
+
+import time
+from math import atan2, cos, degrees, hypot, pi, radians, sin, sqrt
+from threading import Lock
+from typing import Callable, NamedTuple, Optional
+import numpy as np
+from loguru import logger
+
+from can_bus.messages import COMPASS, IMU
+from runtime.metrics import METRICS
+from .projection import LocalProjection
+
+_GPS_REJECTS = METRICS.counter("estimator_gps_rejects_total", "GPS fixes refused by the estimator's outlier gate")
+
+# State vector on the local plane
+EAST, NORTH, V_EAST, V_NORTH, HEADING, YAW_RATE = range(6)
+STATE_SIZE = 6
+
+# Chi-square, 2 degrees of freedom, 99.9 %: a fix further out than this is an outlier.
+GPS_GATE = 13.82
+# After this many outliers in a row the fixes are right and the estimate is wrong: reset.
+MAX_GPS_REJECTS = 5
+# Move the plane's origin to the ship beyond this distance, so the projection stays exact.
+RECENTER_DISTANCE_M = 2000.0
+
+
+def _wrap(angle: float) -> float:
+    # Radians into [-pi, pi)
+    return (angle + pi) % (2 * pi) - pi
+
+
+class EstimatedState(NamedTuple):
+    latitude: float
+    longitude: float
+    east_velocity: float    # m/s
+    north_velocity: float   # m/s
+    heading: float          # Degrees clockwise from north, where the bow points
+    yaw_rate: float         # deg/s, positive is turning to starboard
+    position_std_m: float   # 1-sigma position uncertainty
+    timestamp: float        # Clock time the state is valid at
+
+    @property
+    def speed(self) -> float:
+        """
+        Speed over ground, m/s.
+        """
+        return hypot(self.east_velocity, self.north_velocity)
+
+    @property
+    def course(self) -> float:
+        """
+        Course over ground, degrees clockwise from north. Differs from `heading` in a current.
+        """
+        return degrees(atan2(self.east_velocity, self.north_velocity)) % 360.0
+
+    def get_coordinates(self) -> tuple[float, float]:
+        return self.latitude, self.longitude
+
+
+class PositionEstimator:
+    """
+    Extended Kalman filter of the ship's position, velocity, heading and yaw rate on a
+    local east/north plane.
+
+    GPS fixes correct the position, compass frames the heading and IMU frames the yaw
+    rate; the IMU accelerations (body frame) drive the prediction between them. The
+    estimate can be read at any time (`predict`), so control runs at its own rate
+    instead of the GPS fix rate, and fixes that jump further than the uncertainty
+    allows are refused before they reach control.
+
+    All matrices are preallocated and updated in place: a predict or update step does
+    not allocate arrays. Measurements are applied one scalar at a time, so no matrix is
+    ever inverted. Thread safe; GPS, CAN RX and control threads may all call in.
+
+    Nothing is estimated before the first GPS fix; it sets the plane's origin.
+
+    Args:
+        gps_std_m (float, optional): GPS position noise, per axis. Defaults to 2.5.
+        compass_std_deg (float, optional): Defaults to 2.0.
+        yaw_rate_std_dps (float, optional): IMU yaw rate noise, deg/s. Defaults to 0.5.
+        accel_noise (float, optional): Unmodelled acceleration (waves, wind, no IMU), m/s^2. Defaults to 0.2.
+        yaw_accel_noise (float, optional): Unmodelled yaw acceleration, deg/s^2. Defaults to 10.
+        clock (callable, optional): Time source of the timestamps. Defaults to `time.monotonic`.
+    """
+
+    def __init__(self, gps_std_m: float = 2.5, compass_std_deg: float = 2.0, yaw_rate_std_dps: float = 0.5,
+                 accel_noise: float = 0.2, yaw_accel_noise: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.gps_var = gps_std_m ** 2
+        self.compass_var = radians(compass_std_deg) ** 2
+        self.yaw_rate_var = radians(yaw_rate_std_dps) ** 2
+        self.accel_var = accel_noise ** 2
+        self.yaw_accel_var = radians(yaw_accel_noise) ** 2
+        self.clock = clock
+
+        self.x = np.zeros(STATE_SIZE)
+        self.P = np.zeros((STATE_SIZE, STATE_SIZE))
+        # Scratch space of the predict / update steps.
+        self._F = np.eye(STATE_SIZE)
+        self._Q = np.zeros((STATE_SIZE, STATE_SIZE))
+        self._tmp = np.zeros((STATE_SIZE, STATE_SIZE))
+        self._gain = np.zeros(STATE_SIZE)
+        self._gain_column = self._gain.reshape(STATE_SIZE, 1)
+        self._row = np.zeros(STATE_SIZE)
+        self._row_matrix = self._row.reshape(1, STATE_SIZE)
+        self._dx = np.zeros(STATE_SIZE)
+
+        self.projection: Optional[LocalProjection] = None
+        self.timestamp = 0.0
+        self._accel = (0.0, 0.0)            # Latest IMU (forward, starboard), held between frames
+        self._heading: Optional[float] = None  # Compass before the first fix, radians
+        self._position_sequence = -1
+        self._fix_time = b""  # UTC time of the last fused NMEA fix
+        self._lock = Lock()
+
+        self.fixes = 0
+        self.rejected_fixes = 0
+        self._rejects_in_row = 0
+
+    @property
+    def initialized(self) -> bool:
+        return self.projection is not None
+
+    # Model ------------------------------------------------------------------------------
+
+    def _initialize(self, latitude: float, longitude: float, gps_var: float, timestamp: float) -> None:
+        self.projection = LocalProjection(latitude, longitude)
+        self.timestamp = timestamp
+        self.x.fill(0.0)
+        self.P.fill(0.0)
+        self.P[EAST, EAST] = self.P[NORTH, NORTH] = gps_var
+        self.P[V_EAST, V_EAST] = self.P[V_NORTH, V_NORTH] = 4.0  # Up to a few m/s, either way
+        if self._heading is None:
+            self.P[HEADING, HEADING] = pi ** 2
+        else:
+            self.x[HEADING] = self._heading
+            self.P[HEADING, HEADING] = self.compass_var
+        self.P[YAW_RATE, YAW_RATE] = radians(10.0) ** 2
+        self._rejects_in_row = 0
+        logger.info("Position estimator initialized at ({}, {})", latitude, longitude)
+
+    def _predict(self, timestamp: float) -> None:
+        dt = timestamp - self.timestamp
+        if dt <= 0:
+            return
+        self.timestamp = timestamp
+
+        x, F, Q = self.x, self._F, self._Q
+        accel_forward, accel_starboard = self._accel
+        heading = x[HEADING]
+        s, c = sin(heading), cos(heading)
+        accel_east = accel_forward * s + accel_starboard * c
+        accel_north = accel_forward * c - accel_starboard * s
+        dt2 = dt * dt
+
+        x[EAST] += x[V_EAST] * dt + 0.5 * accel_east * dt2
+        x[NORTH] += x[V_NORTH] * dt + 0.5 * accel_north * dt2
+        x[V_EAST] += accel_east * dt
+        x[V_NORTH] += accel_north * dt
+        x[HEADING] = _wrap(heading + x[YAW_RATE] * dt)
+
+        # Jacobian; everything else in F stays identity.
+        F[EAST, V_EAST] = F[NORTH, V_NORTH] = F[HEADING, YAW_RATE] = dt
+        F[EAST, HEADING] = 0.5 * accel_north * dt2
+        F[NORTH, HEADING] = -0.5 * accel_east * dt2
+        F[V_EAST, HEADING] = accel_north * dt
+        F[V_NORTH, HEADING] = -accel_east * dt
+
+        # Piecewise constant white acceleration, for translation and for rotation.
+        q4, q3, q2 = 0.25 * dt2 * dt2, 0.5 * dt2 * dt, dt2
+        Q[EAST, EAST] = Q[NORTH, NORTH] = q4 * self.accel_var
+        Q[EAST, V_EAST] = Q[V_EAST, EAST] = Q[NORTH, V_NORTH] = Q[V_NORTH, NORTH] = q3 * self.accel_var
+        Q[V_EAST, V_EAST] = Q[V_NORTH, V_NORTH] = q2 * self.accel_var
+        Q[HEADING, HEADING] = q4 * self.yaw_accel_var
+        Q[HEADING, YAW_RATE] = Q[YAW_RATE, HEADING] = q3 * self.yaw_accel_var
+        Q[YAW_RATE, YAW_RATE] = q2 * self.yaw_accel_var
+
+        # P = F P F^T + Q
+        np.matmul(F, self.P, out=self._tmp)
+        np.matmul(self._tmp, F.T, out=self.P)
+        self.P += Q
+        # Keep P symmetric against rounding.
+        np.add(self.P, self.P.T, out=self._tmp)
+        np.multiply(self._tmp, 0.5, out=self.P)
+
+    def _update(self, index: int, measured: float, variance: float, angle: bool = False) -> None:
+        # Scalar Kalman update of state `index`: H is a unit row, S a number.
+        x, P = self.x, self.P
+        innovation = measured - x[index]
+        if angle:
+            innovation = _wrap(innovation)
+
+        np.divide(P[:, index], P[index, index] + variance, out=self._gain)
+        np.multiply(self._gain, innovation, out=self._dx)
+        x += self._dx
+        x[HEADING] = _wrap(x[HEADING])
+
+        # P -= K (H P)
+        self._row[:] = P[index]
+        np.multiply(self._gain_column, self._row_matrix, out=self._tmp)
+        P -= self._tmp
+
+    def _recenter(self) -> None:
+        x = self.x
+        if abs(x[EAST]) < RECENTER_DISTANCE_M and abs(x[NORTH]) < RECENTER_DISTANCE_M:
+            return
+        # A translation: the covariance does not change.
+        self.projection = LocalProjection(*self.projection.inverse(x[EAST], x[NORTH]))
+        x[EAST] = x[NORTH] = 0.0
+
+    # Measurements -----------------------------------------------------------------------
+
+    def update_gps(self, latitude: float, longitude: float, timestamp: Optional[float] = None,
+                   std_m: Optional[float] = None) -> bool:
+        """
+        Fuse a GPS fix. False if it was refused as an outlier.
+
+        Args:
+            timestamp (float, optional): Clock time of the fix. Defaults to now.
+            std_m (float, optional): Noise of this fix, per axis. Defaults to `gps_std_m`.
+        """
+        if timestamp is None:
+            timestamp = self.clock()
+        variance = self.gps_var if std_m is None else std_m ** 2
+
+        with self._lock:
+            if self.projection is None:
+                self._initialize(latitude, longitude, variance, timestamp)
+                self.fixes += 1
+                return True
+
+            self._predict(timestamp)
+            east, north = self.projection.forward(latitude, longitude)
+
+            # Mahalanobis distance of the fix, 2x2 inverse by hand.
+            P = self.P
+            d_east, d_north = east - self.x[EAST], north - self.x[NORTH]
+            s_ee, s_en, s_nn = P[EAST, EAST] + variance, P[EAST, NORTH], P[NORTH, NORTH] + variance
+            distance2 = (s_nn * d_east * d_east - 2 * s_en * d_east * d_north + s_ee * d_north * d_north) \
+                / (s_ee * s_nn - s_en * s_en)
+
+            if distance2 > GPS_GATE:
+                self._rejects_in_row += 1
+                if self._rejects_in_row < MAX_GPS_REJECTS:
+                    self.rejected_fixes += 1
+                    _GPS_REJECTS.inc()
+                    logger.warning("GPS fix ({}, {}) is {:.1f} m off the estimate, ignored",
+                                   latitude, longitude, hypot(d_east, d_north))
+                    return False
+
+                logger.warning("{} GPS fixes in a row disagree with the estimate, resetting", self._rejects_in_row)
+                heading = self.x[HEADING]
+                self._initialize(latitude, longitude, variance, timestamp)
+                self.x[HEADING] = heading
+                self.fixes += 1
+                return True
+
+            self._rejects_in_row = 0
+            self._update(EAST, east, variance)
+            self._update(NORTH, north, variance)
+            self._recenter()
+            self.fixes += 1
+            return True
+
+    def update_fix(self, fix) -> bool:
+        """
+        Fuse an `nmea.GPSFix`, trusting it less as its HDOP grows. Usable as `NMEAIngest(on_fix=...)`.
+        A fix of the same epoch (UTC time) as the last fused one is the same measurement and is skipped.
+        """
+        if fix.utc_time and fix.utc_time == self._fix_time:
+            return False
+        self._fix_time = fix.utc_time
+        std = sqrt(self.gps_var) * max(1.0, fix.hdop)
+        return self.update_gps(fix.latitude, fix.longitude, fix.received_at, std)
+
+    def update_from(self, position) -> bool:
+        """
+        Fuse the latest fix of a `ShipPosition`, if it is new since the last call.
+        The initial position (sequence 0) is a placeholder, not a fix, and is never fused.
+        """
+        snapshot = position.snapshot()
+        if snapshot.sequence == 0 or snapshot.sequence == self._position_sequence:
+            return False
+        self._position_sequence = snapshot.sequence
+        return self.update_gps(snapshot.latitude, snapshot.longitude, snapshot.timestamp)
+
+    def update_heading(self, heading_deg: float, timestamp: Optional[float] = None) -> None:
+        if timestamp is None:
+            timestamp = self.clock()
+        with self._lock:
+            if self.projection is None:
+                self._heading = _wrap(radians(heading_deg))
+                return
+            self._predict(timestamp)
+            self._update(HEADING, _wrap(radians(heading_deg)), self.compass_var, angle=True)
+
+    def update_imu(self, accel_forward: float, accel_starboard: float, yaw_rate_dps: float,
+                   timestamp: Optional[float] = None) -> None:
+        if timestamp is None:
+            timestamp = self.clock()
+        with self._lock:
+            if self.projection is not None:
+                # The old acceleration up to now, the new one from here on.
+                self._predict(timestamp)
+                self._update(YAW_RATE, radians(yaw_rate_dps), self.yaw_rate_var)
+            self._accel = (accel_forward, accel_starboard)
+
+    def update_sensor(self, name: str, values: dict, timestamp: Optional[float] = None) -> None:
+        """
+        Fuse a decoded CAN frame (`CANManager.decode`, `DeviceDriver.add_listener`).
+        Frames other than compass and IMU are ignored.
+        """
+        if name == COMPASS:
+            self.update_heading(values["heading"], timestamp)
+        elif name == IMU:
+            self.update_imu(values["accel_x"], values["accel_y"], values["yaw_rate"], timestamp)
+
+    # Output -----------------------------------------------------------------------------
+
+    def predict(self, timestamp: Optional[float] = None) -> Optional[EstimatedState]:
+        """
+        Advance the estimate to `timestamp` (defaults to now) and return it.
+        None before the first GPS fix.
+        """
+        if timestamp is None:
+            timestamp = self.clock()
+        with self._lock:
+            if self.projection is None:
+                return None
+            self._predict(timestamp)
+            return self._state()
+
+    def state(self) -> Optional[EstimatedState]:
+        """
+        The estimate as of the last measurement or `predict`, None before the first GPS fix.
+        """
+        with self._lock:
+            return None if self.projection is None else self._state()
+
+    def _state(self) -> EstimatedState:
+        x, P = self.x, self.P
+        latitude, longitude = self.projection.inverse(x[EAST], x[NORTH])
+        return EstimatedState(
+            latitude=float(latitude),
+            longitude=float(longitude),
+            east_velocity=float(x[V_EAST]),
+            north_velocity=float(x[V_NORTH]),
+            heading=degrees(x[HEADING]) % 360.0,
+            yaw_rate=degrees(x[YAW_RATE]),
+            position_std_m=sqrt(max(0.0, 0.5 * (P[EAST, EAST] + P[NORTH, NORTH]))),
+            timestamp=self.timestamp,
+        )
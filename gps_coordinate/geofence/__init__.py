@@ -1,7 +1,19 @@
 # __init__.py
 
-from .polygonal import PolygonalGeofence
-from .circular import CircularGeofence
+from importlib import import_module
 
+from .base import BoundaryCrossing, Geofence
 
-__all__ = [PolygonalGeofence, CircularGeofence]
+# Imported on first use, so importing the package does not load shapely.
+_LAZY = {"PolygonalGeofence": ".polygonal", "CircularGeofence": ".circular"}
+
+
+__all__ = ["PolygonalGeofence", "CircularGeofence", "BoundaryCrossing", "Geofence"]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
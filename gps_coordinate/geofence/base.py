@@ -1,11 +1,97 @@
 from abc import ABC, abstractmethod
+from math import cos, isfinite, radians, sin
+from typing import NamedTuple, Optional
+import numpy as np
 from ..base import GPSPoint
+from ..projection import LocalProjection
+
+
+class BoundaryCrossing(NamedTuple):
+    """
+    Where and when a straight course leaves the fence. A position already outside
+    crosses at time 0, where it is.
+    """
+    time_s: float
+    distance_m: float
+    latitude: float     # Exit point
+    longitude: float
+
+    def get_coordinates(self) -> tuple[float, float]:
+        return self.latitude, self.longitude
+
+
+class _Fix(NamedTuple):
+    # One consistent read of a (possibly moving) point.
+    latitude: float
+    longitude: float
+
+    def get_coordinates(self) -> tuple[float, float]:
+        return self.latitude, self.longitude
 
 
 class Geofence(ABC):
+    # Local east/north plane (meters) the fence is evaluated on; set by subclasses.
+    projection: LocalProjection
+
     @abstractmethod
     def contains(self, point: GPSPoint) -> bool:
         pass
 
+    @abstractmethod
+    def contains_many(self, lats, lons) -> np.ndarray:
+        """
+        Vectorized `contains` over arrays of latitudes and longitudes.
+        Returns a boolean array.
+        """
+        pass
+
+    @abstractmethod
+    def _exit_times(self, east: float, north: float, east_velocity: np.ndarray,
+                    north_velocity: np.ndarray, reach_s: Optional[float]) -> np.ndarray:
+        """
+        Seconds until a course from (east, north), inside the fence, at each velocity (m/s) first
+        meets the boundary; inf if it does not within `reach_s` (None: anywhere).
+        """
+
+    def times_to_boundary(self, point: GPSPoint, headings, speed_mps: float,
+                          horizon_s: Optional[float] = None) -> np.ndarray:
+        """
+        Seconds until a straight course from `point` at `speed_mps` leaves the fence, for every
+        heading in `headings` (degrees, clockwise from north) at once, e.g. to score candidate
+        headings. inf where the course stays inside (within `horizon_s`, if given); 0 for all
+        of them if `point` is already outside. A single heading gives an array of one.
+        """
+        headings = np.radians(np.atleast_1d(np.asarray(headings, dtype=np.float64)))
+        fix = _Fix(*point.get_coordinates())
+        if not self.contains(fix):
+            return np.zeros(headings.shape)
+        if speed_mps <= 0:
+            return np.full(headings.shape, np.inf)
+
+        east, north = self.projection.forward(*fix)
+        times = self._exit_times(east, north, np.sin(headings) * speed_mps, np.cos(headings) * speed_mps, horizon_s)
+        if horizon_s is not None:
+            times[times > horizon_s] = np.inf
+        return times
+
+    def time_to_boundary(self, point: GPSPoint, heading: float, speed_mps: float,
+                         horizon_s: Optional[float] = None) -> Optional[BoundaryCrossing]:
+        """
+        When and where a straight course from `point` (heading in degrees, clockwise from north)
+        leaves the fence, or None if it does not (within `horizon_s` seconds, if given).
+        """
+        lat, lon = point.get_coordinates()
+        time_s = float(self.times_to_boundary(_Fix(lat, lon), (heading,), speed_mps, horizon_s)[0])
+        if not isfinite(time_s):
+            return None
+        if time_s == 0.0:
+            return BoundaryCrossing(0.0, 0.0, float(lat), float(lon))
+
+        distance = speed_mps * time_s
+        east, north = self.projection.forward(lat, lon)
+        heading = radians(heading)
+        exit_lat, exit_lon = self.projection.inverse(east + distance * sin(heading), north + distance * cos(heading))
+        return BoundaryCrossing(time_s, distance, float(exit_lat), float(exit_lon))
+
     def __contains__(self, point: GPSPoint) -> bool:
         return self.contains(point)
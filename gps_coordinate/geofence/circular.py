@@ -1,11 +1,53 @@
-from .base import Geofence
-from ..base import GPSPoint
+import numpy as np
+from .base import Geofence, _Fix
+from ..base import GPSPoint, haversine, haversine_many
+from ..coordinate_array import CoordinateView
+from ..projection import LocalProjection
+
+# Above this radius the planar approximation drifts from the great circle distance
+# by more than a few meters, so fall back to haversine.
+PLANAR_MAX_RADIUS_M = 20000.0
 
 
 class CircularGeofence(Geofence):
-    def __init__(self, center: GPSPoint, radius_m: float):
+    """
+    Circle of `radius_m` meters around `center`. The center is read once, at construction.
+
+    Fences up to `PLANAR_MAX_RADIUS_M` are checked on the local plane around the center
+    (a squared distance, no trigonometry); larger ones use haversine. Look-ahead
+    (`time_to_boundary`) is a ray/circle intersection on the plane for every fence: above
+    `PLANAR_MAX_RADIUS_M` that is an approximation, and the exit it finds can be off from
+    where `contains` changes by the planar error (meters to tens of meters).
+    """
+
+    def __init__(self, center: GPSPoint | CoordinateView, radius_m: float):
         self.center = center
         self.radius = radius_m
 
+        self._center_coordinates = center.get_coordinates()
+        self.projection = LocalProjection(*self._center_coordinates)
+        self._radius_sq = radius_m * radius_m
+        self._planar = radius_m <= PLANAR_MAX_RADIUS_M
+
     def contains(self, point: GPSPoint) -> bool:
-        return self.center.haversine_distance(point) <= self.radius
+        # One get_coordinates() call: a consistent pair even if `point` is being updated.
+        lat, lon = point.get_coordinates()
+        if self._planar:
+            east, north = self.projection.forward(lat, lon)
+            return east * east + north * north <= self._radius_sq
+
+        return haversine(*self._center_coordinates, lat, lon) <= self.radius
+
+    def contains_many(self, lats, lons) -> np.ndarray:
+        if self._planar:
+            east, north = self.projection.forward_many(lats, lons)
+            return east * east + north * north <= self._radius_sq
+
+        return haversine_many(_Fix(*self._center_coordinates), lats, lons) <= self.radius
+
+    def _exit_times(self, east, north, east_velocity, north_velocity, reach_s):
+        # |p + t v| = r, the larger root (p is inside, so c <= 0 and it is >= 0).
+        a = east_velocity * east_velocity + north_velocity * north_velocity
+        b = 2.0 * (east * east_velocity + north * north_velocity)
+        c = min(east * east + north * north - self._radius_sq, 0.0)
+        return (np.sqrt(b * b - 4.0 * a * c) - b) / (2.0 * a)
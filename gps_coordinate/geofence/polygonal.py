@@ -1,22 +1,175 @@
-from shapely.geometry import Point, Polygon
+import numpy as np
+import shapely
+from shapely.geometry import MultiPolygon, Point, Polygon
 from .base import Geofence
 from ..base import GPSPoint
+from ..coordinate_array import CoordinateArray
+from ..projection import LocalProjection
+
+Ring = list[GPSPoint] | CoordinateArray
+
+# Fences with more edges than this only intersect a course with the edges an STR-tree finds near it.
+INDEXED_EDGES = 64
+
+
+def _ring_latlon(ring: Ring) -> np.ndarray:
+    # (N, 2) array of (lat, lon) rows
+    if isinstance(ring, CoordinateArray):
+        return ring.to_xy()
+    return np.array([v.get_coordinates() for v in ring], dtype=np.float64).reshape(-1, 2)
 
 
 class PolygonalGeofence(Geofence):
-    def __init__(self, vertices: list[GPSPoint]):
-        if len(vertices) < 3:
-            raise ValueError("Polygon must have at least 3 vertices")
+    """
+    Polygon fence, optionally with holes (exclusion zones) and/or several disjoint
+    parts (see `from_parts`).
+
+    Vertices are given in (lat, lon) but the geometry lives on the local east/north
+    plane (meters) around the fence, so distances and areas are undistorted. The
+    geometry is prepared once, and every check starts with a bounding-box reject,
+    so `contains` stays cheap for fences with thousands of vertices.
+
+    For look-ahead (`time_to_boundary`), the edges of every ring are kept as segment
+    arrays, and for large fences an STR-tree over them, so a course is only intersected
+    with the edges whose boxes it passes; all headings of a query in one vectorized pass.
+
+    `parts` lists the `(vertices, holes)` of every part; `vertices` and `holes` are those
+    of the first one (the only one, unless built by `from_parts`).
+    """
+
+    def __init__(self, vertices: Ring, holes: list[Ring] | None = None):
+        self._set_parts([(vertices, holes or [])])
+
+    @classmethod
+    def from_parts(cls, parts: list[tuple[Ring, list[Ring]] | Ring]) -> "PolygonalGeofence":
+        """
+        Build a multi-polygon fence. Each part is either a vertex ring,
+        or a `(vertices, holes)` tuple.
+        """
+        if not parts:
+            raise ValueError("Multi-polygon fence needs at least one part")
+
+        parts = [(part[0], part[1] or []) if isinstance(part, tuple) else (part, []) for part in parts]
+
+        # Not through __init__: the geometry is built once, from all the parts.
+        fence = cls.__new__(cls)
+        fence._set_parts(parts)
+        return fence
+
+    def _set_parts(self, parts: list[tuple[Ring, list[Ring]]]):
+        self.parts = parts
+        self.vertices, self.holes = parts[0]
+
+        rings = []
+        for vertices, holes in parts:
+            if len(vertices) < 3:
+                raise ValueError("Polygon must have at least 3 vertices")
+            for hole in holes:
+                if len(hole) < 3:
+                    raise ValueError("Hole must have at least 3 vertices")
+            rings.append((_ring_latlon(vertices), [_ring_latlon(hole) for hole in holes]))
+
+        shells = np.concatenate([shell for shell, _ in rings])
+        self._min_lat, self._min_lon = shells.min(axis=0)
+        self._max_lat, self._max_lon = shells.max(axis=0)
 
-        self.vertices = vertices
-        self._polygon = Polygon([v.get_coordinates() for v in vertices])
+        self.projection = LocalProjection((self._min_lat + self._max_lat) / 2, (self._min_lon + self._max_lon) / 2)
+
+        def to_plane(ring: np.ndarray) -> np.ndarray:
+            return self.projection.forward_xy(ring[:, 0], ring[:, 1])
+
+        polygons = [Polygon(to_plane(shell), [to_plane(hole) for hole in holes]) for shell, holes in rings]
+        self._polygon = polygons[0] if len(polygons) == 1 else MultiPolygon(polygons)
+        shapely.prepare(self._polygon)
+        self._index_edges()
+
+    def _index_edges(self) -> None:
+        starts, ends = [], []
+        for ring in shapely.get_rings(shapely.get_parts(self._polygon)):
+            coordinates = shapely.get_coordinates(ring)  # Closed: last == first
+            starts.append(coordinates[:-1])
+            ends.append(coordinates[1:])
+        start, end = np.concatenate(starts), np.concatenate(ends)
+        self._edge_east, self._edge_north = np.ascontiguousarray(start.T)
+        self._edge_de, self._edge_dn = np.ascontiguousarray((end - start).T)
+
+        self._edge_tree = None
+        if len(start) > INDEXED_EDGES:
+            self._edge_tree = shapely.STRtree(shapely.linestrings(np.stack([start, end], axis=1)))
+        min_x, min_y, max_x, max_y = self._polygon.bounds
+        self._diagonal = float(np.hypot(max_x - min_x, max_y - min_y))
+
+    @property
+    def area_m2(self) -> float:
+        return self._polygon.area
+
+    @property
+    def geometry(self) -> Polygon | MultiPolygon:
+        """
+        The fence on the local plane of `projection`, in meters. Do not modify.
+        """
+        return self._polygon
+
+    def _in_bounds(self, lat: float, lon: float) -> bool:
+        return self._min_lat <= lat <= self._max_lat and self._min_lon <= lon <= self._max_lon
 
     def contains(self, point: GPSPoint) -> bool:
-        shapely_point = Point(point.get_coordinates())
-        return self._polygon.contains(shapely_point)
+        lat, lon = point.get_coordinates()
+        if not self._in_bounds(lat, lon):
+            return False
+        return bool(shapely.contains_xy(self._polygon, *self.projection.forward(lat, lon)))
+
+    def contains_many(self, lats, lons) -> np.ndarray:
+        return shapely.contains_xy(self._polygon, *self.projection.forward_many(lats, lons))
+
+    def distance_to_boundary(self, point: GPSPoint) -> float:
+        """
+        Distance (in meters) from `point` to the nearest fence edge, inside or outside.
+        """
+        east, north = self.projection.forward(*point.get_coordinates())
+        return self._polygon.boundary.distance(Point(east, north))
 
     def _covers(self, point: GPSPoint) -> bool:
         # Use if the vertecies and sides of the polygon are acceptable.
+        # For a point, "covers" is the same as "intersects".
+
+        lat, lon = point.get_coordinates()
+        if not self._in_bounds(lat, lon):
+            return False
+        return bool(shapely.intersects_xy(self._polygon, *self.projection.forward(lat, lon)))
+
+    def _exit_times(self, east, north, east_velocity, north_velocity, reach_s):
+        # p + t v = a + s d  ->  t = (w x d) / (v x d), s = (w x v) / (v x d), w = a - p
+        # A parallel edge divides by zero, giving an inf or NaN that fails the range checks.
+        if self._edge_tree is None:
+            # Every course against every edge, as (headings, edges) arrays.
+            we, wn = self._edge_east - east, self._edge_north - north
+            de, dn = self._edge_de, self._edge_dn
+            ve, vn = east_velocity[:, None], north_velocity[:, None]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                denominator = ve * dn - vn * de
+                t = (we * dn - wn * de) / denominator
+                s = (we * vn - wn * ve) / denominator
+            return np.where((t >= 0) & (s >= 0) & (s <= 1), t, np.inf).min(axis=1)
+
+        # Only the (course, edge) pairs whose boxes overlap; nothing inside is farther than the diagonal.
+        speed = float(np.hypot(east_velocity[0], north_velocity[0]))
+        reach = self._diagonal / speed if reach_s is None else min(reach_s, self._diagonal / speed)
+        courses = shapely.linestrings(np.stack([
+            np.broadcast_to((east, north), (len(east_velocity), 2)),
+            np.column_stack((east + east_velocity * reach, north + north_velocity * reach)),
+        ], axis=1))
+        course, edge = self._edge_tree.query(courses)
+
+        we, wn = self._edge_east[edge] - east, self._edge_north[edge] - north
+        de, dn = self._edge_de[edge], self._edge_dn[edge]
+        ve, vn = east_velocity[course], north_velocity[course]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            denominator = ve * dn - vn * de
+            t = (we * dn - wn * de) / denominator
+            s = (we * vn - wn * ve) / denominator
+        hit = (t >= 0) & (s >= 0) & (s <= 1)
 
-        shapely_point = Point(point.get_coordinates())
-        return self._polygon.covers(shapely_point)
+        times = np.full(len(east_velocity), np.inf)
+        np.minimum.at(times, course[hit], t[hit])
+        return times
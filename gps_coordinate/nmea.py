@@ -0,0 +1,297 @@
+# nmea.py
+
+import os
+import select
+import time
+from threading import Event, Thread
+from typing import Callable, Optional
+from loguru import logger
+
+from .ship_position import ShipPosition
+
+KNOTS_TO_MPS = 0.514444
+KMH_TO_MPS = 1 / 3.6
+
+# NMEA 0183 allows 82 characters per sentence; leave headroom for sloppy receivers.
+MAX_SENTENCE_LENGTH = 128
+
+
+def nmea_checksum(body) -> int:
+    """
+    XOR of every byte between '$' and '*'.
+    """
+    checksum = 0
+    for byte in body:
+        checksum ^= byte
+    return checksum
+
+
+def _parse_coordinate(value: bytes, hemisphere: bytes, degree_digits: int) -> float:
+    # (d)ddmm.mmmm -> decimal degrees
+    degrees = int(value[:degree_digits]) + float(value[degree_digits:]) / 60.0
+    return -degrees if hemisphere in (b"S", b"W") else degrees
+
+
+class GPSFix:
+    """
+    Latest state assembled from the GGA / RMC / VTG sentences.
+    One instance per parser, updated in place.
+    """
+
+    __slots__ = (
+        "latitude", "longitude", "valid", "fix_quality", "satellites", "hdop", "altitude",
+        "speed_mps", "course_deg", "utc_time", "received_at",
+    )
+
+    def __init__(self):
+        self.latitude = 0.0
+        self.longitude = 0.0
+        self.valid = False
+        self.fix_quality = 0
+        self.satellites = 0
+        self.hdop = 0.0
+        self.altitude = 0.0
+        self.speed_mps = 0.0
+        self.course_deg = 0.0
+        self.utc_time = b""
+        self.received_at = 0.0
+
+    def __repr__(self):
+        return (f"GPSFix(lat={self.latitude}, lon={self.longitude}, valid={self.valid}, "
+                f"speed={self.speed_mps:.2f}m/s, course={self.course_deg:.1f})")
+
+
+class NMEAParser:
+    """
+    Incremental NMEA 0183 parser. Feed it raw bytes in any chunking,
+    it calls `on_fix(fix)` once per epoch with a valid position: on the first GGA or RMC
+    of a UTC time. The other sentence of the same epoch is merged into the fix without
+    publishing it again, so a receiver sending both does not report every fix twice.
+
+    Bytes are accumulated in one reusable `bytearray` and consumed in place; the only
+    per-sentence objects are the sentence body and its fields. The same `GPSFix` object
+    is updated and handed out every time.
+    """
+
+    def __init__(self, on_fix: Optional[Callable[[GPSFix], None]] = None):
+        self.on_fix = on_fix
+        self.fix = GPSFix()
+        self._buffer = bytearray()
+        self._published_time = b""  # UTC time of the last published epoch
+
+        self.sentences = 0
+        self.checksum_errors = 0
+        self.parse_errors = 0
+        self.discarded_bytes = 0
+
+        self._handlers = {
+            b"GGA": self._handle_gga,
+            b"RMC": self._handle_rmc,
+            b"VTG": self._handle_vtg,
+        }
+
+    def feed(self, data: bytes) -> None:
+        buffer = self._buffer
+        buffer += data
+
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            self._handle_line(buffer, start, end)
+            start = end + 1
+
+        if start:
+            del buffer[:start]
+
+        # No newline in sight: garbage or a broken receiver, don't grow forever.
+        if len(buffer) > MAX_SENTENCE_LENGTH:
+            self.discarded_bytes += len(buffer)
+            buffer.clear()
+
+    def _handle_line(self, buffer: bytearray, start: int, end: int) -> None:
+        dollar = buffer.find(b"$", start, end)
+        if dollar < 0:
+            self.discarded_bytes += end - start + 1
+            return
+        self.discarded_bytes += dollar - start
+
+        if end > dollar and buffer[end - 1] == 0x0D:  # '\r'
+            end -= 1
+
+        star = buffer.rfind(b"*", dollar, end)
+        if star < 0 or end - star != 3 or end - dollar > MAX_SENTENCE_LENGTH:
+            self.parse_errors += 1
+            return
+
+        try:
+            expected = int(buffer[star + 1:end], 16)
+        except ValueError:
+            self.parse_errors += 1
+            return
+
+        # One copy of the sentence body (between '$' and '*'), everything else works on it.
+        body = bytes(buffer[dollar + 1:star])
+        if nmea_checksum(body) != expected:
+            self.checksum_errors += 1
+            return
+
+        self.sentences += 1
+        # 'GPGGA' -> 'GGA' regardless of the talker (GP, GN, GL, ...)
+        handler = self._handlers.get(body[2:5])
+        if handler is None:
+            return
+
+        try:
+            handler(body.split(b","))
+        except (ValueError, IndexError):
+            self.parse_errors += 1
+
+    def _publish(self) -> None:
+        fix = self.fix
+        if fix.utc_time and fix.utc_time == self._published_time:
+            return  # Same epoch as the last fix: the fields are merged, the fix is not new.
+        self._published_time = fix.utc_time
+        fix.received_at = time.monotonic()
+        if self.on_fix is not None and fix.valid:
+            self.on_fix(fix)
+
+    def _handle_gga(self, fields: list[bytes]) -> None:
+        # GGA,time,lat,N,lon,E,quality,satellites,hdop,altitude,M,...
+        fix = self.fix
+        fix.fix_quality = int(fields[6] or 0)
+        fix.valid = fix.fix_quality > 0 and bool(fields[2])
+        if not fix.valid:
+            return
+
+        fix.utc_time = fields[1]
+        fix.latitude = _parse_coordinate(fields[2], fields[3], 2)
+        fix.longitude = _parse_coordinate(fields[4], fields[5], 3)
+        fix.satellites = int(fields[7] or 0)
+        fix.hdop = float(fields[8] or 0.0)
+        fix.altitude = float(fields[9] or 0.0)
+        self._publish()
+
+    def _handle_rmc(self, fields: list[bytes]) -> None:
+        # RMC,time,status,lat,N,lon,E,speed(kn),course,date,...
+        fix = self.fix
+        fix.valid = fields[2] == b"A" and bool(fields[3])
+        if not fix.valid:
+            return
+
+        fix.utc_time = fields[1]
+        fix.latitude = _parse_coordinate(fields[3], fields[4], 2)
+        fix.longitude = _parse_coordinate(fields[5], fields[6], 3)
+        if fields[7]:
+            fix.speed_mps = float(fields[7]) * KNOTS_TO_MPS
+        if fields[8]:
+            fix.course_deg = float(fields[8])
+        self._publish()
+
+    def _handle_vtg(self, fields: list[bytes]) -> None:
+        # VTG,course(true),T,course(magnetic),M,speed(kn),N,speed(km/h),K,...
+        fix = self.fix
+        if fields[1]:
+            fix.course_deg = float(fields[1])
+        if fields[7]:
+            fix.speed_mps = float(fields[7]) * KMH_TO_MPS
+        elif fields[5]:
+            fix.speed_mps = float(fields[5]) * KNOTS_TO_MPS
+
+
+class NMEAIngest(Thread):
+    """
+    Reads NMEA from a serial device, a pty or a replay file on a background thread
+    and publishes every valid fix to `ShipPosition`.
+
+    Args:
+        path (str): e.g. "/dev/ttyUSB0", a pty slave, or a recorded log file.
+        ship_position (ShipPosition): Where fixes are published.
+        baudrate (int, optional): Only used for TTYs. Defaults to 9600.
+        replay_rate_hz (float, optional): For files: publish at most this many fixes per
+            second (real-time replay). None replays as fast as possible. Defaults to None.
+        on_fix (callable, optional): Extra hook called with every published fix.
+    """
+
+    def __init__(self, path: str, ship_position: ShipPosition, baudrate: int = 9600,
+                 replay_rate_hz: Optional[float] = None,
+                 on_fix: Optional[Callable[[GPSFix], None]] = None):
+        super().__init__(name="nmea-ingest", daemon=True)
+        self.path = path
+        self.baudrate = baudrate
+        self.replay_period = 1.0 / replay_rate_hz if replay_rate_hz else 0.0
+        self.ship_position = ship_position
+        self.on_fix = on_fix
+
+        self.parser = NMEAParser(on_fix=self._on_fix)
+        self.fixes = 0
+        self.finished = Event()
+        self._stop_event = Event()
+        self._next_release = 0.0
+
+    def _open(self) -> int:
+        fd = os.open(self.path, os.O_RDONLY | getattr(os, "O_NOCTTY", 0))
+        if os.isatty(fd):
+            # POSIX only, and only needed for real receivers / ptys.
+            import termios
+            import tty
+
+            tty.setraw(fd, termios.TCSANOW)  # TCSAFLUSH would drop bytes already waiting
+            speed = getattr(termios, f"B{self.baudrate}", None)
+            if speed is not None:
+                attrs = termios.tcgetattr(fd)
+                attrs[4] = attrs[5] = speed  # ispeed, ospeed
+                termios.tcsetattr(fd, termios.TCSANOW, attrs)
+        return fd
+
+    def _on_fix(self, fix: GPSFix) -> None:
+        if self.replay_period:
+            delay = self._next_release - time.monotonic()
+            if delay > 0:
+                self._stop_event.wait(delay)
+            self._next_release = max(self._next_release, time.monotonic()) + self.replay_period
+            # Released now: a timestamp from before the wait would make the fix look older than it is.
+            fix.received_at = time.monotonic()
+
+        self.ship_position.publish(fix.latitude, fix.longitude, fix.received_at)
+        self.fixes += 1
+        if self.on_fix is not None:
+            self.on_fix(fix)
+
+    def run(self) -> None:
+        try:
+            fd = self._open()
+        except OSError as e:
+            logger.error(f"Cannot open GPS source {self.path}: {e}")
+            self.finished.set()
+            return
+
+        is_tty = os.isatty(fd)
+        try:
+            while not self._stop_event.is_set():
+                if is_tty:
+                    ready, _, _ = select.select([fd], [], [], 0.1)
+                    if not ready:
+                        continue
+
+                try:
+                    chunk = os.read(fd, 4096)
+                except OSError as e:
+                    # EIO: the other end of a pty went away
+                    logger.warning(f"GPS source {self.path} closed: {e}")
+                    break
+
+                if not chunk:
+                    if is_tty:
+                        continue
+                    break  # end of replay file
+
+                self.parser.feed(chunk)
+        finally:
+            os.close(fd)
+            self.finished.set()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop_event.set()
+        self.join(timeout=timeout)
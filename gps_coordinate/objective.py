@@ -1,33 +1,25 @@
 # objective.py
 
-import os
 from loguru import logger
 from typing import Optional
 from .base import GPSPoint
 
-# Setup logging
-LOG_PATH = os.path.abspath(os.path.join("logging", "coordinates.log"))
-
-logger.add(
-    LOG_PATH,
-    level="DEBUG",
-    rotation="500 KB",
-    backtrace=True,
-    diagnose=True
-)
-
 
 class ObjectiveCoordinate(GPSPoint):
     """
     Represents a navigation goal or checkpoint.
+
+    `acceptance_radius` (meters) is how close the ship has to get for the objective
+    to count as reached; None means the route's default.
     """
 
-    def __init__(self, latitude: float, longitude: float, label: Optional[str] = None):
+    def __init__(self, latitude: float, longitude: float, label: Optional[str] = None,
+                 acceptance_radius: Optional[float] = None):
         super().__init__(latitude, longitude)
         self.label = label or "Unnamed Objective"
+        self.acceptance_radius = acceptance_radius
 
-        msg = f"Initialized ObjectivePoint: {self.label} at ({self.latitude}, {self.longitude})"
-        logger.debug(msg)
+        logger.debug("Initialized ObjectivePoint: {} at ({}, {})", self.label, latitude, longitude)
 
     def __repr__(self):
         return f"ObjectivePoint(label={self.label}, lat={self.latitude}, lon={self.longitude})"
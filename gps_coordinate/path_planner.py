@@ -0,0 +1,414 @@
+# path_planner.py
+
+import heapq
+import time
+from math import cos, hypot, pi
+from typing import Iterable, Optional
+import numpy as np
+import shapely
+from shapely.geometry import Point
+from shapely.ops import nearest_points
+from loguru import logger
+
+from runtime.metrics import METRICS
+from .base import GPSPoint
+from .buoy import BuoyPosition
+from .geofence.polygonal import PolygonalGeofence
+from .objective import ObjectiveCoordinate
+
+_PLAN_SECONDS = METRICS.histogram("path_plan_seconds", "Duration of PathPlanner.plan")
+_UPDATE_SECONDS = METRICS.histogram("path_graph_update_seconds", "Duration of visibility graph builds and updates")
+
+DEFAULT_CLEARANCE_M = 5.0
+# Graph nodes sit this much further from the obstacles than the clearance, so a segment
+# between two of them stays inside the free space despite rounding.
+NODE_MARGIN_M = 0.05
+
+XY = tuple[float, float]
+
+
+def _reflex_vertices(geometry) -> np.ndarray:
+    """
+    The vertices where the boundary of `geometry` turns into it, the only places a
+    shortest path can bend: (K, 6) rows of the vertex and its previous and next vertex.
+    """
+    # Exterior counter-clockwise, holes clockwise: the inside is always on the left,
+    # so a right turn is a reflex corner.
+    geometry = shapely.orient_polygons(geometry)
+    found = []
+    for polygon in shapely.get_parts(geometry):
+        for ring in (polygon.exterior, *polygon.interiors):
+            xy = np.asarray(ring.coords)[:-1]
+            if len(xy) < 3:
+                continue
+            previous, following = np.roll(xy, 1, axis=0), np.roll(xy, -1, axis=0)
+            cross = _cross(xy - previous, following - xy)
+            found.append(np.hstack([xy, previous, following])[cross < 0])
+    return np.concatenate(found) if found else np.empty((0, 6))
+
+
+def _cross(u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    return u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+
+
+class PathPlanner:
+    """
+    Shortest routes inside a `PolygonalGeofence`, around its holes and the buoys.
+
+    Works on the fence's local plane. The free water is the fence shrunk by `clearance_m`,
+    minus a circle of `radius + clearance_m` around every buoy (as a circumscribed polygon
+    of `buoy_segments` sides). Its reflex corners are the nodes of a visibility graph,
+    with an edge between every pair that sees each other. Only bitangent pairs (the line
+    grazes the corner at both ends) can be on a shortest path, so the rest are dropped
+    with a bit of NumPy before the survivors are checked in one vectorized shapely call.
+
+    The graph is built once per layout. `add_buoy` / `remove_buoy` only touch the nodes
+    and edges around the changed buoy, and `plan` only links the start and the goal into
+    the graph before an A* search, so replanning fits in a control tick.
+
+    Args:
+        geofence (PolygonalGeofence): Where the ship may go.
+        buoys (Iterable[BuoyPosition], optional): Obstacles. Read once, when added.
+        clearance_m (float, optional): Distance kept from the fence and the buoy radii.
+            Defaults to `DEFAULT_CLEARANCE_M`.
+        buoy_segments (int, optional): Sides of the buoy polygons, a multiple of 4. Defaults to 16.
+        via_radius_m (float, optional): Acceptance radius of the waypoints inserted around
+            obstacles. Reaching a corner early cuts it by up to this much. Defaults to half
+            the clearance.
+    """
+
+    def __init__(self, geofence: PolygonalGeofence, buoys: Iterable[BuoyPosition] = (),
+                 clearance_m: float = DEFAULT_CLEARANCE_M, buoy_segments: int = 16,
+                 via_radius_m: Optional[float] = None):
+        if clearance_m < 0:
+            raise ValueError("clearance_m must not be negative")
+
+        self.geofence = geofence
+        self.projection = geofence.projection
+        self.clearance = clearance_m
+        self.buoy_segments = max(4, buoy_segments - buoy_segments % 4)
+        self.via_radius = clearance_m / 2 if via_radius_m is None else via_radius_m
+
+        # buoy -> (obstacle, obstacle of the node space)
+        self._buoys: dict[BuoyPosition, tuple] = {buoy: self._obstacles(buoy) for buoy in buoys}
+
+        self._node_ids: dict[tuple, int] = {}                   # (x, y, prev x, prev y, next x, next y) -> id
+        self._points: dict[int, XY] = {}
+        self._edges: dict[int, dict[int, float]] = {}
+        self._corners = np.empty((0, 6))  # Row = node id; rows of removed nodes are left behind
+        self._arrays: Optional[tuple[np.ndarray, np.ndarray]] = None  # (ids, xy), rebuilt lazily
+
+        self.rebuild()
+
+    # Layout -----------------------------------------------------------------------------
+
+    @property
+    def buoys(self) -> list[BuoyPosition]:
+        return list(self._buoys)
+
+    @property
+    def node_count(self) -> int:
+        return len(self._points)
+
+    @property
+    def edge_count(self) -> int:
+        return sum(len(neighbours) for neighbours in self._edges.values()) // 2
+
+    def _disk(self, buoy: BuoyPosition, distance: float):
+        east, north = self.projection.forward(*buoy.get_coordinates())
+        # Circumscribed: a segment that misses the polygon misses the circle too.
+        radius = (buoy.radius + distance) / cos(pi / self.buoy_segments)
+        return Point(east, north).buffer(radius, quad_segs=self.buoy_segments // 4)
+
+    def _obstacles(self, buoy: BuoyPosition) -> tuple:
+        return self._disk(buoy, self.clearance), self._disk(buoy, self.clearance + NODE_MARGIN_M)
+
+    def _spaces(self) -> tuple:
+        fence = self.geofence.geometry
+        # Mitre joins: few vertices, and never closer than the clearance (wider at very sharp corners).
+        free = fence.buffer(-self.clearance, join_style="mitre")
+        node_space = fence.buffer(-(self.clearance + NODE_MARGIN_M), join_style="mitre")
+        if self._buoys:
+            obstacles, node_obstacles = zip(*self._buoys.values())
+            free = free.difference(shapely.union_all(obstacles))
+            node_space = node_space.difference(shapely.union_all(node_obstacles))
+        return free, node_space
+
+    def _set_spaces(self, free, node_space) -> None:
+        shapely.prepare(free)
+        self._free = free
+        self._node_space = node_space
+
+    def rebuild(self) -> None:
+        """
+        Build the graph from scratch. Only needed after changing the fence (see `set_geofence`).
+        """
+        with _UPDATE_SECONDS.time():
+            started = time.perf_counter()
+            self._set_spaces(*self._spaces())
+            self._node_ids.clear()
+            self._points.clear()
+            self._edges.clear()
+            self._corners = np.empty((0, 6))
+            self._connect(self._sync_nodes())
+
+        logger.info("Path planner graph: {} nodes, {} edges, {} buoys in {:.1f} ms", self.node_count,
+                    self.edge_count, len(self._buoys), (time.perf_counter() - started) * 1000)
+
+    def set_geofence(self, geofence: PolygonalGeofence) -> None:
+        self.geofence = geofence
+        self.projection = geofence.projection
+        self._buoys = {buoy: self._obstacles(buoy) for buoy in self._buoys}
+        self.rebuild()
+
+    def add_buoy(self, buoy: BuoyPosition) -> None:
+        """
+        Add an obstacle: drops the edges it blocks and links its corners into the graph.
+        """
+        if buoy in self._buoys:
+            return
+
+        with _UPDATE_SECONDS.time():
+            obstacle, node_obstacle = self._buoys[buoy] = self._obstacles(buoy)
+            self._set_spaces(self._free.difference(obstacle), self._node_space.difference(node_obstacle))
+
+            pairs = np.array([(a, b) for a, neighbours in self._edges.items() for b in neighbours if a < b],
+                             dtype=np.int64).reshape(-1, 2)
+            if len(pairs):
+                blocked = shapely.intersects(obstacle, self._lines(pairs))
+                for a, b in pairs[blocked].tolist():
+                    del self._edges[a][b]
+                    del self._edges[b][a]
+
+            self._connect(self._sync_nodes())
+
+        logger.debug("Path planner: added buoy {}, {} nodes, {} edges", buoy, self.node_count, self.edge_count)
+
+    def remove_buoy(self, buoy: BuoyPosition) -> None:
+        """
+        Remove an obstacle: drops its corners and re-checks the pairs it used to block.
+        """
+        if buoy not in self._buoys:
+            return
+        obstacle, _ = self._buoys.pop(buoy)
+
+        with _UPDATE_SECONDS.time():
+            self._set_spaces(*self._spaces())
+            added = self._sync_nodes()
+
+            ids, xy = self._node_arrays()
+            keep = ids < added[0] if added else slice(None)
+            old, xy = ids[keep], xy[keep]
+            # Cheap reject first: pairs with both ends on the same outer side of the buoy's box.
+            min_x, min_y, max_x, max_y = obstacle.bounds
+            sides = np.column_stack([xy[:, 0] < min_x, xy[:, 0] > max_x, xy[:, 1] < min_y, xy[:, 1] > max_y])
+            i, j = np.triu_indices(len(old), k=1)
+            crossing = ~(sides[i] & sides[j]).any(axis=1)
+            pairs = self._bitangent(np.column_stack([old[i[crossing]], old[j[crossing]]]))
+            if len(pairs):
+                lines = self._lines(pairs)
+                candidates = shapely.intersects(obstacle, lines)
+                pairs, lines = pairs[candidates], lines[candidates]
+                self._add_edges(pairs[shapely.covers(self._free, lines)])
+
+            self._connect(added)
+
+        logger.debug("Path planner: removed buoy {}, {} nodes, {} edges", buoy, self.node_count, self.edge_count)
+
+    # Graph ------------------------------------------------------------------------------
+
+    def _sync_nodes(self) -> list[int]:
+        # Nodes are keyed by their corner: corners untouched by a change keep their id and
+        # edges; a corner whose neighbours moved is replaced, as its tangents changed.
+        current = set(map(tuple, _reflex_vertices(self._node_space).tolist()))
+
+        for key in [key for key in self._node_ids if key not in current]:
+            node = self._node_ids.pop(key)
+            del self._points[node]
+            for neighbour in self._edges.pop(node):
+                del self._edges[neighbour][node]
+
+        new = [key for key in current if key not in self._node_ids]
+        added = list(range(len(self._corners), len(self._corners) + len(new)))
+        for node, key in zip(added, new):
+            self._node_ids[key] = node
+            self._points[node] = key[:2]
+            self._edges[node] = {}
+        if new:
+            self._corners = np.concatenate([self._corners, np.array(new, dtype=np.float64)])
+
+        self._arrays = None
+        return added
+
+    def _tangent(self, nodes: np.ndarray, towards: np.ndarray) -> np.ndarray:
+        # The line from a corner towards a point grazes it if both neighbours of the
+        # corner are on the same side of the line.
+        corners = self._corners[nodes]
+        direction = towards - corners[:, 0:2]
+        return (_cross(direction, corners[:, 2:4] - corners[:, 0:2])
+                * _cross(direction, corners[:, 4:6] - corners[:, 0:2])) >= 0
+
+    def _bitangent(self, pairs: np.ndarray) -> np.ndarray:
+        xy = self._corners[:, 0:2]
+        keep = self._tangent(pairs[:, 0], xy[pairs[:, 1]]) & self._tangent(pairs[:, 1], xy[pairs[:, 0]])
+        return pairs[keep]
+
+    def _lines(self, pairs: np.ndarray) -> np.ndarray:
+        xy = self._corners[:, 0:2]
+        return shapely.linestrings(np.stack([xy[pairs[:, 0]], xy[pairs[:, 1]]], axis=1))
+
+    def _add_edges(self, pairs: np.ndarray) -> None:
+        xy = self._corners[:, 0:2]
+        lengths = np.hypot(*(xy[pairs[:, 1]] - xy[pairs[:, 0]]).T)
+        edges = self._edges
+        for (a, b), length in zip(pairs.tolist(), lengths.tolist()):
+            edges[a][b] = edges[b][a] = length
+
+    def _connect(self, added: list[int]) -> None:
+        # Every new node against every other node, each pair once. New ids are the highest.
+        if not added:
+            return
+        ids, _ = self._node_arrays()
+        new = np.array(added, dtype=np.int64)
+        old = ids[ids < added[0]]
+        i, j = np.triu_indices(len(new), k=1)
+        pairs = np.concatenate([
+            np.stack(np.meshgrid(new, old, indexing="ij"), axis=-1).reshape(-1, 2),
+            np.column_stack([new[i], new[j]]),
+        ])
+        pairs = self._bitangent(pairs)
+        if len(pairs):
+            self._add_edges(pairs[shapely.covers(self._free, self._lines(pairs))])
+
+    def _node_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._arrays is None:
+            ids = np.fromiter(self._points, dtype=np.int64, count=len(self._points))
+            self._arrays = ids, self._corners[ids, 0:2]
+        return self._arrays
+
+    def _visible_nodes(self, point: XY) -> dict[int, float]:
+        ids, xy = self._node_arrays()
+        tangent = self._tangent(ids, np.asarray(point))
+        ids, xy = ids[tangent], xy[tangent]
+        if not len(ids):
+            return {}
+        lines = shapely.linestrings(np.stack([np.broadcast_to(point, xy.shape), xy], axis=1))
+        visible = shapely.covers(self._free, lines)
+        distances = np.hypot(xy[:, 0] - point[0], xy[:, 1] - point[1])
+        return dict(zip(ids[visible].tolist(), distances[visible].tolist()))
+
+    def _into_free_space(self, point: XY, what: str) -> Optional[XY]:
+        if shapely.intersects_xy(self._free, *point):
+            return point
+        if self._node_space.is_empty:
+            return None
+        nearest = nearest_points(self._node_space, Point(point))[0]
+        logger.warning("{} is not in the free water, planning from the nearest point {:.1f} m away",
+                       what, nearest.distance(Point(point)))
+        return nearest.x, nearest.y
+
+    def _shortest_path(self, start: XY, goal: XY) -> Optional[list[XY]]:
+        # Polyline from `start` (excluded) to `goal` (included).
+        if shapely.covers(self._free, shapely.linestrings([start, goal])):
+            return [goal]
+
+        from_start = self._visible_nodes(start)
+        to_goal = self._visible_nodes(goal)
+        if not from_start or not to_goal:
+            return None
+
+        points, edges = self._points, self._edges
+        goal_x, goal_y = goal
+
+        def remaining(node: int) -> float:
+            x, y = points[node]
+            return hypot(goal_x - x, goal_y - y)
+
+        best = dict(from_start)
+        came_from: dict[int, Optional[int]] = dict.fromkeys(from_start)
+        queue = [(cost + remaining(node), cost, node) for node, cost in from_start.items()]
+        heapq.heapify(queue)
+        goal_cost, goal_parent = float("inf"), None
+
+        while queue:
+            estimate, cost, node = heapq.heappop(queue)
+            if estimate >= goal_cost:
+                break
+            if cost > best[node]:
+                continue
+
+            to_goal_cost = to_goal.get(node)
+            if to_goal_cost is not None and cost + to_goal_cost < goal_cost:
+                goal_cost, goal_parent = cost + to_goal_cost, node
+
+            for neighbour, length in edges[node].items():
+                new_cost = cost + length
+                if new_cost < best.get(neighbour, float("inf")):
+                    best[neighbour] = new_cost
+                    came_from[neighbour] = node
+                    heapq.heappush(queue, (new_cost + remaining(neighbour), new_cost, neighbour))
+
+        if goal_parent is None:
+            return None
+
+        path = [goal]
+        node = goal_parent
+        while node is not None:
+            path.append(points[node])
+            node = came_from[node]
+        path.reverse()
+        return path
+
+    # Queries ----------------------------------------------------------------------------
+
+    def plan(self, start: GPSPoint, goal: GPSPoint) -> Optional[list[ObjectiveCoordinate]]:
+        """
+        Shortest route from `start` to `goal`, without the start. Waypoints inserted around
+        obstacles get `via_radius_m`; `goal` itself is the last waypoint if it is an
+        `ObjectiveCoordinate` in the free water.
+
+        A start or goal closer to an obstacle than the clearance (or outside the fence)
+        is moved to the nearest free point first. None if there is no route.
+        """
+        with _PLAN_SECONDS.time():
+            start_xy = self.projection.forward(*start.get_coordinates())
+            goal_xy = self.projection.forward(*goal.get_coordinates())
+
+            free_start = self._into_free_space(start_xy, "Start")
+            free_goal = self._into_free_space(goal_xy, "Goal")
+            if free_start is None or free_goal is None:
+                return None
+
+            path = self._shortest_path(free_start, free_goal)
+            if path is None:
+                logger.warning("No route from {} to {}", start, goal)
+                return None
+            if free_start != start_xy:
+                path.insert(0, free_start)
+
+        route = [ObjectiveCoordinate(*self._to_gps(xy), label=f"Via {k + 1}",
+                                     acceptance_radius=self.via_radius) for k, xy in enumerate(path[:-1])]
+        if free_goal == goal_xy and isinstance(goal, ObjectiveCoordinate):
+            route.append(goal)
+        else:
+            route.append(ObjectiveCoordinate(*self._to_gps(free_goal), label="Goal"))
+        return route
+
+    def _to_gps(self, xy) -> tuple[float, float]:
+        # Plain floats, not np.float64 from the node arrays.
+        lat, lon = self.projection.inverse(*xy)
+        return float(lat), float(lon)
+
+    def plan_route(self, start: GPSPoint, objectives: Iterable[GPSPoint]) -> Optional[list[ObjectiveCoordinate]]:
+        """
+        `plan` through every objective in order, e.g. the marks of a course.
+        None if any leg has no route.
+        """
+        route = []
+        for objective in objectives:
+            leg = self.plan(start, objective)
+            if leg is None:
+                return None
+            route.extend(leg)
+            start = leg[-1]
+        return route
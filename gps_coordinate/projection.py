@@ -0,0 +1,71 @@
+# projection.py
+
+from functools import lru_cache
+from math import cos, radians
+import numpy as np
+
+from .base import EARTH_RADIUS_M
+
+
+class LocalProjection:
+    """
+    Local East-North(-Up) tangent plane around an origin, in meters. Up is not tracked:
+    everything on a lake is at the same height.
+
+    Equirectangular: good to ~0.1 % within a few kilometres of the origin, which is a
+    race course. The meters-per-degree factors (incl. `cos(origin latitude)`) are
+    computed once, so a transform is two subtractions and two multiplications.
+    """
+
+    __slots__ = ("origin_lat", "origin_lon", "m_per_deg_lat", "m_per_deg_lon")
+
+    def __init__(self, origin_lat: float, origin_lon: float):
+        self.origin_lat = origin_lat
+        self.origin_lon = origin_lon
+        self.m_per_deg_lat = radians(EARTH_RADIUS_M)
+        self.m_per_deg_lon = radians(EARTH_RADIUS_M) * cos(radians(origin_lat))
+
+    def forward(self, lat: float, lon: float) -> tuple[float, float]:
+        """
+        (lat, lon) degrees -> (east, north) meters.
+        """
+        return (lon - self.origin_lon) * self.m_per_deg_lon, (lat - self.origin_lat) * self.m_per_deg_lat
+
+    def inverse(self, east: float, north: float) -> tuple[float, float]:
+        """
+        (east, north) meters -> (lat, lon) degrees.
+        """
+        return self.origin_lat + north / self.m_per_deg_lat, self.origin_lon + east / self.m_per_deg_lon
+
+    def forward_many(self, lats, lons) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized `forward`: arrays of degrees -> (east, north) arrays of meters.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        return (lons - self.origin_lon) * self.m_per_deg_lon, (lats - self.origin_lat) * self.m_per_deg_lat
+
+    def inverse_many(self, east, north) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized `inverse`: arrays of meters -> (lat, lon) arrays of degrees.
+        """
+        east = np.asarray(east, dtype=np.float64)
+        north = np.asarray(north, dtype=np.float64)
+        return self.origin_lat + north / self.m_per_deg_lat, self.origin_lon + east / self.m_per_deg_lon
+
+    def forward_xy(self, lats, lons) -> np.ndarray:
+        """
+        (N, 2) array of (east, north) rows, e.g. for shapely.
+        """
+        return np.column_stack(self.forward_many(lats, lons))
+
+    def __repr__(self):
+        return f"LocalProjection(origin=({self.origin_lat}, {self.origin_lon}))"
+
+
+@lru_cache(maxsize=256)
+def get_projection(origin_lat: float, origin_lon: float) -> LocalProjection:
+    """
+    Shared, cached `LocalProjection` for an origin (projections are immutable).
+    """
+    return LocalProjection(origin_lat, origin_lon)
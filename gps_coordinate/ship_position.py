@@ -1,50 +1,137 @@
 # ship_position.py
 
-import os
+import time
+import warnings
 from threading import Lock
+from typing import TYPE_CHECKING, NamedTuple, Optional
 from loguru import logger
 
-from gps_coordinate.geofence import CircularGeofence, PolygonalGeofence
+from gps_coordinate.geofence import BoundaryCrossing
 from gps_coordinate.objective import ObjectiveCoordinate
-from .base import GPSPoint
+from runtime.metrics import METRICS
+from .base import GPSPoint, haversine
 
-# Setup logging
-LOG_PATH = os.path.abspath(os.path.join("logging", "coordinates.log"))
+if TYPE_CHECKING:
+    from gps_coordinate.geofence import CircularGeofence, PolygonalGeofence
 
-logger.add(
-    LOG_PATH,
-    level="DEBUG",
-    rotation="500 KB",
-    backtrace=True,
-    diagnose=True
-)
+_GEOFENCE_SECONDS = METRICS.histogram("geofence_check_seconds", "Duration of a ship geofence check")
+_GEOFENCE_REJECTS = METRICS.counter("geofence_rejects_total", "Position updates refused by the geofence")
+
+
+class PositionSnapshot(NamedTuple):
+    """
+    Immutable position fix. A new one is published for every update, never modified.
+    """
+    latitude: float
+    longitude: float
+    timestamp: float  # time.monotonic() of the fix
+    sequence: int     # Increments with every publish, 0 is the initial position
 
 
 class ShipPosition(GPSPoint):
+    """
+    Singleton holding the latest position of the ship.
+
+    Writers build a new `PositionSnapshot` and swap the reference in one assignment;
+    readers just grab the current reference. Readers therefore never lock, never block
+    the GPS ingest thread, and always see a consistent (lat, lon, timestamp) triple.
+    Writers are serialized among themselves so `sequence` stays monotonic.
+    """
+
     _instance = None
     _singleton_lock = Lock()
-    _lock = Lock()
+    _publish_lock = Lock()
 
-    def __new__(cls, latitude=0.0, longitude=0.0, geofence = None):
+    def __new__(cls, latitude=None, longitude=None, geofence = None):
         with cls._singleton_lock:
             if cls._instance is None:
                 cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self, latitude=0.0, longitude=0.0, geofence: CircularGeofence | PolygonalGeofence = None):
-
-        # Ha nem létezik a '__initialized' attributum, hamisnak vesszük;
-        if not getattr(self, '__initialized', False):
-            super().__init__(latitude, longitude)
+    def __init__(self, latitude: Optional[float] = None, longitude: Optional[float] = None,
+                 geofence: "CircularGeofence | PolygonalGeofence" = None):
+        # __init__ runs on every ShipPosition(...), also when __new__ returned the existing instance.
+        if not getattr(self, "_initialized", False):
+            self._initialized = True
+            # No GPSPoint.__init__: position lives in the snapshot, not in attributes.
+            self._snapshot = PositionSnapshot(0.0 if latitude is None else latitude,
+                                              0.0 if longitude is None else longitude, time.monotonic(), 0)
+            self.geofence = geofence
+            return
 
-            # '"__initialized" is not accessed - Pylance' ->
-            # A 'getattr' igenis eléri, csak ezt a linter nem tudja szegény
-            self.__initialized = True
+        # Later calls apply what they are given, but never roll the sequence back (readers detect new fixes by it).
+        if latitude is not None and longitude is not None:
+            self.publish(latitude, longitude)
+        if geofence is not None:
             self.geofence = geofence
 
+    def publish(self, latitude: float, longitude: float, timestamp: Optional[float] = None) -> PositionSnapshot:
+        """
+        Publish a new position fix, e.g. from the GPS ingest thread.
+
+        Args:
+            latitude (float): Degrees.
+            longitude (float): Degrees.
+            timestamp (float, optional): `time.monotonic()` of the fix. Defaults to now.
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        with self._publish_lock:
+            snapshot = PositionSnapshot(latitude, longitude, timestamp, self._snapshot.sequence + 1)
+            self._snapshot = snapshot
+
+        logger.debug("Published position ({}, {}) #{}", latitude, longitude, snapshot.sequence)
+        return snapshot
+
+    def snapshot(self) -> PositionSnapshot:
+        """
+        Latest fix, without locking.
+        """
+        return self._snapshot
+
+    @property
+    def latitude(self) -> float:
+        return self._snapshot.latitude
+
+    @latitude.setter
+    def latitude(self, value: float):
+        self.publish(value, self._snapshot.longitude)
+
+    @property
+    def longitude(self) -> float:
+        return self._snapshot.longitude
+
+    @longitude.setter
+    def longitude(self, value: float):
+        self.publish(self._snapshot.latitude, value)
+
+    def get_coordinates(self):
+        snapshot = self._snapshot
+        return snapshot.latitude, snapshot.longitude
+
+    def set_coordinates(self, coords: GPSPoint):
+        lat, lon = coords.get_coordinates()
+        self.publish(lat, lon)
+
+    def _GPSPoint__set_coordinates(self, lat: float, lon: float):
+        # GPSPoint's fallback setter locks `_lock` and sets attributes, neither of which a ShipPosition has.
+        warnings.warn("This is a fallback method for setting coordinates. \
+                      Use the more OOP 'set_coordinates' instead.", DeprecationWarning)
+        self.publish(lat, lon)
+
+    def haversine_distance(self, other: GPSPoint) -> float:
+        lat, lon = self.get_coordinates()
+        other_lat, other_lon = other.get_coordinates()
+        return haversine(lat, lon, other_lat, other_lon)
+
     def update_position(self, new_objective: ObjectiveCoordinate) -> bool:
 
-        if not self.geofence.contains(new_objective):
+        with _GEOFENCE_SECONDS.time():
+            allowed = self.geofence.contains(new_objective)
+
+        if not allowed:
+            _GEOFENCE_REJECTS.inc()
             logger.warning("Attempted to move outside geofence!")
             return False
 
@@ -53,5 +140,21 @@ class ShipPosition(GPSPoint):
             return True
 
     def is_within_geofence(self) -> bool:
-        ship_in_geofence = self.geofence.contains(self)
+        with _GEOFENCE_SECONDS.time():
+            ship_in_geofence = self.geofence.contains(self)
         return ship_in_geofence
+
+    def time_to_geofence(self, heading: float, speed_mps: float,
+                         horizon_s: Optional[float] = None) -> Optional[BoundaryCrossing]:
+        """
+        When and where holding `heading` (degrees) at `speed_mps` leaves the geofence, or None
+        if it does not within `horizon_s` (or there is no geofence). For many candidate
+        headings at once, use `geofence.times_to_boundary(ship_position, headings, speed_mps)`.
+        """
+        if self.geofence is None:
+            return None
+        return self.geofence.time_to_boundary(self, heading, speed_mps, horizon_s)
+
+    def __repr__(self):
+        snapshot = self._snapshot
+        return f"ShipPosition(lat={snapshot.latitude}, lon={snapshot.longitude}, seq={snapshot.sequence})"
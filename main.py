@@ -1,48 +1,167 @@
 # main.py
 # Entry point
 
+import math
+import os
 from datetime import datetime
-import time
 from loguru import logger
 
-from can_bus.can_manager import CANManager
+from can_bus.bus_pool import BusPool
+from can_bus.device_drivers import CompassDriver, EngineDriver, ImuDriver, RudderDriver
+from communication import Uplink
+from gps_coordinate import ShipPosition
+from gps_coordinate.estimator import PositionEstimator
+from runtime.log_config import configure_logging, default_log_dir
+from runtime.metrics import METRICS
+from runtime.profiler import SamplingProfiler, install_signal_toggle
+from runtime.scheduler import RateScheduler
+from runtime.subsystems import Subsystems
 from ship_manager import ShipManager
+from telemetry import TelemetryRecorder
+from telemetry.records import state_record
+
+# CAN channels of the motor controller + rudder ($CAN_ACTUATOR_CHANNEL, default vcan0)
+# and of the compass + IMU ($CAN_SENSOR_CHANNEL, default vcan1).
+ACTUATOR_CHANNEL = os.getenv("CAN_ACTUATOR_CHANNEL") or "vcan0"
+SENSOR_CHANNEL = os.getenv("CAN_SENSOR_CHANNEL") or "vcan1"
+
+CONTROL_RATE_HZ = 5
+TELEMETRY_RATE_HZ = 1
+METRICS_DUMP_INTERVAL_S = 60
 
 
 def main():
+    configure_logging(
+        level="INFO",
+        # module_levels={"can_bus": "DEBUG"},
+        # sample_rates={"gps_coordinate": 20},
+    )
     logger.info(f"Starting application at {datetime.now()}")
 
-    waittime = 0.2
+    # `kill -USR1 <pid>` starts the sampling profiler, a second one writes the profile to the log dir.
+    profiler = SamplingProfiler()
+    install_signal_toggle(profiler, default_log_dir())
+    metrics_server = None
+    if os.getenv("METRICS_PORT"):
+        # Prometheus text on /metrics, on-demand profiles on /profile?seconds=N
+        metrics_server = METRICS.serve(int(os.environ["METRICS_PORT"]), profiler=profiler)
 
     ship_manager = ShipManager()
-    can_manager = CANManager(
-        # channel=...,
-        # bitrate=...,
-        # bustype=...,
-        # interface=...,
-    )
+    # Next to the logs by default; a bare "telemetry" would be the package directory when run from the repo.
+    recorder = TelemetryRecorder(os.getenv("TELEMETRY_PATH") or os.path.join(default_log_dir(), "telemetry"))
 
-    # TODO: while any task is ongoing instead of True
-    # TODO: safeguards?...
-    while True:
+    # Each channel is opened once; RX/TX run on background threads per channel, so a slow
+    # or silent bus can't stall the loop. Drivers keep the latest decoded values.
+    # With SUBSYSTEM_PROCESSES=1 the buses (and the GPS receiver) live in their own processes
+    # instead, and only fixed-layout records cross over in shared memory: nothing in them
+    # competes with this loop for the GIL. Received frames are then dispatched once per tick.
+    subsystems = None
+    if os.getenv("SUBSYSTEM_PROCESSES") == "1":
+        subsystems = Subsystems(
+            [ACTUATOR_CHANNEL, SENSOR_CHANNEL],
+            gps_path=os.getenv("GPS_DEVICE"),
+            # interface="socketcan",
+            # bitrate=...,
+        )
+        can_pool = subsystems.can_pool
+    else:
+        can_pool = BusPool(
+            # interface="socketcan",
+            # bitrate=...,
+        )
+    engine = EngineDriver(can_pool, ACTUATOR_CHANNEL)
+    rudder = RudderDriver(can_pool, ACTUATOR_CHANNEL)
+    compass = CompassDriver(can_pool, SENSOR_CHANNEL)
+    imu = ImuDriver(can_pool, SENSOR_CHANNEL)
+    for channel in can_pool.channels:
+        can_pool.add_tap(channel, recorder.record_can)
+
+    # GPS + compass + IMU fusion; control reads the estimate at its own rate.
+    estimator = PositionEstimator()
+    compass.add_listener(estimator.update_sensor)
+    imu.add_listener(estimator.update_sensor)
+    ship_manager.estimator = estimator
+
+    # 4G uplink to the shore, if configured. Never blocks the loop; spools to disk while offline.
+    uplink = None
+    if os.getenv("UPLINK_HOST"):
+        uplink = Uplink(os.environ["UPLINK_HOST"], int(os.getenv("UPLINK_PORT", "5600")),
+                        spool_dir=os.getenv("UPLINK_SPOOL_PATH") or "uplink_spool")
+        uplink.start()
+
+    if subsystems is not None:
+        if ship_manager.ship_state.current_position is None:
+            ship_manager.ship_state.current_position = ShipPosition()
+        subsystems.start()
+
+    def control_step():
+        if subsystems is not None:
+            subsystems.sync(ship_manager.ship_state.current_position)
         ship_manager.step()
 
         # Minden, ami a következő GPS koordináta megszülését jelenti,
         # a ship_manager-ben történik!
         next_objective = ship_manager.get_next_objective_coo()
 
+        position = ship_manager.ship_state.current_position
+        if position is not None:
+            status = ship_manager.route_status
+            estimate = ship_manager.estimate
+            state = state_record(
+                *(position if estimate is None else estimate).get_coordinates(),
+                heading=math.nan if estimate is None else estimate.heading,
+                waypoint=-1 if status is None or status.finished else status.waypoint_index,
+                # throttle=..., rudder=...
+            )
+            recorder.record("state", state)
+            if uplink is not None:
+                uplink.submit("state", state)
+
         # TODO: Kitaláljuk, mit mondjunk az aktuárotorknak
         ...
 
+        # ship_manager.estimate: filtered position, velocity, heading (None until the first GPS fix)
+
         # TODO: Közvetítünk a CAN felé.
-        # NOTE: a CAN üzeneteit majd valahogy be kell vezetni a manager-be!
-        can_manager.send_message(
-            # tell engine to do stuff...
-        )
+        # engine.set_throttle(...)
+        # rudder.set_angle(...)
 
-        can_manager.send_message(
-            # tell rudder to do stuff...
-        )
+        # Unchanged commands are not resent every tick (only on their heartbeat); the ones held
+        # back by a minimum interval go out here once it has passed.
+        engine.flush_tx()
+        rudder.flush_tx()
 
-        # Valamilyen FPS-el futtatjuk ezeket a függvényeket:
-        time.sleep(waittime)
+    def telemetry_step():
+        # Once a second is what we can lose on a power cut.
+        recorder.flush(sync=True)
+
+        for name, stats in scheduler.stats().items():
+            if stats["deadline_misses"]:
+                logger.warning(f"Task '{name}' missed {stats['deadline_misses']} deadlines "
+                               f"(max jitter {stats['max_jitter_s'] * 1000:.1f} ms)")
+
+    def metrics_step():
+        logger.info("Metrics: {}", METRICS.snapshot())
+
+    # Valamilyen FPS-el futtatjuk ezeket a függvényeket:
+    scheduler = RateScheduler()
+    scheduler.add_task("control", control_step, CONTROL_RATE_HZ)
+    scheduler.add_task("telemetry", telemetry_step, TELEMETRY_RATE_HZ)
+    scheduler.add_task("metrics", metrics_step, 1 / METRICS_DUMP_INTERVAL_S)
+
+    # TODO: safeguards?...
+    try:
+        scheduler.run()
+    finally:
+        engine.stop()
+        if subsystems is not None:
+            subsystems.stop()
+        else:
+            can_pool.shutdown()
+        recorder.close()
+        if uplink is not None:
+            uplink.stop()
+        if metrics_server is not None:
+            metrics_server.stop()
+        if profiler.running:
+            profiler.stop()
@@ -0,0 +1,24 @@
+# __init__.py
+
+from importlib import import_module
+
+# Submodules are imported on first use: `runtime.metrics` is imported by almost every
+# module and should not drag in multiprocessing, the profiler or the log sinks with it.
+_LAZY = {
+    "RateScheduler": ".scheduler", "ScheduledTask": ".scheduler", "JitterHistogram": ".scheduler",
+    "configure_logging": ".log_config", "ModuleFilter": ".log_config",
+    "METRICS": ".metrics", "MetricsRegistry": ".metrics",
+    "SamplingProfiler": ".profiler",
+    "SharedBlock": ".shared_memory", "SharedRing": ".shared_memory",
+}
+
+__all__ = ["RateScheduler", "ScheduledTask", "JitterHistogram", "configure_logging", "ModuleFilter",
+           "METRICS", "MetricsRegistry", "SamplingProfiler", "SharedBlock", "SharedRing"]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
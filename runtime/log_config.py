@@ -0,0 +1,155 @@
+# log_config.py
+"""Central loguru setup. Library modules only call `logger.<level>(...)`; the
+application decides once (see `configure_logging`) where records go.
+
+Hot-path logging rules:
+  - pass arguments instead of f-strings: `logger.debug("at ({}, {})", lat, lon)`,
+    formatting then only happens if some sink accepts the record;
+  - wrap expensive arguments with `logger.opt(lazy=True).debug("{}", lambda: ...)`.
+With every sink above DEBUG, loguru returns from `logger.debug` before looking at the arguments.
+"""
+
+import os
+import sys
+import time
+from threading import Lock
+from typing import Optional
+from loguru import logger
+
+# One file per subsystem, keyed by module prefix.
+DEFAULT_FILE_SINKS = {
+    "gps_coordinate": "coordinates.log",
+    "can_bus": "CAN_logs.log",
+}
+
+
+def default_log_dir() -> str:
+    return os.path.abspath(os.getenv("LOGGING_PATH") or "logging")
+
+
+class _RateSampler:
+    """
+    Token bucket per module: lets through at most `rate` records per second (burst of `rate`).
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.last = time.monotonic()
+        self.dropped = 0
+        self._lock = Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+
+            self.dropped += 1
+            return False
+
+
+class ModuleFilter:
+    """
+    loguru filter with per-module minimum levels and per-module rate sampling.
+
+    Module keys are prefixes of `record["name"]`, the longest match wins,
+    e.g. `{"gps_coordinate": "WARNING", "gps_coordinate.ship_position": "DEBUG"}`.
+    """
+
+    def __init__(self, level: str = "INFO", module_levels: Optional[dict[str, str]] = None,
+                 sample_rates: Optional[dict[str, float]] = None):
+        self.default_level = logger.level(level).no
+        self.module_levels = {name: logger.level(lvl).no for name, lvl in (module_levels or {}).items()}
+        self.samplers = {name: _RateSampler(rate) for name, rate in (sample_rates or {}).items()}
+        self._resolved: dict[str, tuple[int, Optional[_RateSampler]]] = {}
+
+    @property
+    def min_level(self) -> int:
+        return min([self.default_level, *self.module_levels.values()])
+
+    @staticmethod
+    def _longest_prefix(name: str, table: dict):
+        best = None
+        for prefix in table:
+            if (name == prefix or name.startswith(prefix + ".")) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return table[best] if best is not None else None
+
+    def _resolve(self, name: str) -> tuple[int, Optional[_RateSampler]]:
+        resolved = self._resolved.get(name)
+        if resolved is None:
+            level = self._longest_prefix(name, self.module_levels)
+            resolved = (self.default_level if level is None else level, self._longest_prefix(name, self.samplers))
+            self._resolved[name] = resolved
+        return resolved
+
+    def __call__(self, record) -> bool:
+        level, sampler = self._resolve(record["name"] or "")
+        if record["level"].no < level:
+            return False
+        return sampler is None or sampler.allow()
+
+    def dropped(self) -> dict[str, int]:
+        return {name: sampler.dropped for name, sampler in self.samplers.items()}
+
+
+def _prefix_filter(prefix: str, module_filter: ModuleFilter):
+    def _filter(record) -> bool:
+        name = record["name"] or ""
+        return (name == prefix or name.startswith(prefix + ".")) and module_filter(record)
+    return _filter
+
+
+def configure_logging(
+    level: str = "INFO",
+    module_levels: Optional[dict[str, str]] = None,
+    sample_rates: Optional[dict[str, float]] = None,
+    log_dir: Optional[str] = None,
+    file_sinks: Optional[dict[str, str]] = None,
+    console: bool = True,
+    enqueue: bool = True,
+) -> ModuleFilter:
+    """
+    (Re)configure every loguru sink of the framework. Safe to call more than once.
+
+    Args:
+        level (str, optional): Default minimum level. Defaults to "INFO".
+        module_levels (dict, optional): Per-module-prefix minimum levels.
+        sample_rates (dict, optional): Per-module-prefix max records / second.
+        log_dir (str, optional): Defaults to $LOGGING_PATH, or ./logging.
+        file_sinks (dict, optional): Module prefix -> file name. Defaults to `DEFAULT_FILE_SINKS`.
+        console (bool, optional): Also log to stderr. Defaults to True.
+        enqueue (bool, optional): Write from a background thread, so the caller only
+            pays for queueing the record. Defaults to True.
+
+    Returns:
+        ModuleFilter: The shared filter (e.g. for reading sampler drop counts).
+    """
+    module_filter = ModuleFilter(level, module_levels, sample_rates)
+    min_level = module_filter.min_level
+    log_dir = log_dir or default_log_dir()
+    file_sinks = DEFAULT_FILE_SINKS if file_sinks is None else file_sinks
+
+    logger.remove()
+
+    if console:
+        logger.add(sys.stderr, level=min_level, filter=module_filter, enqueue=enqueue)
+
+    for prefix, file_name in file_sinks.items():
+        logger.add(
+            os.path.join(log_dir, file_name),
+            level=min_level,
+            filter=_prefix_filter(prefix, module_filter),
+            rotation="500 KB",
+            delay=True,  # The file is created on the first record, not at start-up
+            backtrace=True,
+            diagnose=False,  # diagnose renders every local variable, far too slow (and leaky) for a boat
+            enqueue=enqueue,
+        )
+
+    return module_filter
@@ -0,0 +1,300 @@
+# metrics.py
+"""In-process metrics: counters, gauges and latency histograms, rendered as Prometheus text.
+
+Hot paths keep a reference to their metric and only pay for an attribute update:
+
+    _STEP = METRICS.histogram("ship_manager_step_seconds", "Duration of ShipManager.step")
+
+    with _STEP.time():
+        ...
+
+Updates are not locked. Under contention an increment can (rarely) be lost; metrics
+are for seeing where time goes, not for accounting.
+"""
+
+import math
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Callable, Iterable, Optional
+from urllib.parse import parse_qs, urlparse
+from loguru import logger
+
+# Upper bucket edges of latency histograms, in seconds.
+DEFAULT_LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+LabelKey = tuple[tuple[str, str], ...]
+# Collectors are read at render time: (name, type, help, labels, value)
+Sample = tuple[str, str, str, dict[str, str], float]
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Gauge:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: "Histogram"):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count", "max")
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def time(self) -> _Timer:
+        """
+        Context manager observing the duration of its block.
+        """
+        return _Timer(self)
+
+    def quantile(self, q: float) -> float:
+        """
+        Upper bucket edge below which a `q` fraction of the observations fall (inf for the last bucket).
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for edge, count in zip(self.buckets + (math.inf,), self.counts):
+            seen += count
+            if seen >= rank:
+                return edge
+        return math.inf
+
+
+class MetricsRegistry:
+    """
+    Get-or-create store of named metrics. The same name and labels always return the same object.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, tuple[str, str, dict[LabelKey, object]]] = {}
+        self._collectors: list[Callable[[], Iterable[Sample]]] = []
+        self._lock = Lock()
+
+    def _get(self, kind: str, factory, name: str, help: str, labels: dict[str, str]):
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        family = self._metrics.get(name)
+        if family is not None:
+            metric = family[2].get(key)
+            if metric is not None:
+                return metric
+
+        with self._lock:
+            family = self._metrics.setdefault(name, (kind, help, {}))
+            if family[0] != kind:
+                raise ValueError(f"Metric '{name}' is already registered as a {family[0]}")
+            return family[2].setdefault(key, factory())
+
+    def counter(self, name: str, help: str = "", **labels) -> Counter:
+        return self._get("counter", Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str = "", **labels) -> Gauge:
+        return self._get("gauge", Gauge, name, help, labels)
+
+    def histogram(self, name: str, help: str = "", buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+                  **labels) -> Histogram:
+        return self._get("histogram", lambda: Histogram(buckets), name, help, labels)
+
+    def span(self, name: str, **labels) -> _Timer:
+        """
+        Time a block into the `<name>_seconds` histogram. Looks the histogram up every call;
+        keep the histogram and use `.time()` on hot paths instead.
+        """
+        return self.histogram(f"{name}_seconds", **labels).time()
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """
+        Register a callable producing samples at render time, for values that are
+        already counted elsewhere (e.g. scheduler stats, queue sizes).
+        """
+        self._collectors.append(collector)
+
+    def _collected(self) -> list[Sample]:
+        samples = []
+        for collector in list(self._collectors):
+            try:
+                samples.extend(collector())
+            except Exception:
+                logger.exception("Metrics collector failed")
+        return samples
+
+    def snapshot(self) -> dict[str, object]:
+        """
+        Plain values keyed by `name{labels}`; histograms as count/sum/max/p50/p99.
+        """
+        result = {}
+        for name, (kind, _, children) in sorted(self._metrics.items()):
+            for key, metric in list(children.items()):
+                label = _format_labels(dict(key))
+                if kind == "histogram":
+                    result[name + label] = {
+                        "count": metric.count, "sum": metric.sum, "max": metric.max,
+                        "p50": metric.quantile(0.5), "p99": metric.quantile(0.99),
+                    }
+                else:
+                    result[name + label] = metric.value
+        for name, _, _, labels, value in self._collected():
+            result[name + _format_labels(labels)] = value
+        return result
+
+    def render_prometheus(self) -> str:
+        """
+        Everything in the Prometheus text exposition format (version 0.0.4).
+        """
+        lines = []
+        for name, (kind, help, children) in sorted(self._metrics.items()):
+            if help:
+                lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+
+            for key, metric in list(children.items()):
+                labels = dict(key)
+                if kind != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(metric.value)}")
+                    continue
+
+                cumulative = 0
+                for edge, count in zip(metric.buckets + (math.inf,), metric.counts):
+                    cumulative += count
+                    le = "+Inf" if edge == math.inf else repr(edge)
+                    lines.append(f"{name}_bucket{_format_labels({**labels, 'le': le})} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(metric.sum)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {metric.count}")
+
+        described = set()
+        for name, kind, help, labels, value in self._collected():
+            if name not in described:
+                described.add(name)
+                if help:
+                    lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1", profiler=None) -> "MetricsServer":
+        """
+        Start a local HTTP endpoint: `GET /metrics` (Prometheus text), and with a
+        `profiler`, `GET /profile?seconds=N` (collapsed stacks of the next N seconds).
+        """
+        return MetricsServer(self, host, port, profiler).start()
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        server: MetricsServer = self.server
+        url = urlparse(self.path)
+
+        if url.path == "/metrics":
+            body = server.registry.render_prometheus().encode()
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif url.path == "/profile" and server.profiler is not None:
+            seconds = float(parse_qs(url.query).get("seconds", ["10"])[0])
+            body = server.profiler.profile_for(min(seconds, 300.0)).encode()
+            content_type = "text/plain; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("Metrics endpoint: {}", format % args)
+
+
+class MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, registry: MetricsRegistry, host: str, port: int, profiler=None):
+        super().__init__((host, port), _Handler)
+        self.registry = registry
+        self.profiler = profiler
+        self._thread: Optional[Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> "MetricsServer":
+        self._thread = Thread(target=self.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+        logger.info("Metrics endpoint on http://{}:{}/metrics", *self.server_address[:2])
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+# Process-wide registry used by the framework's own instrumentation.
+METRICS = MetricsRegistry()
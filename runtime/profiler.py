@@ -0,0 +1,132 @@
+# profiler.py
+
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+from loguru import logger
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler: a background thread snapshots every other thread's stack
+    each `interval` seconds (`sys._current_frames`) and counts identical stacks.
+
+    The profiled code is not instrumented at all, so the overhead is one stack walk per
+    thread per sample on the sampler thread, and nothing while stopped. Output is in the
+    collapsed-stack format ("thread;outer;...;inner count"), which flamegraph.pl and
+    speedscope read directly.
+
+    Args:
+        interval (float, optional): Seconds between samples. Defaults to 0.005.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stacks.clear()
+            self.samples = 0
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+        logger.info("Sampling profiler started ({} ms interval)", self.interval * 1000)
+
+    def stop(self) -> str:
+        """
+        Stop sampling and return the collapsed stacks.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop_event.set()
+            thread.join()
+            logger.info("Sampling profiler stopped after {} samples", self.samples)
+        return self.collapsed()
+
+    def toggle(self) -> Optional[str]:
+        """
+        Start if stopped; stop and return the collapsed stacks if running.
+        """
+        if self.running:
+            return self.stop()
+        self.start()
+        return None
+
+    def profile_for(self, seconds: float) -> str:
+        """
+        Profile the next `seconds` and return the collapsed stacks. Joins a run that is already going.
+        """
+        started_here = not self.running
+        if started_here:
+            self.start()
+        time.sleep(seconds)
+        return self.stop() if started_here else self.collapsed()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            if len(names) != threading.active_count():
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        stacks = self._stacks.copy()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    def top(self, n: int = 10) -> list[tuple[str, int]]:
+        """
+        Innermost functions by sample count (self time).
+        """
+        leaves: Counter[str] = Counter()
+        for stack, count in self._stacks.copy().items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(n)
+
+
+def install_signal_toggle(profiler: SamplingProfiler, output_dir: str, signum: int = signal.SIGUSR1) -> None:
+    """
+    Toggle `profiler` with a signal (`kill -USR1 <pid>`), so it can be switched on in the
+    field without a redeploy. Stopping writes `profile-<time>.folded` into `output_dir`.
+    Must be called from the main thread.
+    """
+    def _toggle(signum, frame):
+        collapsed = profiler.toggle()
+        if collapsed is None:
+            return
+
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, time.strftime("profile-%Y%m%d-%H%M%S.folded"))
+        with open(path, "w") as file:
+            file.write(collapsed)
+        logger.info("Profile written to {}", path)
+
+    signal.signal(signum, _toggle)
@@ -0,0 +1,189 @@
+# scheduler.py
+
+import time
+from bisect import bisect_left
+from threading import Event
+from typing import Callable, Optional
+from loguru import logger
+
+from .metrics import METRICS
+
+# Upper bucket edges of the jitter histogram, in seconds. The last bucket is open.
+DEFAULT_JITTER_BUCKETS = (0.0001, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1)
+
+
+class JitterHistogram:
+    """
+    Fixed-bucket histogram of release jitter (how late a task started), in seconds.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_JITTER_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.max = 0.0
+        self.total = 0.0
+        self.n = 0
+
+    def record(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.n += 1
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.n if self.n else 0.0
+
+    def as_dict(self) -> dict:
+        labels = [f"<={edge * 1000:g}ms" for edge in self.buckets] + [f">{self.buckets[-1] * 1000:g}ms"]
+        return dict(zip(labels, self.counts))
+
+
+class ScheduledTask:
+    """
+    A callable released every `1 / rate_hz` seconds on an absolute, drift-free timeline.
+    """
+
+    def __init__(self, name: str, func: Callable[[], None], rate_hz: float, start: float):
+        if rate_hz <= 0:
+            raise ValueError(f"Task '{name}' needs a positive rate, got {rate_hz}")
+
+        self.name = name
+        self.func = func
+        self.period = 1.0 / rate_hz
+        self.start = start
+        self.slot = 0
+
+        self.runs = 0
+        self.deadline_misses = 0
+        self.skipped_releases = 0
+        self.errors = 0
+        self.max_runtime = 0.0
+        self.jitter = JitterHistogram()
+
+        self.runtime_histogram = METRICS.histogram("scheduler_task_seconds", "Runtime of a scheduled task", task=name)
+        self.miss_counter = METRICS.counter("scheduler_deadline_misses_total", "Releases finished late", task=name)
+        self.error_counter = METRICS.counter("scheduler_task_errors_total", "Scheduled task runs that raised", task=name)
+
+    @property
+    def release(self) -> float:
+        # Computed from the slot index, so float error does not accumulate over long runs.
+        return self.start + self.slot * self.period
+
+    def stats(self) -> dict:
+        return {
+            "rate_hz": 1.0 / self.period,
+            "runs": self.runs,
+            "deadline_misses": self.deadline_misses,
+            "skipped_releases": self.skipped_releases,
+            "errors": self.errors,
+            "max_runtime_s": self.max_runtime,
+            "mean_jitter_s": self.jitter.mean,
+            "max_jitter_s": self.jitter.max,
+            "jitter_histogram": self.jitter.as_dict(),
+        }
+
+
+class RateScheduler:
+    """
+    Runs tasks at fixed rates off a monotonic clock.
+
+    Releases are computed as `start + k * period`, so the time a task takes does not
+    shift the next release (no drift). A task that does not finish before its next
+    release counts a deadline miss; releases that are already in the past are skipped
+    rather than run back-to-back.
+
+    `clock` and `sleep` are injectable, e.g. for running on a simulated clock.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Optional[Callable[[float], None]] = None,
+    ):
+        self.clock = clock
+        self._stop_event = Event()
+        self.sleep = sleep or self._interruptible_sleep
+        self.tasks: list[ScheduledTask] = []
+
+    def _interruptible_sleep(self, seconds: float) -> None:
+        self._stop_event.wait(seconds)
+
+    def add_task(self, name: str, func: Callable[[], None], rate_hz: float) -> ScheduledTask:
+        """
+        Register `func` to run at `rate_hz`. Tasks due at the same time run in the order added.
+        """
+        if any(task.name == name for task in self.tasks):
+            raise ValueError(f"Task '{name}' is already registered")
+
+        task = ScheduledTask(name, func, rate_hz, self.clock())
+        self.tasks.append(task)
+        return task
+
+    def remove_task(self, name: str) -> None:
+        self.tasks = [task for task in self.tasks if task.name != name]
+
+    def next_release(self) -> float:
+        return min(task.release for task in self.tasks)
+
+    def run_pending(self) -> int:
+        """
+        Run every task whose release time has come. Returns the number of tasks run.
+        """
+        ran = 0
+        for task in self.tasks:
+            start = self.clock()
+            if start < task.release:
+                continue
+
+            task.jitter.record(start - task.release)
+            try:
+                task.func()
+            except Exception:
+                task.errors += 1
+                task.error_counter.inc()
+                logger.exception(f"Scheduled task '{task.name}' raised")
+            end = self.clock()
+
+            task.runs += 1
+            task.max_runtime = max(task.max_runtime, end - start)
+            task.runtime_histogram.observe(end - start)
+
+            task.slot += 1
+            if end > task.release:
+                task.deadline_misses += 1
+                task.miss_counter.inc()
+                # Skip releases that are already over instead of bursting to catch up.
+                behind = int((end - task.release) // task.period) + 1
+                task.slot += behind
+                task.skipped_releases += behind
+            ran += 1
+        return ran
+
+    def run(self, duration: Optional[float] = None) -> None:
+        """
+        Run until `stop()` is called, or for `duration` seconds of clock time.
+        """
+        if not self.tasks:
+            raise RuntimeError("No tasks registered")
+
+        self._stop_event.clear()
+        end = None if duration is None else self.clock() + duration
+
+        while not self._stop_event.is_set():
+            self.run_pending()
+
+            wake = self.next_release()
+            if end is not None and wake >= end:
+                break
+
+            delay = wake - self.clock()
+            if delay > 0:
+                self.sleep(delay)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def stats(self) -> dict:
+        return {task.name: task.stats() for task in self.tasks}
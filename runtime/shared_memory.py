@@ -0,0 +1,204 @@
+# shared_memory.py
+"""Fixed-layout state exchange between processes, without pickling.
+
+Both structures live in a `multiprocessing.shared_memory` segment and hold NumPy
+structured records, so a write or read is a copy of a few dozen bytes:
+
+- `SharedBlock`: the latest value of something (a position fix, a filter list). One
+  writer, any number of readers, guarded by a sequence counter (seqlock), so readers
+  never block the writer and never see a half-written record.
+- `SharedRing`: a single-producer, single-consumer ring of records (CAN frames). The
+  producer never blocks; when the ring is full new records are dropped and counted.
+
+Neither takes a lock: a process stalled in a GC pause or a slow log sink cannot hold
+up the other side. Both rely on 8-byte aligned stores becoming visible in program order
+(and on the interpreter work between them on weakly ordered CPUs).
+
+The creating side owns the segment and unlinks it on `close()`; the other side attaches
+by name with `create=False`.
+"""
+
+import time
+from multiprocessing import shared_memory
+from typing import Optional
+import numpy as np
+
+# Header fields are 8-byte words; head and tail of a ring sit on separate cache lines.
+_CACHE_LINE = 64
+_RING_HEADER = 2 * _CACHE_LINE
+# A writer that died mid-write leaves the block odd for good; readers give up after this long.
+_READ_TIMEOUT = 0.1
+
+
+class _Segment:
+
+    def __init__(self, name: str, size: int, create: bool):
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.owner = create
+        self.closed = False
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def _release(self) -> None:
+        # Views into the buffer have to go before it can be closed.
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SharedBlock(_Segment):
+    """
+    Latest-value record of `dtype` in shared memory, written by one process.
+
+    Args:
+        name (str): Segment name, shared by both sides.
+        dtype (np.dtype): Record layout.
+        create (bool, optional): Create (and own) the segment, or attach to it. Defaults to False.
+    """
+
+    def __init__(self, name: str, dtype, create: bool = False):
+        self.dtype = np.dtype(dtype)
+        super().__init__(name, _CACHE_LINE + self.dtype.itemsize, create)
+
+        buffer = self.shm.buf
+        self._sequence = np.ndarray((1,), dtype=np.uint64, buffer=buffer)
+        self._record = np.ndarray((1,), dtype=self.dtype, buffer=buffer, offset=_CACHE_LINE)
+        self._out = np.zeros(1, dtype=self.dtype)
+        if create:
+            self._sequence[0] = 0
+
+    @property
+    def sequence(self) -> int:
+        """
+        Number of completed writes (a read is only needed when this changed).
+        """
+        return int(self._sequence[0]) // 2
+
+    def write(self, record) -> None:
+        """
+        Publish `record` (a tuple in field order, or a record of `dtype`). Single writer only.
+        """
+        sequence = int(self._sequence[0])
+        self._sequence[0] = sequence + 1   # Odd: write in progress
+        self._record[0] = record
+        self._sequence[0] = sequence + 2
+
+    def read(self) -> Optional[np.void]:
+        """
+        Consistent copy of the latest record, None if nothing was written yet.
+        The returned record is reused by the next `read`.
+        """
+        deadline = None
+        while True:
+            before = int(self._sequence[0])
+            if before == 0:
+                return None
+            if not before & 1:
+                self._out[0] = self._record[0]
+                if int(self._sequence[0]) == before:
+                    return self._out[0]
+
+            if deadline is None:
+                deadline = time.monotonic() + _READ_TIMEOUT
+            elif time.monotonic() > deadline:
+                raise TimeoutError(f"No consistent read of shared block '{self.name}' within {_READ_TIMEOUT} s")
+
+    def _release(self) -> None:
+        del self._sequence, self._record
+
+
+class SharedRing(_Segment):
+    """
+    Single-producer, single-consumer ring of `capacity` records of `dtype` in shared memory.
+
+    Args:
+        name (str): Segment name, shared by both sides.
+        dtype (np.dtype): Record layout.
+        capacity (int, optional): Records, rounded up to a power of two. Only used when creating. Defaults to 1024.
+        create (bool, optional): Create (and own) the segment, or attach to it. Defaults to False.
+    """
+
+    def __init__(self, name: str, dtype, capacity: int = 1024, create: bool = False):
+        self.dtype = np.dtype(dtype)
+        capacity = 1 << max(0, capacity - 1).bit_length()
+        super().__init__(name, _RING_HEADER + capacity * self.dtype.itemsize, create)
+
+        buffer = self.shm.buf
+        # [head, dropped, capacity] on the producer's cache line, [tail] on the consumer's.
+        self._producer = np.ndarray((3,), dtype=np.uint64, buffer=buffer)
+        self._consumer = np.ndarray((1,), dtype=np.uint64, buffer=buffer, offset=_CACHE_LINE)
+        if create:
+            self._producer[:] = (0, 0, capacity)
+            self._consumer[0] = 0
+
+        self.capacity = int(self._producer[2])
+        self._records = np.ndarray((self.capacity,), dtype=self.dtype, buffer=buffer, offset=_RING_HEADER)
+        self._mask = self.capacity - 1
+
+    def __len__(self) -> int:
+        return int(self._producer[0] - self._consumer[0])
+
+    @property
+    def dropped(self) -> int:
+        return int(self._producer[1])
+
+    def put(self, record) -> bool:
+        """
+        Append a record (producer only). Never blocks; False if the ring is full and it was dropped.
+        """
+        head = int(self._producer[0])
+        if head - int(self._consumer[0]) >= self.capacity:
+            self._producer[1] += 1
+            return False
+        self._records[head & self._mask] = record
+        self._producer[0] = head + 1   # Publish after the record is in place
+        return True
+
+    def get(self) -> Optional[np.void]:
+        """
+        Oldest record (consumer only), or None if the ring is empty. A copy.
+        """
+        tail = int(self._consumer[0])
+        if tail == int(self._producer[0]):
+            return None
+        record = self._records[tail & self._mask].copy()
+        self._consumer[0] = tail + 1
+        return record
+
+    def drain(self, max_records: Optional[int] = None) -> np.ndarray:
+        """
+        Up to `max_records` records (all available by default), oldest first, as one array copy.
+        """
+        tail = int(self._consumer[0])
+        count = int(self._producer[0]) - tail
+        if max_records is not None:
+            count = min(count, max_records)
+        if count <= 0:
+            return self._records[:0].copy()
+
+        start = tail & self._mask
+        end = start + count
+        if end <= self.capacity:
+            records = self._records[start:end].copy()
+        else:
+            records = np.concatenate([self._records[start:], self._records[:end - self.capacity]])
+        self._consumer[0] = tail + count
+        return records
+
+    def _release(self) -> None:
+        del self._producer, self._consumer, self._records
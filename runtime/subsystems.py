@@ -0,0 +1,171 @@
+# subsystems.py
+"""CAN I/O and GPS ingest in their own processes, next to the decision loop.
+
+Each subsystem process owns its hardware and talks to the decision process through
+fixed-layout shared memory only (see `runtime.shared_memory`): CAN frames through the
+rings of a `SharedBusPool`, position fixes through a `SharedBlock`. Nothing is pickled
+after start-up, and a GC pause or a slow log sink in one process does not hold up
+the others: the decision loop picks up whatever arrived at the start of its tick.
+
+Processes are started with the "spawn" method, so they do not inherit the parent's
+threads, locks or logging sinks; each logs to stderr only.
+"""
+
+import multiprocessing
+import os
+import signal
+from typing import Callable, Optional
+
+import numpy as np
+from loguru import logger
+
+from can_bus.shared_pool import SharedBusPool, run_can_io
+from runtime.log_config import configure_logging
+from runtime.shared_memory import SharedBlock
+
+# Latest GPS fix. time.monotonic() is system-wide, so timestamps compare across processes.
+POSITION_DTYPE = np.dtype([
+    ("latitude", "<f8"),
+    ("longitude", "<f8"),
+    ("timestamp", "<f8"),
+])
+
+
+class SharedPositionWriter:
+    """
+    Stands in for `ShipPosition` in the GPS ingest process: `publish` writes the shared block.
+    """
+
+    def __init__(self, block: SharedBlock):
+        self.block = block
+
+    def publish(self, latitude: float, longitude: float, timestamp: Optional[float] = None) -> None:
+        self.block.write((latitude, longitude, timestamp))
+
+
+class SharedPositionReader:
+    """
+    Decision-process side of the position block.
+    """
+
+    def __init__(self, block: SharedBlock):
+        self.block = block
+        self._sequence = 0
+
+    def sync(self, ship_position) -> bool:
+        """
+        Publish the latest fix to `ship_position` if a new one arrived since the last call.
+        """
+        sequence = self.block.sequence
+        if sequence == self._sequence:
+            return False
+        record = self.block.read()
+        self._sequence = sequence
+        ship_position.publish(float(record["latitude"]), float(record["longitude"]), float(record["timestamp"]))
+        return True
+
+
+def run_gps_ingest(position_name: str, path: str, stop, baudrate: int = 9600) -> None:
+    """
+    Body of the GPS ingest process: NMEA from `path` into the shared position block.
+    Returns once `stop` (a `multiprocessing.Event`) is set or the source ends.
+    """
+    from gps_coordinate.nmea import NMEAIngest
+
+    block = SharedBlock(position_name, POSITION_DTYPE)
+    ingest = NMEAIngest(path, SharedPositionWriter(block), baudrate=baudrate)
+    ingest.start()
+    try:
+        while not stop.wait(0.1):
+            if ingest.finished.is_set():
+                break
+    finally:
+        ingest.stop()
+        block.close()
+        logger.info(f"GPS ingest stopped after {ingest.fixes} fixes")
+
+
+def _process_main(log_level: str, target: Callable, *args, **kwargs) -> None:
+    # Ctrl-C reaches the whole process group; the parent decides when we stop.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    configure_logging(level=log_level, file_sinks={})
+    try:
+        target(*args, **kwargs)
+    except Exception:
+        logger.exception(f"Subsystem {multiprocessing.current_process().name} failed")
+        raise
+
+
+class Subsystems:
+    """
+    Starts the CAN I/O (and, with `gps_path`, the GPS ingest) process and owns the
+    shared memory between them and this, the decision process.
+
+    Drivers attach to `can_pool` as they would to a `BusPool`; call `sync` at the start
+    of every control tick to dispatch received frames and publish a new GPS fix.
+
+    Args:
+        channels (list[str]): CAN channels to open in the I/O process.
+        gps_path (str, optional): NMEA source for the GPS process. None starts no GPS process. Defaults to None.
+        interface (str, optional): python-can interface. Defaults to 'virtual'.
+        bitrate (int, optional): Defaults to 500000.
+        ring_capacity (int, optional): CAN frames per ring and direction. Defaults to 1024.
+        log_level (str, optional): Level of the subsystems' stderr logging. Defaults to "INFO".
+        prefix (str, optional): Shared-memory name prefix. Defaults to one derived from the PID.
+        **bus_kwargs: Passed on to `can.interface.Bus` in the I/O process.
+    """
+
+    def __init__(self, channels: list[str], gps_path: Optional[str] = None, interface: str = "virtual",
+                 bitrate: int = 500000, ring_capacity: int = 1024, log_level: str = "INFO",
+                 prefix: Optional[str] = None, **bus_kwargs):
+        self.prefix = prefix or f"sb{os.getpid()}"
+        self.can_pool = SharedBusPool(self.prefix, channels, ring_capacity)
+        self.position: Optional[SharedPositionReader] = None
+
+        context = multiprocessing.get_context("spawn")
+        self._stop = context.Event()
+        self.processes = [context.Process(
+            target=_process_main, name="can-io", daemon=True,
+            args=(log_level, run_can_io, self.prefix, channels, self._stop),
+            kwargs=dict(interface=interface, bitrate=bitrate, **bus_kwargs),
+        )]
+        if gps_path is not None:
+            position_name = f"{self.prefix}-position"
+            self.position = SharedPositionReader(SharedBlock(position_name, POSITION_DTYPE, create=True))
+            self.processes.append(context.Process(
+                target=_process_main, name="gps-ingest", daemon=True,
+                args=(log_level, run_gps_ingest, position_name, gps_path, self._stop),
+            ))
+
+    def start(self) -> None:
+        for process in self.processes:
+            process.start()
+            logger.info(f"Started subsystem '{process.name}' (pid {process.pid})")
+
+    def alive(self) -> dict[str, bool]:
+        return {process.name: process.is_alive() for process in self.processes}
+
+    def sync(self, ship_position=None) -> int:
+        """
+        Dispatch the CAN frames received since the last call to the drivers, and publish
+        a new GPS fix (if any) to `ship_position`. Returns the number of frames dispatched.
+        """
+        if self.position is not None and ship_position is not None:
+            self.position.sync(ship_position)
+        return self.can_pool.poll()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        for process in self.processes:
+            if process.pid is None:
+                continue
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning(f"Subsystem '{process.name}' did not stop, terminating it")
+                process.terminate()
+                process.join(timeout)
+
+        # Only after the children let go of them.
+        self.can_pool.shutdown()
+        if self.position is not None:
+            self.position.block.close()
@@ -1,7 +1,19 @@
+from typing import TYPE_CHECKING, Iterable, Optional
+from loguru import logger
+
+from gps_coordinate.base import GPSPoint
+from gps_coordinate.estimator import EstimatedState, PositionEstimator
 from gps_coordinate.objective import ObjectiveCoordinate
+from runtime.metrics import METRICS
+from ship_state.route_progress import RouteStatus
 from ship_state.ship_properties import ShipProperties
 from ship_state.ship_state import ShipState
 
+if TYPE_CHECKING:
+    from gps_coordinate.path_planner import PathPlanner
+
+_STEP_SECONDS = METRICS.histogram("ship_manager_step_seconds", "Duration of ShipManager.step")
+
 
 class ShipManager:
     _instance = None
@@ -15,12 +27,49 @@ class ShipManager:
     def __init__(self):
         self.ship_properties = ShipProperties()
         self.ship_state = ShipState()
+        self.route_status: Optional[RouteStatus] = None
+        # With an estimator, control follows the filtered estimate instead of the raw GPS fixes.
+        self.estimator: Optional[PositionEstimator] = None
+        self.estimate: Optional[EstimatedState] = None
+        # Set once the fence and the buoys are known; keeps its graph between plans.
+        self.path_planner: Optional["PathPlanner"] = None
 
         # TODO
         ...
 
     def step(self) -> None:
-        ...
+        position = self.ship_state.current_position
+        # Until the first fix is published the position is only a placeholder (sequence 0).
+        if position is None or position.snapshot().sequence == 0:
+            return
+
+        with _STEP_SECONDS.time():
+            if self.estimator is not None:
+                # Fuses the latest fix if there is a new one, then extrapolates to now.
+                self.estimator.update_from(position)
+                self.estimate = self.estimator.predict()
+
+            source = position if self.estimate is None else self.estimate
+            # O(1) per tick: only the active leg is looked at.
+            self.route_status = self.ship_state.route_progress.update(*source.get_coordinates())
+
+    def plan_route(self, objectives: Iterable[GPSPoint]) -> bool:
+        """
+        Plan a route from the current position through `objectives` and follow it.
+        Keeps the current route (and returns False) if there is no planner, position or route.
+        """
+        position = self.ship_state.current_position
+        if self.path_planner is None or position is None:
+            logger.warning("Cannot plan a route without a path planner and a position")
+            return False
+
+        route = self.path_planner.plan_route(position, objectives)
+        if route is None:
+            return False
+
+        self.ship_state.route = route
+        return True
 
-    def get_next_objective_coo(self) -> ObjectiveCoordinate:
-        return self.ship_state.route[0]
+    def get_next_objective_coo(self) -> Optional[ObjectiveCoordinate]:
+        # None once the route is finished (or empty).
+        return self.ship_state.route_progress.active_waypoint
@@ -0,0 +1,121 @@
+# ship_state/route_progress.py
+"""Útvonal követése: melyik az aktív waypoint, és mennyire térünk el a szakasztól."""
+
+from math import hypot
+from typing import NamedTuple, Optional
+from loguru import logger
+
+from gps_coordinate import CoordinateArray, ObjectiveCoordinate
+from gps_coordinate.projection import LocalProjection
+
+DEFAULT_ACCEPTANCE_RADIUS_M = 15.0
+
+
+class RouteStatus(NamedTuple):
+    waypoint_index: int            # Index of the active waypoint, len(route) when finished
+    finished: bool
+    advanced: bool                 # Did this update move on to a new waypoint?
+    distance_to_waypoint_m: float
+    cross_track_m: float           # Signed distance from the active leg, positive = starboard (right)
+    along_track_m: float           # Distance made good along the active leg
+    leg_remaining_m: float         # Along-track distance left to the active waypoint
+
+
+class RouteProgress:
+    """
+    Follows a route one leg at a time.
+
+    The active leg runs from the previous waypoint (or the position where tracking
+    started) to the active waypoint. Each `update` only looks at that leg, so its cost
+    does not depend on the route length; reaching the acceptance radius of the active
+    waypoint advances to the next one.
+
+    Args:
+        route (list[ObjectiveCoordinate] | CoordinateArray): Waypoints in order.
+        acceptance_radius (float, optional): Meters, for waypoints without their own.
+            Defaults to `DEFAULT_ACCEPTANCE_RADIUS_M`.
+    """
+
+    def __init__(self, route: list[ObjectiveCoordinate] | CoordinateArray,
+                 acceptance_radius: float = DEFAULT_ACCEPTANCE_RADIUS_M):
+        self.route = route
+        self.acceptance_radius = acceptance_radius
+        self.index = 0
+
+        self._leg_start: Optional[tuple[float, float]] = None
+        self._projection: Optional[LocalProjection] = None
+        self._leg_vector = (0.0, 0.0)
+        self._leg_length = 0.0
+        self._radius = acceptance_radius
+
+    @property
+    def finished(self) -> bool:
+        return self.index >= len(self.route)
+
+    @property
+    def active_waypoint(self) -> Optional[ObjectiveCoordinate]:
+        return None if self.finished else self.route[self.index]
+
+    def reset(self, index: int = 0) -> None:
+        """
+        Restart from waypoint `index`. The next `update` position becomes the leg start.
+        """
+        self.index = index
+        self._leg_start = None
+
+    def _start_leg(self, start_lat: float, start_lon: float) -> None:
+        waypoint = self.route[self.index]
+        lat, lon = waypoint.get_coordinates()
+
+        # The plane is centered on the leg start, so it stays accurate on long routes.
+        self._leg_start = (start_lat, start_lon)
+        self._projection = LocalProjection(start_lat, start_lon)
+        self._leg_vector = self._projection.forward(lat, lon)
+        self._leg_length = hypot(*self._leg_vector)
+
+        radius = getattr(waypoint, "acceptance_radius", None)
+        self._radius = self.acceptance_radius if radius is None else radius
+
+    def update(self, latitude: float, longitude: float) -> RouteStatus:
+        """
+        Feed the current position. Advances past every waypoint whose acceptance radius it is in.
+        """
+        if self.finished:
+            return RouteStatus(self.index, True, False, 0.0, 0.0, 0.0, 0.0)
+
+        if self._leg_start is None:
+            self._start_leg(latitude, longitude)
+
+        advanced = False
+        while True:
+            east, north = self._projection.forward(latitude, longitude)
+            leg_east, leg_north = self._leg_vector
+            distance = hypot(leg_east - east, leg_north - north)
+
+            if distance > self._radius:
+                break
+
+            reached = self.route[self.index]
+            logger.info("Reached waypoint #{} {}", self.index, reached)
+            self.index += 1
+            advanced = True
+
+            if self.finished:
+                return RouteStatus(self.index, True, True, 0.0, 0.0, 0.0, 0.0)
+            self._start_leg(*reached.get_coordinates())
+
+        if self._leg_length > 0:
+            along = (east * leg_east + north * leg_north) / self._leg_length
+            cross = (east * leg_north - north * leg_east) / self._leg_length
+        else:
+            along, cross = 0.0, 0.0
+
+        return RouteStatus(
+            waypoint_index=self.index,
+            finished=False,
+            advanced=advanced,
+            distance_to_waypoint_m=distance,
+            cross_track_m=cross,
+            along_track_m=along,
+            leg_remaining_m=self._leg_length - along,
+        )
@@ -1,7 +1,10 @@
 # ship_state/ship_state.py
 """Ide kellenek a dinamikus tulajdonságok."""
 
-from gps_coordinate import ObjectiveCoordinate, ShipPosition
+from typing import Optional
+
+from gps_coordinate import CoordinateArray, ObjectiveCoordinate, ShipPosition
+from ship_state.route_progress import RouteProgress
 
 
 class ShipState:
@@ -10,14 +13,30 @@ class ShipState:
 
     _instance = None
 
-    def __new__(cls, starting_position):
+    def __new__(cls, starting_position=None):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self, starting_position: ShipPosition):
-        self.current_position: ShipPosition = starting_position
-        self.route: list[ObjectiveCoordinate] = [] # init?
+    def __init__(self, starting_position: Optional[ShipPosition] = None):
+        # Python calls __init__ on every ShipState(...), also when __new__ returned the existing
+        # instance: only the first one sets up the state, later ones must not wipe the route.
+        if not getattr(self, "_initialized", False):
+            self._initialized = True
+            self.current_position: Optional[ShipPosition] = starting_position
+            self.route: list[ObjectiveCoordinate] | CoordinateArray = [] # init?
+        elif starting_position is not None:
+            self.current_position = starting_position
 
         # TODO
         ...
+
+    @property
+    def route(self) -> list[ObjectiveCoordinate] | CoordinateArray:
+        return self._route
+
+    @route.setter
+    def route(self, route: list[ObjectiveCoordinate] | CoordinateArray):
+        # A new route always starts over from its first waypoint.
+        self._route = route
+        self.route_progress = RouteProgress(route)
@@ -0,0 +1,8 @@
+# __init__.py
+
+from .vessel import VesselModel, VesselParams
+from .harness import (Mission, Simulation, SimulationResult, VirtualClock, pursuit_controller,
+                      random_missions, run_batch, run_mission)
+
+__all__ = ["VesselModel", "VesselParams", "Mission", "Simulation", "SimulationResult", "VirtualClock",
+           "pursuit_controller", "random_missions", "run_batch", "run_mission"]
@@ -0,0 +1,48 @@
+# __main__.py
+"""Monte Carlo batch of random missions around Tihany.
+
+    python -m simulation --missions 200 --processes 8
+"""
+
+import argparse
+import sys
+import time
+from loguru import logger
+
+from simulation.harness import random_missions, run_batch
+
+TIHANY = (46.88868997786068, 17.89171566948177)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="SolarBoat simulation batch")
+    parser.add_argument("--missions", type=int, default=16)
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--waypoints", type=int, default=4)
+    parser.add_argument("--spread", type=float, default=500.0, help="Waypoint spread in meters (default 500)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    missions = random_missions(args.missions, TIHANY, waypoints=args.waypoints, spread_m=args.spread, seed=args.seed)
+
+    started = time.perf_counter()
+    results = run_batch(missions, processes=args.processes)
+    wall = time.perf_counter() - started
+
+    finished = sum(result.finished for result in results)
+    sim_time = sum(result.sim_time_s for result in results)
+    ticks = sum(result.control_ticks for result in results)
+    cpu = sum(result.control_cpu_s for result in results)
+
+    print(f"missions finished      {finished}/{len(results)}")
+    print(f"simulated time         {sim_time:.0f} s in {wall:.1f} s wall ({sim_time / wall:.0f}x real time)")
+    print(f"control step CPU       {cpu / ticks * 1e6:.1f} us/tick over {ticks} ticks")
+    print(f"worst cross-track      {max(result.max_cross_track_m for result in results):.1f} m")
+    return 0 if finished == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
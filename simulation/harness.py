@@ -0,0 +1,271 @@
+# harness.py
+
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from math import atan2, degrees
+from typing import Callable, NamedTuple, Optional
+
+import can
+import numpy as np
+from loguru import logger
+
+from can_bus.can_manager import CANManager
+from can_bus.messages import COMPASS, ENGINE_COMMAND, IMU, RUDDER_COMMAND, default_registry
+from gps_coordinate import CoordinateArray, ShipPosition
+from gps_coordinate.projection import LocalProjection
+from runtime.scheduler import RateScheduler
+from ship_manager import ShipManager
+from simulation.vessel import VesselModel, VesselParams
+
+# (throttle %, rudder deg) from the ship manager and the latest decoded sensor frames
+Controller = Callable[[ShipManager, dict[str, dict]], tuple[float, float]]
+
+_channel_ids = itertools.count()
+
+
+class VirtualClock:
+    """
+    Monotonic clock that only moves when the scheduler sleeps on it.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@dataclass(frozen=True)
+class Mission:
+    """
+    One simulated run. Plain data, so it can be shipped to worker processes.
+    """
+    start: tuple[float, float]                  # (lat, lon)
+    route: tuple[tuple[float, float], ...]      # Waypoints (lat, lon)
+    seed: int = 0
+    start_heading: float = 0.0
+    current: tuple[float, float] = (0.0, 0.0)   # Water current (east, north), m/s
+    gps_noise_m: float = 1.5                    # Std. dev. per axis
+    compass_noise_deg: float = 1.0
+    max_duration_s: float = 1800.0
+    vessel: VesselParams = VesselParams()
+
+    physics_rate_hz: float = 20.0
+    gps_rate_hz: float = 10.0
+    control_rate_hz: float = 5.0
+
+
+class SimulationResult(NamedTuple):
+    seed: int
+    finished: bool
+    sim_time_s: float
+    waypoints_reached: int
+    control_ticks: int
+    max_cross_track_m: float
+    control_cpu_s: float        # CPU time spent in the control step (ShipManager + controller + CAN TX)
+    wall_time_s: float
+    track: CoordinateArray      # True positions, one per GPS fix
+
+
+def pursuit_controller(ship_manager: ShipManager, sensors: dict[str, dict]) -> tuple[float, float]:
+    """
+    Steer straight at the active waypoint. Stands in for the real decision module.
+    """
+    waypoint = ship_manager.get_next_objective_coo()
+    position = ship_manager.ship_state.current_position
+    compass = sensors.get(COMPASS)
+    if waypoint is None or position is None or compass is None:
+        return 0.0, 0.0
+
+    east, north = LocalProjection(*position.get_coordinates()).forward(*waypoint.get_coordinates())
+    error = (degrees(atan2(east, north)) - compass["heading"] + 180.0) % 360.0 - 180.0
+
+    rudder = max(-30.0, min(30.0, 1.5 * error))
+    throttle = 100.0 if abs(error) < 45.0 else 40.0
+    return throttle, rudder
+
+
+class Simulation:
+    """
+    Closed-loop run of `ShipManager` against a `VesselModel`, on a virtual clock.
+
+    The vessel publishes noisy GPS fixes into `ShipPosition` and sends compass/IMU
+    frames on a virtual CAN channel; the control step reads those through a `CANManager`,
+    runs `ShipManager.step` and the controller, and sends engine/rudder commands back on
+    the same channel, where the vessel picks them up. Everything runs on one thread off
+    a `RateScheduler` with a `VirtualClock`, so a run is deterministic for a given seed
+    and as fast as the CPU allows.
+
+    ShipManager, ShipState and ShipPosition are process-wide singletons: they are reset
+    at the start of every run, and only one simulation may run per process at a time.
+
+    Args:
+        mission (Mission): What to simulate.
+        controller (Controller, optional): Defaults to `pursuit_controller`.
+        recorder (TelemetryRecorder, optional): Records a state record per control tick.
+    """
+
+    def __init__(self, mission: Mission, controller: Controller = pursuit_controller, recorder=None):
+        self.mission = mission
+        self.controller = controller
+        self.recorder = recorder
+        self.rng = np.random.default_rng(mission.seed)
+        self.clock = VirtualClock()
+
+        self.projection = LocalProjection(*mission.start)
+        self.vessel = VesselModel(mission.vessel, heading=mission.start_heading, current=mission.current)
+        self.track = CoordinateArray(capacity=int(mission.max_duration_s * mission.gps_rate_hz) + 1)
+        self.sensors: dict[str, dict] = {}
+
+        self.control_ticks = 0
+        self.control_cpu = 0.0
+        self.max_cross_track = 0.0
+
+    def _vessel_lat_lon(self, east_noise: float = 0.0, north_noise: float = 0.0) -> tuple[float, float]:
+        return self.projection.inverse(self.vessel.east + east_noise, self.vessel.north + north_noise)
+
+    def run(self) -> SimulationResult:
+        mission = self.mission
+        channel = f"simulation-{os.getpid()}-{next(_channel_ids)}"
+        can_manager = CANManager(channel=channel, interface="virtual")
+        vessel_bus = can.Bus(channel=channel, interface="virtual")
+        registry = default_registry()
+
+        ship_manager = ShipManager()
+        position = ShipPosition()
+        position.publish(*mission.start, timestamp=self.clock())
+        ship_manager.ship_state.current_position = position
+        ship_manager.ship_state.route = CoordinateArray(*zip(*mission.route)) if mission.route else []
+
+        scheduler = RateScheduler(clock=self.clock, sleep=self.clock.sleep)
+        physics_dt = 1.0 / mission.physics_rate_hz
+
+        def physics_step():
+            while (message := vessel_bus.recv(timeout=0)) is not None:
+                decoded = registry.decode(message)
+                if decoded is None:
+                    continue
+                name, values = decoded
+                if name == ENGINE_COMMAND:
+                    self.vessel.command(throttle=values["throttle"] if values["enabled"] else 0.0)
+                elif name == RUDDER_COMMAND:
+                    self.vessel.command(rudder=values["angle"])
+            self.vessel.step(physics_dt)
+
+        def sensor_step():
+            vessel = self.vessel
+            self.track.append(*self._vessel_lat_lon())
+
+            noise = self.rng.normal(0.0, mission.gps_noise_m, 2) if mission.gps_noise_m else (0.0, 0.0)
+            position.publish(*self._vessel_lat_lon(*noise), timestamp=self.clock())
+
+            heading = vessel.heading + (self.rng.normal(0.0, mission.compass_noise_deg) if mission.compass_noise_deg else 0.0)
+            vessel_bus.send(registry.encode(COMPASS, heading=heading % 360.0))
+            vessel_bus.send(registry.encode(IMU, accel_x=vessel.acceleration, accel_y=0.0, yaw_rate=vessel.yaw_rate))
+
+        def control_step():
+            started = time.process_time()
+
+            while (message := can_manager.receive_message(timeout=0)) is not None:
+                decoded = can_manager.decode(message)
+                if decoded is not None:
+                    self.sensors[decoded[0]] = decoded[1]
+
+            ship_manager.step()
+            throttle, rudder = self.controller(ship_manager, self.sensors)
+            can_manager.send_command(ENGINE_COMMAND, throttle=throttle, enabled=1)
+            can_manager.send_command(RUDDER_COMMAND, angle=rudder)
+
+            self.control_cpu += time.process_time() - started
+            self.control_ticks += 1
+
+            status = ship_manager.route_status
+            if status is not None:
+                self.max_cross_track = max(self.max_cross_track, abs(status.cross_track_m))
+            if self.recorder is not None:
+                self.recorder.record_state(
+                    *position.get_coordinates(), heading=self.vessel.heading, throttle=throttle, rudder=rudder,
+                    waypoint=-1 if status is None or status.finished else status.waypoint_index,
+                    timestamp=self.clock(),
+                )
+
+            if ship_manager.ship_state.route_progress.finished:
+                scheduler.stop()
+
+        scheduler.add_task("physics", physics_step, mission.physics_rate_hz)
+        scheduler.add_task("sensors", sensor_step, mission.gps_rate_hz)
+        scheduler.add_task("control", control_step, mission.control_rate_hz)
+
+        wall_started = time.perf_counter()
+        try:
+            scheduler.run(duration=mission.max_duration_s)
+        finally:
+            can_manager.shutdown()
+            vessel_bus.shutdown()
+        wall_time = time.perf_counter() - wall_started
+
+        progress = ship_manager.ship_state.route_progress
+        result = SimulationResult(
+            seed=mission.seed,
+            finished=progress.finished,
+            sim_time_s=self.clock(),
+            waypoints_reached=progress.index,
+            control_ticks=self.control_ticks,
+            max_cross_track_m=float(self.max_cross_track),
+            control_cpu_s=self.control_cpu,
+            wall_time_s=wall_time,
+            track=self.track,
+        )
+        logger.info("Simulation seed={} finished={} in {:.1f} s simulated, {:.3f} s wall",
+                    mission.seed, result.finished, result.sim_time_s, wall_time)
+        return result
+
+
+def run_mission(mission: Mission, controller: Controller = pursuit_controller) -> SimulationResult:
+    return Simulation(mission, controller).run()
+
+
+def run_batch(missions: list[Mission], controller: Controller = pursuit_controller,
+              processes: Optional[int] = None) -> list[SimulationResult]:
+    """
+    Monte Carlo batch: every mission in its own simulation, spread over a process pool.
+    Results are in mission order. `controller` has to be picklable (a module level function).
+
+    Args:
+        processes (int, optional): Worker processes. Defaults to the CPU count; 1 runs inline.
+    """
+    if processes == 1:
+        return [run_mission(mission, controller) for mission in missions]
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(run_mission, missions, repeat(controller)))
+
+
+def random_missions(count: int, origin: tuple[float, float], waypoints: int = 4, spread_m: float = 500.0,
+                    max_current: float = 0.3, seed: int = 0, **kwargs) -> list[Mission]:
+    """
+    `count` missions from `origin` with random waypoints (within `spread_m`), headings and currents.
+    Extra keyword arguments go to every `Mission`.
+    """
+    rng = np.random.default_rng(seed)
+    projection = LocalProjection(*origin)
+
+    missions = []
+    for k in range(count):
+        lats, lons = projection.inverse_many(*rng.uniform(-spread_m, spread_m, (2, waypoints)))
+        missions.append(Mission(
+            start=origin,
+            route=tuple(zip(lats.tolist(), lons.tolist())),
+            seed=seed + k,
+            start_heading=float(rng.uniform(0.0, 360.0)),
+            current=tuple(rng.uniform(-max_current, max_current, 2).tolist()),
+            **kwargs,
+        ))
+    return missions
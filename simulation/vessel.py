@@ -0,0 +1,65 @@
+# vessel.py
+
+from dataclasses import dataclass
+from math import cos, exp, radians, sin
+
+
+@dataclass(frozen=True)
+class VesselParams:
+    max_speed: float = 3.0             # m/s at full throttle
+    speed_time_constant: float = 4.0   # s, first order response to throttle
+    max_rudder: float = 30.0           # deg
+    max_yaw_rate: float = 15.0         # deg/s at full rudder and max speed
+
+
+class VesselModel:
+    """
+    Kinematic boat on the local east/north plane (meters).
+
+    Speed follows the throttle with a first order lag, the turn rate is proportional
+    to rudder angle and speed (no rudder authority when stopped), and a constant
+    water current drifts the hull. Good enough to close the loop around navigation
+    logic, not a hydrodynamic model.
+
+    Args:
+        params (VesselParams, optional): Defaults to `VesselParams()`.
+        heading (float, optional): Initial heading, degrees clockwise from north.
+        current (tuple[float, float], optional): Water current (east, north), m/s.
+    """
+
+    def __init__(self, params: VesselParams | None = None, heading: float = 0.0,
+                 current: tuple[float, float] = (0.0, 0.0)):
+        self.params = params or VesselParams()
+        self.current = current
+
+        self.east = 0.0
+        self.north = 0.0
+        self.heading = heading % 360.0
+        self.speed = 0.0
+        self.yaw_rate = 0.0
+        self.acceleration = 0.0
+
+        self.throttle = 0.0   # -100 .. 100 %
+        self.rudder = 0.0     # deg, positive is starboard
+
+    def command(self, throttle: float | None = None, rudder: float | None = None) -> None:
+        if throttle is not None:
+            self.throttle = max(-100.0, min(100.0, throttle))
+        if rudder is not None:
+            limit = self.params.max_rudder
+            self.rudder = max(-limit, min(limit, rudder))
+
+    def step(self, dt: float) -> None:
+        params = self.params
+
+        target = self.throttle / 100.0 * params.max_speed
+        speed = target + (self.speed - target) * exp(-dt / params.speed_time_constant)
+        self.acceleration = (speed - self.speed) / dt
+        self.speed = speed
+
+        self.yaw_rate = params.max_yaw_rate * (self.rudder / params.max_rudder) * (speed / params.max_speed)
+        self.heading = (self.heading + self.yaw_rate * dt) % 360.0
+
+        heading = radians(self.heading)
+        self.east += (speed * sin(heading) + self.current[0]) * dt
+        self.north += (speed * cos(heading) + self.current[1]) * dt
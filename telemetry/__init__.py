@@ -0,0 +1,7 @@
+# __init__.py
+
+from .records import STREAM_DTYPES, STATE_DTYPE, CAN_FRAME_DTYPE
+from .recorder import TelemetryRecorder
+from .replay import TelemetryReader
+
+__all__ = ["STREAM_DTYPES", "STATE_DTYPE", "CAN_FRAME_DTYPE", "TelemetryRecorder", "TelemetryReader"]
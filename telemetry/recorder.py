@@ -0,0 +1,180 @@
+# recorder.py
+
+import math
+import os
+from threading import Lock
+from typing import Optional
+import numpy as np
+from loguru import logger
+
+from .records import (HEADER_SIZE, STREAM_DTYPES, can_record, chunk_name, pack_header, parse_chunk_name,
+                      state_record)
+
+DEFAULT_CHUNK_BYTES = 16 * 1024 * 1024
+DEFAULT_BUFFER_RECORDS = 256
+
+
+class _StreamWriter:
+    """
+    Append-only writer of one stream. Records go into a preallocated structured array
+    and hit the file as one `write` per `buffer_records` records.
+    """
+
+    def __init__(self, directory: str, stream: str, dtype: np.dtype, chunk_bytes: int, buffer_records: int):
+        self.directory = directory
+        self.stream = stream
+        self.dtype = dtype
+        self.records_per_chunk = max(1, (chunk_bytes - HEADER_SIZE) // dtype.itemsize)
+
+        self.buffer = np.zeros(buffer_records, dtype=dtype)
+        self.pending = 0
+        self.written = 0       # Records in the open chunk
+        self.total = 0         # Records recorded by this writer
+        self.lock = Lock()
+
+        # Never touch chunks of an earlier session, continue after them.
+        indices = [parsed[1] for parsed in map(parse_chunk_name, os.listdir(directory))
+                   if parsed is not None and parsed[0] == stream]
+        self.chunk_index = max(indices, default=-1) + 1
+        self.file = None
+
+    def _open_chunk(self) -> None:
+        path = os.path.join(self.directory, chunk_name(self.stream, self.chunk_index))
+        self.file = open(path, "xb")
+        self.file.write(pack_header(self.stream, self.dtype))
+        self.written = 0
+        logger.debug("Opened telemetry chunk {}", path)
+
+    def _close_chunk(self, sync: bool) -> None:
+        if self.file is None:
+            return
+        self.file.flush()
+        if sync:
+            os.fsync(self.file.fileno())
+        self.file.close()
+        self.file = None
+        self.chunk_index += 1
+
+    def append(self, record: tuple) -> None:
+        # Caller holds the lock.
+        self.buffer[self.pending] = record
+        self.pending += 1
+        self.total += 1
+        if self.pending == len(self.buffer):
+            self.write_pending()
+
+    def write_pending(self) -> None:
+        # Caller holds the lock.
+        start = 0
+        while start < self.pending:
+            if self.file is None:
+                self._open_chunk()
+
+            count = min(self.pending - start, self.records_per_chunk - self.written)
+            # memoryview: no intermediate bytes copy of the buffer.
+            self.file.write(memoryview(self.buffer[start:start + count]).cast("B"))
+            self.written += count
+            start += count
+
+            if self.written == self.records_per_chunk:
+                self._close_chunk(sync=False)
+
+        self.pending = 0
+
+    def flush(self, sync: bool) -> None:
+        with self.lock:
+            self.write_pending()
+            if self.file is not None:
+                self.file.flush()
+                if sync:
+                    os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        with self.lock:
+            self.write_pending()
+            self._close_chunk(sync=True)
+
+
+class TelemetryRecorder:
+    """
+    Binary telemetry log: fixed-width records appended to chunked, append-only files
+    (see `records.py` for the layout), meant to be read back with `TelemetryReader`.
+
+    A record costs one structured-array assignment; the file only sees a write every
+    `buffer_records` records, and `fsync` only happens on `flush(sync=True)` and `close`,
+    so hours of 20 Hz data don't wear out the SD card the way text logging does.
+    At most `buffer_records` records per stream are lost on a crash.
+
+    Thread safe: the control loop and the CAN RX thread can record at the same time.
+
+    Args:
+        directory (str): Created if missing. A new session continues the chunk numbering.
+        chunk_bytes (int, optional): Size after which a new chunk file is started. Defaults to 16 MiB.
+        buffer_records (int, optional): Records buffered per stream between writes. Defaults to 256.
+    """
+
+    def __init__(self, directory: str, chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+                 buffer_records: int = DEFAULT_BUFFER_RECORDS):
+        if buffer_records < 1:
+            raise ValueError("buffer_records must be at least 1")
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._streams = {
+            stream: _StreamWriter(directory, stream, dtype, chunk_bytes, buffer_records)
+            for stream, dtype in STREAM_DTYPES.items()
+        }
+        self.closed = False
+
+    def __enter__(self) -> "TelemetryRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def record(self, stream: str, record: tuple) -> None:
+        """
+        Append a raw record, a tuple in the field order of the stream's dtype.
+        """
+        if self.closed:
+            raise ValueError("TelemetryRecorder is closed")
+
+        writer = self._streams[stream]
+        with writer.lock:
+            writer.append(record)
+
+    def record_state(self, latitude: float, longitude: float, heading: float = math.nan,
+                     throttle: float = math.nan, rudder: float = math.nan, waypoint: int = -1,
+                     timestamp: Optional[float] = None) -> None:
+        """
+        Append a state record. `timestamp` defaults to `time.time()`.
+        """
+        self.record("state", state_record(latitude, longitude, heading, throttle, rudder, waypoint, timestamp))
+
+    def record_can(self, message, rx: bool = True) -> None:
+        """
+        Append a CAN frame (anything shaped like `can.Message`). Its own timestamp is used if set.
+        """
+        self.record("can", can_record(message, rx))
+
+    def counts(self) -> dict[str, int]:
+        """
+        Records recorded per stream by this recorder (written or still buffered).
+        """
+        return {stream: writer.total for stream, writer in self._streams.items()}
+
+    def flush(self, sync: bool = False) -> None:
+        """
+        Write buffered records. With `sync=True` also `fsync`, so they survive a power cut.
+        """
+        for writer in self._streams.values():
+            writer.flush(sync)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+
+        for writer in self._streams.values():
+            writer.close()
+        logger.info("Telemetry recorder closed: {}", self.counts())
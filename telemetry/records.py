@@ -0,0 +1,104 @@
+# records.py
+"""On-disk layout of the telemetry log.
+
+Every stream is a sequence of chunk files `<stream>-<index>.tlm`. A chunk is a fixed
+header followed by packed, fixed-width records of the stream's dtype, so the record
+count is `(file size - HEADER_SIZE) // itemsize` and a chunk can be memory-mapped
+straight into a NumPy structured array. A record cut short by a crash is ignored.
+"""
+
+import math
+import struct
+import time
+from typing import Optional
+import numpy as np
+
+MAGIC = b"SBTL"
+VERSION = 1
+
+# magic, version, record size, stream name; padded to HEADER_SIZE
+_HEADER = struct.Struct("<4sHH24s")
+HEADER_SIZE = 32
+
+CHUNK_SUFFIX = ".tlm"
+
+# Position and what we decided to do about it, one record per control tick.
+STATE_DTYPE = np.dtype([
+    ("timestamp", "<f8"),   # time.time()
+    ("latitude", "<f8"),
+    ("longitude", "<f8"),
+    ("heading", "<f4"),     # Degrees, NaN if unknown
+    ("throttle", "<f4"),    # Commanded, NaN if none
+    ("rudder", "<f4"),      # Commanded, degrees, NaN if none
+    ("waypoint", "<i4"),    # Active waypoint index, -1 if none
+])
+
+CAN_RX = 0x01
+CAN_EXTENDED_ID = 0x02
+
+CAN_FRAME_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("arbitration_id", "<u4"),
+    ("flags", "u1"),        # CAN_RX | CAN_EXTENDED_ID
+    ("dlc", "u1"),
+    ("data", "u1", (8,)),
+])
+
+STREAM_DTYPES = {
+    "state": STATE_DTYPE,
+    "can": CAN_FRAME_DTYPE,
+}
+
+
+def state_record(latitude: float, longitude: float, heading: float = math.nan, throttle: float = math.nan,
+                 rudder: float = math.nan, waypoint: int = -1, timestamp: Optional[float] = None) -> tuple:
+    """
+    A `STATE_DTYPE` record. `timestamp` defaults to `time.time()`.
+    """
+    if timestamp is None:
+        timestamp = time.time()
+    return timestamp, latitude, longitude, heading, throttle, rudder, waypoint
+
+
+def can_record(message, rx: bool = True) -> tuple:
+    """
+    A `CAN_FRAME_DTYPE` record from anything shaped like `can.Message`. Its own timestamp is used if set.
+    """
+    data = bytes(message.data)
+    flags = (CAN_RX if rx else 0) | (CAN_EXTENDED_ID if message.is_extended_id else 0)
+    payload = np.frombuffer(data.ljust(8, b"\0")[:8], dtype=np.uint8)
+    return message.timestamp or time.time(), message.arbitration_id, flags, min(len(data), 8), payload
+
+
+def pack_header(stream: str, dtype: np.dtype) -> bytes:
+    return _HEADER.pack(MAGIC, VERSION, dtype.itemsize, stream.encode()).ljust(HEADER_SIZE, b"\0")
+
+
+def unpack_header(header: bytes) -> tuple[str, int]:
+    """
+    Returns (stream name, record size). Raises ValueError on anything that is not a chunk header.
+    """
+    if len(header) < HEADER_SIZE:
+        raise ValueError("Truncated telemetry chunk header")
+
+    magic, version, itemsize, stream = _HEADER.unpack_from(header)
+    if magic != MAGIC:
+        raise ValueError(f"Not a telemetry chunk (magic {magic!r})")
+    if version != VERSION:
+        raise ValueError(f"Unsupported telemetry chunk version {version}")
+
+    return stream.rstrip(b"\0").decode(), itemsize
+
+
+def chunk_name(stream: str, index: int) -> str:
+    return f"{stream}-{index:05d}{CHUNK_SUFFIX}"
+
+
+def parse_chunk_name(filename: str) -> tuple[str, int] | None:
+    if not filename.endswith(CHUNK_SUFFIX):
+        return None
+
+    stream, _, index = filename[:-len(CHUNK_SUFFIX)].rpartition("-")
+    if not stream or not index.isdigit():
+        return None
+    return stream, int(index)
@@ -0,0 +1,105 @@
+# replay.py
+
+import os
+from collections import defaultdict
+from typing import Iterator
+import numpy as np
+
+from .records import CAN_EXTENDED_ID, CAN_RX, HEADER_SIZE, STREAM_DTYPES, chunk_name, parse_chunk_name, unpack_header
+
+
+class TelemetryReader:
+    """
+    Read-only view of a telemetry directory written by `TelemetryRecorder`.
+
+    Every chunk is memory-mapped as a structured array, so nothing is read or copied
+    until it is touched, and columns (`chunk["latitude"]`) are plain NumPy views.
+    The file sizes are taken when the reader is created; records appended after that
+    (e.g. by a still running recorder) need a new reader.
+
+    Args:
+        directory (str): Directory with `<stream>-<index>.tlm` chunk files.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._chunks: dict[str, list[np.memmap]] = defaultdict(list)
+
+        found = sorted(filter(None, map(parse_chunk_name, os.listdir(directory))), key=lambda item: item[1])
+        for stream, index in found:
+            chunk = self._map_chunk(os.path.join(directory, chunk_name(stream, index)), stream)
+            if chunk is not None:
+                self._chunks[stream].append(chunk)
+
+    @staticmethod
+    def _map_chunk(path: str, stream: str) -> np.memmap | None:
+        with open(path, "rb") as file:
+            name, itemsize = unpack_header(file.read(HEADER_SIZE))
+
+        dtype = STREAM_DTYPES.get(name)
+        if name != stream or dtype is None:
+            raise ValueError(f"{path}: unknown telemetry stream '{name}'")
+        if dtype.itemsize != itemsize:
+            raise ValueError(f"{path}: record size {itemsize} does not match '{name}' ({dtype.itemsize})")
+
+        # A trailing partial record (crash mid-write) is left out.
+        count = (os.path.getsize(path) - HEADER_SIZE) // itemsize
+        if count == 0:
+            return None
+        return np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+    @property
+    def streams(self) -> list[str]:
+        return [stream for stream, chunks in self._chunks.items() if chunks]
+
+    def chunks(self, stream: str) -> list[np.memmap]:
+        """
+        Memory-mapped chunks of a stream, oldest first. Zero copy.
+        """
+        return list(self._chunks.get(stream, ()))
+
+    def count(self, stream: str) -> int:
+        return sum(len(chunk) for chunk in self._chunks.get(stream, ()))
+
+    def read(self, stream: str) -> np.ndarray:
+        """
+        The whole stream as one array. Zero copy if it fits in a single chunk,
+        otherwise the chunks are concatenated into memory; use `chunks` to avoid that.
+        """
+        chunks = self._chunks.get(stream)
+        if not chunks:
+            return np.empty(0, dtype=STREAM_DTYPES[stream])
+        if len(chunks) == 1:
+            return chunks[0]
+        return np.concatenate(chunks)
+
+    def between(self, stream: str, start: float, end: float) -> Iterator[np.ndarray]:
+        """
+        Zero-copy slices of the chunks with `start <= timestamp < end`. Assumes
+        timestamps are non-decreasing within a chunk, which holds for a single recorder.
+        """
+        for chunk in self._chunks.get(stream, ()):
+            timestamps = chunk["timestamp"]
+            if timestamps[0] >= end or timestamps[-1] < start:
+                continue
+
+            lo, hi = np.searchsorted(timestamps, (start, end), side="left")
+            if hi > lo:
+                yield chunk[lo:hi]
+
+    def can_messages(self):
+        """
+        Recorded CAN frames as `can.Message` objects, e.g. to feed a virtual bus.
+        """
+        import can
+
+        for chunk in self._chunks.get("can", ()):
+            for record in chunk:
+                flags = int(record["flags"])
+                yield can.Message(
+                    timestamp=float(record["timestamp"]),
+                    arbitration_id=int(record["arbitration_id"]),
+                    is_extended_id=bool(flags & CAN_EXTENDED_ID),
+                    is_rx=bool(flags & CAN_RX),
+                    data=record["data"][:record["dlc"]].tobytes(),
+                )
@@ -1,5 +1,178 @@
 # tests/test_4g.py
 
-# TODO: Test 4g network.
 # Might not need 4g from the frameowrk!
-# Can't hurt to at least test any 4g module we try.
\ No newline at end of file
+# The uplink is tested against a local stand-in server; the modem itself is just a TCP route.
+
+import os
+import tempfile
+import time
+import unittest
+import numpy as np
+
+from communication import DiskSpool, Uplink, UplinkServer
+from communication.frames import CODEC_RAW, CODEC_ZLIB, HEADER, decode_frame, encode_frame
+from telemetry import STATE_DTYPE
+from telemetry.records import state_record
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def states(start, stop):
+    return np.array([state_record(46.9 + i * 1e-6, 17.9, heading=i % 360, waypoint=i, timestamp=float(i))
+                     for i in range(start, stop)], dtype=STATE_DTYPE)
+
+
+class TestFrames(unittest.TestCase):
+
+    def test_roundtrip(self):
+        records = states(0, 100)
+        for codec in (CODEC_RAW, CODEC_ZLIB):
+            frame = encode_frame("state", records, session=7, sequence=42, codec=codec)
+            decoded = decode_frame(frame[:HEADER.size], frame[HEADER.size:])
+
+            self.assertEqual((decoded.stream, decoded.session, decoded.sequence), ("state", 7, 42))
+            self.assertEqual(decoded.records.tobytes(), records.tobytes())  # NaN != NaN field-wise
+
+    def test_compresses(self):
+        records = states(0, 200)
+        frame = encode_frame("state", records, session=0, sequence=0, codec=CODEC_ZLIB)
+
+        self.assertLess(len(frame), records.nbytes / 2)
+
+    def test_bad_magic(self):
+        frame = bytearray(encode_frame("state", states(0, 1), 0, 0, CODEC_RAW))
+        frame[:4] = b"JUNK"
+
+        with self.assertRaises(ValueError):
+            decode_frame(bytes(frame[:HEADER.size]), bytes(frame[HEADER.size:]))
+
+
+class TestDiskSpool(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_fifo_and_persistence(self):
+        spool = DiskSpool(self.directory)
+        for sequence in (3, 1, 2):
+            spool.put(sequence, bytes([sequence]) * 10)
+        spool.remove(1)
+
+        reopened = DiskSpool(self.directory)
+        self.assertEqual(reopened.sequences, [2, 3])
+        self.assertEqual(reopened.get(2), b"\x02" * 10)
+        self.assertEqual(reopened.nbytes, 20)
+        self.assertEqual(reopened.next_after(-1), 2)
+        self.assertIsNone(reopened.next_after(3))
+
+    def test_bounded_drops_oldest(self):
+        spool = DiskSpool(self.directory, max_bytes=250)
+        for sequence in range(5):
+            spool.put(sequence, b"x" * 100)
+
+        self.assertEqual(spool.sequences, [3, 4])
+        self.assertEqual(spool.dropped, 3)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+    def test_interrupted_write_is_discarded(self):
+        with open(os.path.join(self.directory, "0000000001.frame.tmp"), "wb") as file:
+            file.write(b"half a frame")
+
+        self.assertEqual(len(DiskSpool(self.directory)), 0)
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+class TestUplink(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.spool_dir = self._tmp.name
+        self.server = UplinkServer().start()
+        self.port = self.server.address[1]
+        self.uplinks = []
+
+    def tearDown(self):
+        for uplink in self.uplinks:
+            uplink.stop()
+        self.server.stop()
+        self._tmp.cleanup()
+
+    def make_uplink(self, **kwargs) -> Uplink:
+        kwargs = {"batch_records": 50, "batch_interval": 0.05, "max_backoff": 0.2, **kwargs}
+        uplink = Uplink("127.0.0.1", self.port, self.spool_dir, **kwargs)
+        self.uplinks.append(uplink)
+        return uplink
+
+    def send(self, uplink, start, stop):
+        for record in states(start, stop).tolist():
+            self.assertTrue(uplink.submit("state", record))
+
+    def received_waypoints(self):
+        return self.server.records("state")["waypoint"].tolist() if self.server.frames else []
+
+    def test_delivers_in_order(self):
+        uplink = self.make_uplink()
+        uplink.start()
+        self.send(uplink, 0, 1000)
+
+        self.assertTrue(wait_until(lambda: len(self.received_waypoints()) == 1000))
+        self.assertEqual(self.received_waypoints(), list(range(1000)))
+        self.assertTrue(wait_until(lambda: uplink.stats()["in_flight"] == 0))
+        self.assertEqual(len(uplink.spool), 0)
+
+    def test_store_and_forward_across_outage(self):
+        uplink = self.make_uplink()
+        uplink.start()
+        self.send(uplink, 0, 200)
+        self.assertTrue(wait_until(lambda: len(self.received_waypoints()) == 200))
+
+        self.server.stop()
+        self.send(uplink, 200, 700)
+        self.assertTrue(wait_until(lambda: not uplink.connected and len(uplink.spool) >= 10))
+
+        self.server = UplinkServer(("127.0.0.1", self.port)).start()
+        self.assertTrue(wait_until(lambda: len(self.received_waypoints()) == 500))
+        self.assertEqual(self.received_waypoints(), list(range(200, 700)))
+        self.assertTrue(wait_until(lambda: len(uplink.spool) == 0))
+        self.assertGreaterEqual(uplink.reconnects, 2)
+
+    def test_spool_survives_restart(self):
+        self.server.stop()
+        uplink = self.make_uplink()
+        uplink.start()
+        self.send(uplink, 0, 300)
+        uplink.stop()
+        self.assertGreater(len(DiskSpool(self.spool_dir)), 0)
+
+        self.server = UplinkServer(("127.0.0.1", self.port)).start()
+        restarted = self.make_uplink()
+        restarted.start()
+
+        self.assertTrue(wait_until(lambda: len(self.received_waypoints()) == 300))
+        self.assertEqual(self.received_waypoints(), list(range(300)))
+
+    def test_submit_never_blocks(self):
+        self.server.stop()
+        uplink = self.make_uplink(queue_size=10)  # Not started: nothing drains the queue
+
+        started = time.perf_counter()
+        results = [uplink.submit("state", record) for record in states(0, 100).tolist()]
+
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(results.count(False), 90)
+        self.assertEqual(uplink.dropped, 90)
+
+
+if __name__ == '__main__':
+    unittest.main()
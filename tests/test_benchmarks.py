@@ -0,0 +1,46 @@
+# tests/test_benchmarks.py
+
+import unittest
+from benchmarks import harness
+from benchmarks import bench_geometry  # noqa: F401
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+
+    def test_run_selected(self):
+        results = harness.run_benchmarks(["gps.haversine_distance"], rounds=2, min_round_time=0.001)
+
+        self.assertEqual(list(results["results"]), ["gps.haversine_distance"])
+        stats = results["results"]["gps.haversine_distance"]
+        self.assertGreater(stats["median_s"], 0)
+        self.assertIn("python", results["meta"])
+
+    def test_teardown_runs(self):
+        events = []
+
+        @harness.benchmark("test.teardown")
+        def _():
+            events.append("setup")
+            yield lambda: None
+            events.append("teardown")
+
+        try:
+            harness.run_benchmarks(["test.teardown"], rounds=1, min_round_time=0.0)
+        finally:
+            del harness.BENCHMARKS["test.teardown"]
+
+        self.assertEqual(events, ["setup", "teardown"])
+
+    def test_compare_flags_regressions(self):
+        baseline = {"results": {"a": {"median_s": 1.0}, "b": {"median_s": 1.0}, "gone": {"median_s": 1.0}}}
+        current = {"results": {"a": {"median_s": 1.05}, "b": {"median_s": 1.5}, "new": {"median_s": 1.0}}}
+
+        rows = {row["name"]: row for row in harness.compare(baseline, current, threshold=0.10)}
+
+        self.assertEqual(set(rows), {"a", "b"})
+        self.assertFalse(rows["a"]["regressed"])
+        self.assertTrue(rows["b"]["regressed"])
+
+
+if __name__ == '__main__':
+    unittest.main()
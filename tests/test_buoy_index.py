@@ -0,0 +1,94 @@
+# tests/test_buoy_index.py
+
+import random
+import unittest
+from gps_coordinate import BuoyPosition, GPSPoint
+from gps_coordinate.buoy_index import BuoyIndex
+from gps_coordinate.projection import LocalProjection
+
+# Tihanyi rév
+TIHANY_LAN = 46.88868997786068
+TIHANY_LON = 17.89171566948177
+
+
+class TestBuoyIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.projection = LocalProjection(TIHANY_LAN, TIHANY_LON)
+        rng = random.Random(42)
+        self.buoys = [
+            BuoyPosition(*self.projection.inverse(rng.uniform(-2000, 2000), rng.uniform(-2000, 2000)),
+                         rng.uniform(5, 30))
+            for _ in range(300)
+        ]
+        self.index = BuoyIndex(self.buoys, cell_size=100, origin=GPSPoint(TIHANY_LAN, TIHANY_LON))
+        self.queries = [GPSPoint(*self.projection.inverse(rng.uniform(-2500, 2500), rng.uniform(-2500, 2500)))
+                        for _ in range(50)]
+
+    def test_within_matches_brute_force(self):
+        for point in self.queries:
+            expected = {b for b in self.buoys if b.haversine_distance(point) <= 250}
+            found = {b for b, _ in self.index.within(point, 250)}
+            self.assertEqual(found, expected)
+
+    def test_nearest_matches_brute_force(self):
+        for point in self.queries:
+            expected = min(self.buoys, key=lambda b: b.haversine_distance(point))
+            buoy, distance = self.index.nearest(point)
+            self.assertIs(buoy, expected)
+            # Planar vs. great circle: well under 0.1 % a few km from the origin
+            self.assertAlmostEqual(distance, expected.haversine_distance(point), delta=1e-3 * distance)
+
+    def test_nearest_max_distance(self):
+        far_away = GPSPoint(*self.projection.inverse(50000, 0))
+        self.assertIsNone(self.index.nearest(far_away, max_distance_m=100))
+        self.assertIsNotNone(self.index.nearest(far_away))
+
+    def test_violations(self):
+        buoy = self.buoys[0]
+        self.assertTrue(self.index.any_violated(buoy))
+        self.assertIn(buoy, self.index.violations(buoy))
+
+        for point in self.queries:
+            expected = {b for b in self.buoys if b.haversine_distance(point) <= b.radius + 10}
+            self.assertEqual(set(self.index.violations(point, clearance_m=10)), expected)
+
+    def test_incremental_insert_and_remove(self):
+        index = BuoyIndex(cell_size=50)
+        point = GPSPoint(TIHANY_LAN, TIHANY_LON)
+        self.assertIsNone(index.nearest(point))
+
+        buoy = BuoyPosition(TIHANY_LAN, TIHANY_LON, 10)
+        index.add(buoy)
+        self.assertEqual(len(index), 1)
+        self.assertTrue(index.any_violated(point))
+
+        index.remove(buoy)
+        self.assertEqual(len(index), 0)
+        self.assertFalse(index.any_violated(point))
+        self.assertIsNone(index.nearest(point))
+
+    def test_unbounded_distance(self):
+        point = self.queries[0]
+        found = self.index.within(point, float("inf"))
+        self.assertEqual(len(found), len(self.buoys))
+        self.assertEqual([d for _, d in found], sorted(d for _, d in found))
+        self.assertEqual(set(self.index.violations(point, clearance_m=float("inf"))), set(self.buoys))
+
+    def test_large_distance_on_sparse_course(self):
+        buoy = BuoyPosition(TIHANY_LAN, TIHANY_LON, 10)
+        index = BuoyIndex([buoy], cell_size=10)
+        far_away = GPSPoint(*self.projection.inverse(30000, 0))
+
+        # Would be billions of (empty) cells without clamping to the occupied ones.
+        self.assertEqual([b for b, _ in index.within(far_away, 1e6)], [buoy])
+        self.assertEqual(index.within(far_away, 20000), [])
+        self.assertEqual(index.violations(far_away, clearance_m=1e6), [buoy])
+
+    def test_remove_unknown(self):
+        with self.assertRaises(KeyError):
+            self.index.remove(BuoyPosition(0, 0, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,117 @@
 # tests/test_can.py
 
-# TODO: Test the CAN device
\ No newline at end of file
+# TODO: Test the CAN device
+
+import threading
+import time
+import unittest
+from can_bus.can_manager import CANManager
+
+
+class TestCANManagerBackgroundIO(unittest.TestCase):
+
+    def setUp(self):
+        # Two managers on the same virtual channel see each other's frames.
+        self.sender = CANManager(channel="test_background_io", interface="virtual")
+        self.receiver = CANManager(channel="test_background_io", interface="virtual")
+
+    def tearDown(self):
+        self.sender.shutdown()
+        self.receiver.shutdown()
+
+    def test_receive_without_traffic_does_not_block(self):
+        self.receiver.start_background_io()
+        self.assertIsNone(self.receiver.receive_message(timeout=0))
+
+    def test_queued_frames_arrive_in_order(self):
+        self.sender.start_background_io()
+        self.receiver.start_background_io()
+
+        for k in range(10):
+            self.assertTrue(self.sender.queue_message(0x100, bytes([k])))
+
+        received = [self.receiver.receive_message(timeout=1.0) for _ in range(10)]
+        self.assertEqual([m.data[0] for m in received], list(range(10)))
+
+    def test_callback_per_arbitration_id(self):
+        self.receiver.start_background_io()
+        seen = []
+        done = threading.Event()
+
+        def on_rudder(msg):
+            seen.append(msg.arbitration_id)
+            done.set()
+
+        self.receiver.add_callback(0x200, on_rudder)
+        self.sender.send_message(0x100, bytes([1]))
+        self.sender.send_message(0x200, bytes([2]))
+
+        self.assertTrue(done.wait(1.0))
+        self.assertEqual(seen, [0x200])
+
+    def test_rx_queue_is_bounded(self):
+        self.receiver.start_background_io(rx_queue_size=4)
+        for k in range(10):
+            self.sender.send_message(0x100, bytes([k]))
+
+        # Let the notifier thread catch up with every frame before reading.
+        deadline = time.monotonic() + 1.0
+        while self.receiver._rx.dropped + self.receiver._rx.queue.qsize() < 10 and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+        received = []
+        while (msg := self.receiver.receive_message(timeout=0.2)) is not None:
+            received.append(msg.data[0])
+
+        # Oldest frames are dropped first.
+        self.assertEqual(received, [6, 7, 8, 9])
+        self.assertEqual(self.receiver._rx.dropped, 6)
+
+
+class TestCANManagerCommands(unittest.TestCase):
+
+    def setUp(self):
+        self.sender = CANManager(channel="test_commands", interface="virtual")
+        self.receiver = CANManager(channel="test_commands", interface="virtual")
+
+    def tearDown(self):
+        self.sender.shutdown()
+        self.receiver.shutdown()
+
+    def test_send_command_roundtrip(self):
+        self.sender.send_command("rudder_command", angle=12.5)
+
+        name, values = self.receiver.decode(self.receiver.receive_message(timeout=1.0))
+        self.assertEqual(name, "rudder_command")
+        self.assertAlmostEqual(values["angle"], 12.5)
+
+    def test_unchanged_commands_are_sent_once(self):
+        for _ in range(5):
+            self.sender.send_command("rudder_command", angle=12.5)
+        self.assertTrue(self.sender.send_command("rudder_command", angle=-3.0))
+
+        received = []
+        while (message := self.receiver.receive_message(timeout=0.1)) is not None:
+            received.append(self.receiver.decode(message)[1]["angle"])
+        self.assertEqual(received, [12.5, -3.0])
+        self.assertEqual(self.sender.tx_scheduler.suppressed, 4)
+
+    def test_tx_policy_by_name(self):
+        self.sender.set_tx_policy("engine_command", min_interval=10.0, priority=1)
+
+        self.assertTrue(self.sender.send_command("engine_command", throttle=10.0, enabled=1))
+        self.assertFalse(self.sender.send_command("engine_command", throttle=20.0, enabled=1))
+        self.assertEqual(self.sender.flush_tx(), 0)
+        self.assertEqual(self.sender.tx_scheduler.pending, 1)
+
+    def test_queue_command_roundtrip(self):
+        self.sender.start_background_io()
+        self.sender.queue_command("engine_command", throttle=-30.0, enabled=1)
+
+        name, values = self.receiver.decode(self.receiver.receive_message(timeout=1.0))
+        self.assertEqual(name, "engine_command")
+        self.assertAlmostEqual(values["throttle"], -30.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
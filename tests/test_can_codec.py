@@ -0,0 +1,86 @@
+# tests/test_can_codec.py
+
+import unittest
+from can_bus.codec import MessageRegistry, MessageSpec, Signal
+from can_bus.messages import ENGINE_COMMAND, RUDDER_COMMAND, default_registry
+
+
+class TestMessageSpec(unittest.TestCase):
+
+    def setUp(self):
+        self.spec = MessageSpec("test", 0x123, [
+            Signal("angle", "h", scale=0.01),
+            Signal("flags", "B"),
+            Signal("offset_value", "H", scale=0.5, offset=-100),
+        ])
+
+    def test_length(self):
+        self.assertEqual(self.spec.length, 5)
+
+    def test_roundtrip(self):
+        message = self.spec.encode(angle=-12.34, flags=3, offset_value=20.5)
+        decoded = self.spec.decode(message.data)
+
+        self.assertAlmostEqual(decoded["angle"], -12.34)
+        self.assertEqual(decoded["flags"], 3)
+        self.assertAlmostEqual(decoded["offset_value"], 20.5)
+
+    def test_cached_message_is_reused(self):
+        first = self.spec.encode(angle=1.0, flags=0, offset_value=0)
+        second = self.spec.encode(angle=2.0, flags=0, offset_value=0)
+
+        self.assertIs(first, second)
+        self.assertEqual(first.arbitration_id, 0x123)
+        self.assertEqual(first.dlc, 5)
+
+    def test_encode_bytes_is_a_copy(self):
+        data = self.spec.encode_bytes(angle=1.0, flags=0, offset_value=0)
+        self.spec.encode(angle=2.0, flags=0, offset_value=0)
+
+        self.assertAlmostEqual(self.spec.decode(data)["angle"], 1.0)
+
+    def test_encode_into_memoryview(self):
+        buffer = bytearray(8)
+        self.spec.encode_into(memoryview(buffer), 3, angle=1.0, flags=7, offset_value=0)
+
+        self.assertEqual(self.spec.decode(buffer[3:])["flags"], 7)
+
+    def test_missing_signal(self):
+        with self.assertRaises(KeyError):
+            self.spec.encode(angle=1.0)
+
+    def test_out_of_range(self):
+        with self.assertRaises(ValueError):
+            self.spec.encode(angle=1000.0, flags=0, offset_value=0)  # int16 overflow
+
+    def test_too_long(self):
+        with self.assertRaises(ValueError):
+            MessageSpec("long", 0x1, [Signal("a", "i"), Signal("b", "i"), Signal("c", "B")])
+
+
+class TestMessageRegistry(unittest.TestCase):
+
+    def test_duplicate_id(self):
+        registry = MessageRegistry([MessageSpec("a", 0x1, [Signal("x", "B")])])
+        with self.assertRaises(ValueError):
+            registry.register(MessageSpec("b", 0x1, [Signal("x", "B")]))
+
+    def test_decode_by_id(self):
+        registry = default_registry()
+        message = registry.encode(RUDDER_COMMAND, angle=-5.5)
+
+        name, values = registry.decode(message)
+        self.assertEqual(name, RUDDER_COMMAND)
+        self.assertAlmostEqual(values["angle"], -5.5)
+
+    def test_unknown_id(self):
+        registry = default_registry()
+        message = registry.encode(ENGINE_COMMAND, throttle=10.0, enabled=1)
+        message.arbitration_id = 0x7FF
+
+        self.assertIsNone(registry.decode(message))
+        message.arbitration_id = registry[ENGINE_COMMAND].arbitration_id  # restore the cached frame
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+# tests/test_can_drivers.py
+
+import threading
+import time
+import unittest
+import warnings
+
+import can
+
+from can_bus.bus_pool import BusPool
+from can_bus.can_manager import CANManager
+from can_bus.device_drivers import CompassDriver, DeviceDriver, EngineDriver, ImuDriver, RudderDriver
+from can_bus.messages import COMPASS, ENGINE_COMMAND, IMU, RUDDER_COMMAND, default_registry
+
+
+def wait_until(predicate, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.001)
+    return False
+
+
+class TestBusPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = BusPool(interface="virtual")
+        self.registry = default_registry()
+        # The "devices": plain buses on the same virtual channels.
+        self.vcan0 = can.Bus(channel="test_pool_vcan0", interface="virtual")
+        self.vcan1 = can.Bus(channel="test_pool_vcan1", interface="virtual")
+
+    def tearDown(self):
+        self.pool.shutdown()
+        self.vcan0.shutdown()
+        self.vcan1.shutdown()
+
+    def test_channel_opened_once(self):
+        first = self.pool.bus("test_pool_vcan0")
+
+        self.assertIs(self.pool.bus("test_pool_vcan0"), first)
+        self.assertIsNot(self.pool.bus("test_pool_vcan1"), first)
+        self.assertEqual(sorted(self.pool.channels), ["test_pool_vcan0", "test_pool_vcan1"])
+
+    def test_filters_are_union_of_drivers(self):
+        compass = CompassDriver(self.pool, "test_pool_vcan1")
+        imu = ImuDriver(self.pool, "test_pool_vcan1")
+
+        filters = self.pool.bus("test_pool_vcan1").filters
+        self.assertEqual(sorted(f["can_id"] for f in filters), sorted(compass.rx_ids + imu.rx_ids))
+        self.assertTrue(all(f["can_mask"] == 0x7FF for f in filters))
+
+        imu.detach()
+        self.assertEqual([f["can_id"] for f in self.pool.bus("test_pool_vcan1").filters], compass.rx_ids)
+
+    def test_driver_only_sees_its_own_frames(self):
+        compass = CompassDriver(self.pool, "test_pool_vcan1")
+        imu = ImuDriver(self.pool, "test_pool_vcan1")
+
+        self.vcan1.send(self.registry.encode(COMPASS, heading=123.45))
+        self.vcan1.send(self.registry.encode(IMU, accel_x=0.1, accel_y=0.0, yaw_rate=-4.5))
+
+        self.assertTrue(wait_until(lambda: compass.heading is not None and imu.yaw_rate is not None))
+        self.assertAlmostEqual(compass.heading, 123.45, places=2)
+        self.assertAlmostEqual(imu.yaw_rate, -4.5, places=2)
+        self.assertEqual((compass.frames_received, imu.frames_received), (1, 1))
+
+    def test_unlisted_ids_are_filtered_out(self):
+        CompassDriver(self.pool, "test_pool_vcan1")
+        seen = []
+        self.pool.add_tap("test_pool_vcan1", seen.append)
+
+        self.vcan1.send(can.Message(arbitration_id=0x7AB, data=b"\x00", is_extended_id=False))
+        self.vcan1.send(self.registry.encode(COMPASS, heading=1.0))
+
+        self.assertTrue(wait_until(lambda: len(seen) >= 1))
+        time.sleep(0.05)
+        self.assertEqual([m.arbitration_id for m in seen], [self.registry[COMPASS].arbitration_id])
+
+    def test_channels_are_isolated(self):
+        compass = CompassDriver(self.pool, "test_pool_vcan1")
+        self.vcan0.send(self.registry.encode(COMPASS, heading=90.0))
+        time.sleep(0.05)
+
+        self.assertIsNone(compass.heading)
+
+    def test_actuator_commands(self):
+        engine = EngineDriver(self.pool, "test_pool_vcan0")
+        rudder = RudderDriver(self.pool, "test_pool_vcan0")
+
+        self.assertTrue(engine.set_throttle(42.0))
+        self.assertTrue(rudder.set_angle(-7.5))
+
+        received = [self.vcan0.recv(timeout=1.0) for _ in range(2)]
+        decoded = dict(self.registry.decode(message) for message in received)
+        self.assertAlmostEqual(decoded[ENGINE_COMMAND]["throttle"], 42.0, places=2)
+        self.assertEqual(decoded[ENGINE_COMMAND]["enabled"], 1)
+        self.assertAlmostEqual(decoded[RUDDER_COMMAND]["angle"], -7.5, places=2)
+
+    def test_unchanged_commands_are_not_resent(self):
+        engine = EngineDriver(self.pool, "test_pool_vcan0")
+        rudder = RudderDriver(self.pool, "test_pool_vcan0")
+        rudder.set_tx_policy(RUDDER_COMMAND, min_interval=10.0)
+
+        self.assertTrue(engine.set_throttle(42.0))
+        self.assertFalse(engine.set_throttle(42.0))
+        self.assertTrue(rudder.set_angle(1.0))
+        self.assertFalse(rudder.set_angle(2.0))
+        self.assertEqual(rudder.tx_scheduler.pending, 1)
+        self.assertEqual(rudder.flush_tx(), 0)
+        # A stop always goes out, even right after another one.
+        self.assertTrue(engine.stop())
+        self.assertTrue(engine.stop())
+
+        received = [self.registry.decode(self.vcan0.recv(timeout=1.0)) for _ in range(4)]
+        self.assertEqual([name for name, _ in received], [ENGINE_COMMAND, RUDDER_COMMAND, ENGINE_COMMAND, ENGINE_COMMAND])
+        self.assertIsNone(self.vcan0.recv(timeout=0.05))
+        self.assertEqual(engine.tx_scheduler.suppressed, 1)
+
+    def test_driver_refuses_foreign_messages(self):
+        rudder = RudderDriver(self.pool, "test_pool_vcan0")
+
+        with self.assertRaises(ValueError):
+            rudder.send(ENGINE_COMMAND, throttle=100.0, enabled=1)
+        with self.assertRaises(ValueError):
+            rudder.set_tx_policy(ENGINE_COMMAND, min_interval=1.0)
+
+    def test_listener(self):
+        compass = CompassDriver(self.pool, "test_pool_vcan1")
+        heard = []
+        compass.add_listener(lambda name, values: heard.append((name, values["heading"])))
+
+        self.vcan1.send(self.registry.encode(COMPASS, heading=270.0))
+
+        self.assertTrue(wait_until(lambda: heard))
+        self.assertEqual(heard[0][0], COMPASS)
+        self.assertAlmostEqual(heard[0][1], 270.0, places=2)
+
+    def test_on_message_hook(self):
+        received = threading.Event()
+
+        class Watcher(DeviceDriver):
+            rx_messages = (COMPASS,)
+
+            def on_message(self, name, values):
+                received.set()
+
+        Watcher(self.pool, "test_pool_vcan1")
+        self.vcan1.send(self.registry.encode(COMPASS, heading=10.0))
+
+        self.assertTrue(received.wait(1.0))
+
+
+class TestCANManagerInterface(unittest.TestCase):
+
+    def test_bustype_is_deprecated_alias(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            manager = CANManager(channel="test_bustype_alias", bustype="virtual")
+        manager.shutdown()
+
+        self.assertEqual(manager.interface, "virtual")
+        self.assertTrue(any(issubclass(w.category, DeprecationWarning) for w in caught))
+
+    def test_conflicting_bustype_and_interface(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            with self.assertRaises(ValueError):
+                CANManager(channel="test_bustype_conflict", bustype="socketcan", interface="virtual")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+# tests/test_can_trace.py
+
+import os
+import tempfile
+import time
+import unittest
+
+import can
+import numpy as np
+
+from can_bus.bus_pool import BusPool
+from can_bus.can_manager import CANManager
+from can_bus.device_drivers import CompassDriver
+from can_bus.messages import COMPASS, default_registry
+from can_bus.trace import TraceRecorder, TraceReplayer, load_trace, read_trace
+from telemetry import TelemetryRecorder
+from telemetry.records import CAN_FRAME_DTYPE, CAN_RX, HEADER_SIZE, can_record
+from tests.test_can_drivers import wait_until
+from tests.test_scheduler import FakeClock
+
+
+def frames(n, start=100.0, step=0.01):
+    return [can.Message(timestamp=start + k * step, arbitration_id=0x100 + k % 4, data=bytes([k % 256] * (k % 9)),
+                        is_extended_id=False) for k in range(n)]
+
+
+class TestTraceFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_compact_roundtrip(self):
+        recorder = TraceRecorder(self.path("race.trace"), buffer_records=16)
+        for message in frames(50):
+            recorder(message)
+        recorder.stop()
+
+        replayed = list(read_trace(self.path("race.trace")))
+        self.assertEqual(len(replayed), 50)
+        for original, copy in zip(frames(50), replayed):
+            self.assertTrue(original.equals(copy, timestamp_delta=1e-9))
+        self.assertEqual(os.path.getsize(self.path("race.trace")), HEADER_SIZE + 50 * CAN_FRAME_DTYPE.itemsize)
+
+    def test_partial_record_is_ignored(self):
+        recorder = TraceRecorder(self.path("cut.trace"))
+        for message in frames(3):
+            recorder(message)
+        recorder.stop()
+        with open(self.path("cut.trace"), "ab") as f:
+            f.write(b"\x01\x02\x03")
+
+        self.assertEqual(len(load_trace(self.path("cut.trace"))), 3)
+
+    def test_vector_formats(self):
+        for name in ("race.blf", "race.asc"):
+            recorder = TraceRecorder(self.path(name))
+            for message in frames(20):
+                recorder(message)
+            recorder.stop()
+
+            records = load_trace(self.path(name))
+            self.assertEqual(records["arbitration_id"].tolist(), [m.arbitration_id for m in frames(20)], name)
+            self.assertEqual(records["dlc"].tolist(), [m.dlc for m in frames(20)], name)
+
+    def test_telemetry_chunk_is_a_trace(self):
+        recorder = TelemetryRecorder(self.tmp.name)
+        for message in frames(5):
+            recorder.record_can(message)
+        recorder.close()
+
+        chunk = [name for name in os.listdir(self.tmp.name) if name.startswith("can-")][0]
+        self.assertEqual(len(load_trace(self.path(chunk))), 5)
+
+    def test_not_a_trace(self):
+        recorder = TelemetryRecorder(self.tmp.name)
+        recorder.record("state", (0.0, 1.0, 2.0, 0.0, 0.0, 0.0, -1))
+        recorder.close()
+
+        chunk = [name for name in os.listdir(self.tmp.name) if name.startswith("state-")][0]
+        with self.assertRaises(ValueError):
+            load_trace(self.path(chunk))
+
+    def test_can_manager_records_both_directions(self):
+        manager = CANManager(channel="test_trace_manager", interface="virtual")
+        device = can.Bus(channel="test_trace_manager", interface="virtual")
+        try:
+            manager.start_recording(self.path("manager.trace"))
+            manager.send_command("engine_command", throttle=10.0, enabled=1)
+            device.send(default_registry().encode(COMPASS, heading=42.0))
+            self.assertIsNotNone(manager.receive_message(timeout=1.0))
+        finally:
+            manager.shutdown()
+            device.shutdown()
+
+        records = load_trace(self.path("manager.trace"))
+        self.assertEqual((records["flags"] & CAN_RX).tolist(), [0, CAN_RX])
+        self.assertFalse(manager.recording)
+
+    def test_sent_frames_keep_their_time(self):
+        manager = CANManager(channel="test_trace_tx_time", interface="virtual")
+        device = can.Bus(channel="test_trace_tx_time", interface="virtual")
+        try:
+            manager.start_recording(self.path("manager.blf"))
+            device.send(default_registry().encode(COMPASS, heading=42.0))
+            self.assertIsNotNone(manager.receive_message(timeout=1.0))
+            time.sleep(0.05)
+            manager.send_command("rudder_command", angle=5.0)
+        finally:
+            manager.shutdown()
+            device.shutdown()
+
+        rx, tx = load_trace(self.path("manager.blf"))
+        self.assertEqual(int(tx["flags"] & CAN_RX), 0)
+        self.assertGreaterEqual(tx["timestamp"] - rx["timestamp"], 0.04)
+
+    def test_recording_leaves_sent_frames_alone(self):
+        manager = CANManager(channel="test_trace_untouched", interface="virtual")
+        registry = default_registry()
+        try:
+            manager.start_recording(self.path("untouched.trace"))
+            message = registry.encode(COMPASS, heading=1.0)
+            self.assertTrue(manager.send_frame(message))
+        finally:
+            manager.shutdown()
+
+        self.assertEqual(message.timestamp, 0.0)
+        self.assertTrue(message.is_rx)
+        self.assertGreater(load_trace(self.path("untouched.trace"))[0]["timestamp"], 0.0)
+
+
+class TestTraceReplayer(unittest.TestCase):
+
+    def trace(self, n, rx=True):
+        return np.array([can_record(message, rx=rx) for message in frames(n)], dtype=CAN_FRAME_DTYPE)
+
+    def test_fast_replay_preserves_order(self):
+        listener = can.Bus(channel="test_replay_fast", interface="virtual")
+        replayer = TraceReplayer(self.trace(500), channel="test_replay_fast", speed=None)
+        try:
+            self.assertEqual(replayer.replay(), 500)
+            received = [listener.recv(timeout=1.0) for _ in range(500)]
+        finally:
+            replayer.stop()
+            listener.shutdown()
+
+        self.assertEqual([m.data for m in received], [m.data for m in frames(500)])
+
+    def test_sent_frames_are_skipped(self):
+        trace = np.concatenate([self.trace(4), self.trace(3, rx=False)])
+        bus = can.Bus(channel="test_replay_tx", interface="virtual")
+        try:
+            self.assertEqual(TraceReplayer(trace, bus=bus, speed=None).replay(), 4)
+            self.assertEqual(TraceReplayer(trace, bus=bus, speed=None, include_tx=True).replay(), 7)
+        finally:
+            bus.shutdown()
+
+    def test_scaled_time(self):
+        clock = FakeClock()
+        bus = can.Bus(channel="test_replay_scaled", interface="virtual")
+        try:
+            replayer = TraceReplayer(self.trace(11), bus=bus, speed=4.0, clock=clock, sleep=clock.sleep)
+            replayer.replay()
+        finally:
+            bus.shutdown()
+
+        # 10 gaps of 10 ms at 4x
+        self.assertAlmostEqual(clock.now, 0.1 / 4)
+
+    def test_invalid_speed(self):
+        with self.assertRaises(ValueError):
+            TraceReplayer(self.trace(1), channel="test_replay_invalid", speed=0)
+
+    def test_drivers_decode_replayed_race(self):
+        registry = default_registry()
+        headings = np.linspace(0.0, 359.0, 200)
+        trace = np.array([can_record(registry.encode(COMPASS, heading=h)) for h in headings], dtype=CAN_FRAME_DTYPE)
+
+        pool = BusPool(interface="virtual")
+        compass = CompassDriver(pool, "test_replay_drivers")
+        replayer = TraceReplayer(trace, channel="test_replay_drivers", speed=None)
+        try:
+            replayer.start()
+            self.assertTrue(replayer.finished.wait(5.0))
+            self.assertTrue(wait_until(lambda: compass.frames_received == len(headings), timeout=5.0))
+        finally:
+            replayer.stop()
+            pool.shutdown()
+
+        self.assertAlmostEqual(compass.heading, 359.0, places=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
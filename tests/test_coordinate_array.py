@@ -0,0 +1,88 @@
+# tests/test_coordinate_array.py
+
+import unittest
+import numpy as np
+from gps_coordinate import GPSPoint, CoordinateArray, CoordinateView
+from gps_coordinate.geofence.circular import CircularGeofence
+from gps_coordinate.geofence.polygonal import PolygonalGeofence
+
+# Tihanyi rév
+TIHANY_LAN = 46.88868997786068
+TIHANY_LON = 17.89171566948177
+
+# Szántódi rév
+SZANTOD_LAN = 46.87993481783788
+SZANTOD_LON = 17.89972984313507
+
+
+class TestCoordinateArray(unittest.TestCase):
+    def test_from_points(self):
+        points = [GPSPoint(1.0, 2.0), GPSPoint(3.0, 4.0)]
+        coords = CoordinateArray.from_points(points)
+
+        self.assertEqual(len(coords), 2)
+        self.assertEqual(coords[1].get_coordinates(), (3.0, 4.0))
+        self.assertEqual(coords[-1].get_coordinates(), (3.0, 4.0))
+
+    def test_append_and_extend_grow(self):
+        coords = CoordinateArray()
+        for k in range(100):
+            coords.append(float(k), float(-k))
+        coords.extend(np.arange(100, 150), -np.arange(100, 150))
+
+        self.assertEqual(len(coords), 150)
+        np.testing.assert_array_equal(coords.lats, np.arange(150))
+        np.testing.assert_array_equal(coords.lons, -np.arange(150))
+
+    def test_index_out_of_range(self):
+        coords = CoordinateArray([1.0], [2.0])
+        with self.assertRaises(IndexError):
+            coords[1]
+
+    def test_mismatched_lengths(self):
+        with self.assertRaises(ValueError):
+            CoordinateArray([1.0, 2.0], [3.0])
+
+    def test_slice_returns_array(self):
+        coords = CoordinateArray(np.arange(10), np.arange(10))
+        part = coords[2:5]
+
+        self.assertIsInstance(part, CoordinateArray)
+        self.assertEqual([p.latitude for p in part], [2.0, 3.0, 4.0])
+
+    def test_view_is_slotted(self):
+        view = CoordinateArray([1.0], [2.0])[0]
+
+        self.assertIsInstance(view, CoordinateView)
+        self.assertFalse(hasattr(view, "__dict__"))
+
+    def test_view_distance_matches_gps_point(self):
+        coords = CoordinateArray([TIHANY_LAN], [TIHANY_LON])
+        reference = GPSPoint(TIHANY_LAN, TIHANY_LON)
+        other = GPSPoint(SZANTOD_LAN, SZANTOD_LON)
+
+        self.assertAlmostEqual(coords[0].haversine_distance(other), reference.haversine_distance(other))
+        self.assertAlmostEqual(coords.distances_from(other)[0], reference.haversine_distance(other))
+
+
+class TestCoordinateArrayGeofences(unittest.TestCase):
+    def test_polygon_from_array(self):
+        vertices = CoordinateArray(
+            [47.4970, 47.4970, 47.5030, 47.5030],
+            [19.0400, 19.0500, 19.0500, 19.0400]
+        )
+        geofence = PolygonalGeofence(vertices)
+
+        self.assertTrue(geofence.contains(GPSPoint(47.4999, 19.0450)))
+        self.assertFalse(geofence.contains(GPSPoint(47.5100, 19.0600)))
+
+    def test_circle_around_view(self):
+        route = CoordinateArray([TIHANY_LAN, SZANTOD_LAN], [TIHANY_LON, SZANTOD_LON])
+        geofence = CircularGeofence(route[0], 2000)
+
+        self.assertTrue(geofence.contains(route[1]))
+        self.assertTrue(geofence.contains_many(route.lats, route.lons).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
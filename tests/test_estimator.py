@@ -0,0 +1,241 @@
+# tests/test_estimator.py
+
+import math
+import unittest
+
+import numpy as np
+
+from can_bus.messages import COMPASS, IMU
+from gps_coordinate import ShipPosition
+from gps_coordinate.estimator import PositionEstimator
+from gps_coordinate.nmea import NMEAParser
+from gps_coordinate.projection import LocalProjection
+from gps_coordinate.ship_position import PositionSnapshot
+from ship_manager import ShipManager
+from tests.test_nmea import sentence
+
+# Tihanyi rév
+TIHANY_LAN = 46.88868997786068
+TIHANY_LON = 17.89171566948177
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Unpublished:
+    # A ShipPosition nothing was published to yet: its (0, 0) placeholder.
+    def snapshot(self):
+        return PositionSnapshot(0.0, 0.0, 0.0, 0)
+
+
+class TestPositionEstimator(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.projection = LocalProjection(TIHANY_LAN, TIHANY_LON)
+        self.estimator = PositionEstimator(gps_std_m=3.0, clock=self.clock)
+        self.rng = np.random.default_rng(7)
+
+    def sail(self, seconds, velocity=(1.0, 2.0), gps_hz=1.0, sensor_hz=10.0, gps_noise=3.0):
+        """
+        Straight line from the origin at `velocity` (east, north); returns (raw, filtered) errors at every fix.
+        """
+        heading = math.degrees(math.atan2(*velocity)) % 360.0
+        raw, filtered = [], []
+        for tick in range(1, int(seconds * sensor_hz) + 1):
+            self.clock.now = tick / sensor_hz
+            east, north = velocity[0] * self.clock.now, velocity[1] * self.clock.now
+
+            self.estimator.update_sensor(COMPASS, {"heading": heading})
+            self.estimator.update_sensor(IMU, {"accel_x": 0.0, "accel_y": 0.0, "yaw_rate": 0.0})
+            if tick % int(sensor_hz / gps_hz) == 0:
+                noise = self.rng.normal(0.0, gps_noise, 2)
+                self.estimator.update_gps(*self.projection.inverse(east + noise[0], north + noise[1]))
+
+                state = self.estimator.state()
+                e, n = self.projection.forward(*state.get_coordinates())
+                raw.append(math.hypot(*noise))
+                filtered.append(math.hypot(e - east, n - north))
+        return raw, filtered
+
+    def test_nothing_before_first_fix(self):
+        self.estimator.update_sensor(COMPASS, {"heading": 90.0})
+
+        self.assertIsNone(self.estimator.predict())
+        self.assertFalse(self.estimator.initialized)
+
+    def test_first_fix_takes_compass_heading(self):
+        self.estimator.update_sensor(COMPASS, {"heading": 90.0})
+        self.estimator.update_gps(TIHANY_LAN, TIHANY_LON)
+
+        state = self.estimator.state()
+        self.assertAlmostEqual(state.heading, 90.0, places=6)
+        self.assertAlmostEqual(state.latitude, TIHANY_LAN)
+
+    def test_velocity_converges_and_noise_drops(self):
+        raw, filtered = self.sail(120)
+
+        state = self.estimator.state()
+        self.assertAlmostEqual(state.east_velocity, 1.0, delta=0.2)
+        self.assertAlmostEqual(state.north_velocity, 2.0, delta=0.2)
+        self.assertAlmostEqual(state.course, math.degrees(math.atan2(1.0, 2.0)), delta=5.0)
+        # After settling the estimate is well inside the raw GPS scatter.
+        self.assertLess(np.sqrt(np.mean(np.square(filtered[30:]))), 0.7 * np.sqrt(np.mean(np.square(raw[30:]))))
+
+    def test_predict_between_fixes(self):
+        self.sail(60)
+        before = self.estimator.state()
+
+        # Control at 10 Hz, GPS silent for half a second.
+        self.clock.now += 0.5
+        after = self.estimator.predict()
+
+        moved_east, moved_north = self.projection.forward(*after.get_coordinates())
+        start_east, start_north = self.projection.forward(*before.get_coordinates())
+        self.assertAlmostEqual(moved_east - start_east, 0.5, delta=0.15)
+        self.assertAlmostEqual(moved_north - start_north, 1.0, delta=0.15)
+        self.assertGreater(after.position_std_m, before.position_std_m)
+
+    def test_outlier_fix_is_rejected(self):
+        self.sail(30)
+        state = self.estimator.state()
+
+        self.clock.now += 0.1
+        jumped = self.projection.inverse(*np.add(self.projection.forward(*state.get_coordinates()), (150.0, 0.0)))
+        accepted = self.estimator.update_gps(*jumped)
+
+        self.assertFalse(accepted)
+        self.assertEqual(self.estimator.rejected_fixes, 1)
+        east, _ = self.projection.forward(*self.estimator.state().get_coordinates())
+        self.assertLess(abs(east - 30.0), 10.0)
+
+    def test_persistent_jump_resets(self):
+        self.sail(30)
+        for k in range(5):
+            self.clock.now += 1.0
+            accepted = self.estimator.update_gps(*self.projection.inverse(500.0, 500.0))
+
+        self.assertTrue(accepted)
+        east, north = self.projection.forward(*self.estimator.state().get_coordinates())
+        self.assertAlmostEqual(east, 500.0, delta=0.01)
+        self.assertAlmostEqual(north, 500.0, delta=0.01)
+
+    def test_heading_wraps_through_north(self):
+        self.estimator.update_gps(TIHANY_LAN, TIHANY_LON)
+        for k, heading in enumerate([355.0, 358.0, 1.0, 4.0, 7.0] * 4):
+            self.clock.now = 0.1 * (k + 1)
+            self.estimator.update_sensor(COMPASS, {"heading": heading})
+
+        heading = self.estimator.state().heading
+        self.assertLess(min(heading, 360.0 - heading), 10.0)
+
+    def test_yaw_rate_from_imu(self):
+        self.estimator.update_gps(TIHANY_LAN, TIHANY_LON)
+        for k in range(50):
+            self.clock.now = 0.1 * (k + 1)
+            self.estimator.update_sensor(IMU, {"accel_x": 0.0, "accel_y": 0.0, "yaw_rate": 6.0})
+            self.estimator.update_sensor(COMPASS, {"heading": 6.0 * self.clock.now})
+
+        self.assertAlmostEqual(self.estimator.state().yaw_rate, 6.0, delta=0.5)
+
+    def test_in_place_steps_match_textbook_ekf(self):
+        self.sail(5)
+        estimator = self.estimator
+        arrays = (estimator.x, estimator.P)
+
+        # Predict 0.1 s with an IMU acceleration held, then a compass update.
+        estimator.update_imu(0.3, -0.1, 0.0)
+        x, P = estimator.x.copy(), estimator.P.copy()
+        self.clock.now += 0.1
+        estimator.update_heading(20.0)
+
+        dt, heading = 0.1, x[4]
+        accel_east = 0.3 * math.sin(heading) - 0.1 * math.cos(heading)
+        accel_north = 0.3 * math.cos(heading) + 0.1 * math.sin(heading)
+        F = np.eye(6)
+        F[0, 2] = F[1, 3] = F[4, 5] = dt
+        F[0, 4], F[1, 4] = 0.5 * accel_north * dt ** 2, -0.5 * accel_east * dt ** 2
+        F[2, 4], F[3, 4] = accel_north * dt, -accel_east * dt
+        G = np.array([[0.5 * dt ** 2, 0, 0], [0, 0.5 * dt ** 2, 0], [dt, 0, 0], [0, dt, 0],
+                      [0, 0, 0.5 * dt ** 2], [0, 0, dt]])
+        Q = G @ np.diag([estimator.accel_var, estimator.accel_var, estimator.yaw_accel_var]) @ G.T
+        x = x + np.array([x[2] * dt + 0.5 * accel_east * dt ** 2, x[3] * dt + 0.5 * accel_north * dt ** 2,
+                          accel_east * dt, accel_north * dt, x[5] * dt, 0.0])
+        P = F @ P @ F.T + Q
+
+        H = np.zeros((1, 6))
+        H[0, 4] = 1.0
+        innovation = (math.radians(20.0) - x[4] + math.pi) % (2 * math.pi) - math.pi
+        K = P @ H.T / (H @ P @ H.T + estimator.compass_var)
+        x = x + (K * innovation).ravel()
+        P = (np.eye(6) - K @ H) @ P
+
+        self.assertIs(estimator.x, arrays[0])
+        self.assertIs(estimator.P, arrays[1])
+        np.testing.assert_allclose(estimator.x, x, rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(estimator.P, P, rtol=1e-9, atol=1e-12)
+
+    def test_gga_and_rmc_of_an_epoch_fuse_once(self):
+        paired, single = PositionEstimator(clock=self.clock), PositionEstimator(clock=self.clock)
+        parser = NMEAParser(on_fix=paired.update_fix)
+        for k in range(3):
+            self.clock.now = float(k)
+            lat, lon = self.projection.inverse(0.0, 2.0 * k)
+            minutes = (lat - 46) * 60, (lon - 17) * 60
+            parser.feed(sentence(f"GPGGA,1200{k:02d},46{minutes[0]:07.4f},N,017{minutes[1]:07.4f},E,1,08,1.0,0,M,0,M,,"))
+            parser.feed(sentence(f"GPRMC,1200{k:02d},A,46{minutes[0]:07.4f},N,017{minutes[1]:07.4f},E,0.0,0.0,010126,,"))
+            # Also when the same fix is handed over twice, e.g. by two hooks
+            paired.update_fix(parser.fix)
+            single.update_gps(parser.fix.latitude, parser.fix.longitude, parser.fix.received_at,
+                              math.sqrt(single.gps_var))
+
+        self.assertEqual(paired.fixes, 3)
+        self.assertAlmostEqual(paired.state().position_std_m, single.state().position_std_m)
+
+    def test_placeholder_position_is_not_fused(self):
+        self.assertFalse(self.estimator.update_from(Unpublished()))
+        self.assertEqual(self.estimator.fixes, 0)
+        self.assertIsNone(self.estimator.predict())
+
+    def test_ship_manager_waits_for_first_fix(self):
+        ship_manager = ShipManager()
+        previous = ship_manager.ship_state.current_position
+        ship_manager.ship_state.current_position = Unpublished()
+        ship_manager.estimator = self.estimator
+        ship_manager.route_status = None
+        try:
+            ship_manager.step()
+            self.assertIsNone(ship_manager.route_status)
+            self.assertIsNone(ship_manager.estimate)
+        finally:
+            ship_manager.ship_state.current_position = previous
+            ship_manager.estimator = None
+
+    def test_ship_manager_follows_estimate(self):
+        ship_manager = ShipManager()
+        position = ShipPosition()
+        ship_manager.ship_state.current_position = position
+        ship_manager.estimator = self.estimator
+        try:
+            position.publish(TIHANY_LAN, TIHANY_LON, timestamp=self.clock())
+            ship_manager.step()
+            self.assertIsNotNone(ship_manager.estimate)
+            self.assertEqual(self.estimator.fixes, 1)
+
+            # No new fix: the estimate moves on without fusing the old one again.
+            self.clock.now = 0.2
+            ship_manager.step()
+            self.assertEqual(self.estimator.fixes, 1)
+            self.assertEqual(ship_manager.estimate.timestamp, 0.2)
+        finally:
+            ship_manager.estimator = None
+            ship_manager.estimate = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,13 @@
 # tests/test_geofence.py
 
 import unittest
+import numpy as np
 from gps_coordinate.geofence.circular import CircularGeofence
 from gps_coordinate.geofence.polygonal import PolygonalGeofence
 from gps_coordinate.base import GPSPoint
+from gps_coordinate.geofence.polygonal import INDEXED_EDGES
+from gps_coordinate.projection import LocalProjection
+from shapely.geometry import LineString, Point
 
 
 class TestCircularGeofence(unittest.TestCase):
@@ -24,6 +28,23 @@ class TestCircularGeofence(unittest.TestCase):
         edge_point = GPSPoint(47.4899, 19.0402)  # ~1km south
         self.assertTrue(self.geofence.contains(edge_point))
 
+    def test_contains_many_matches_scalar(self):
+        lats = np.array([47.4989, 47.5100, 47.4899])
+        lons = np.array([19.0410, 19.0400, 19.0402])
+
+        expected = [self.geofence.contains(GPSPoint(lat, lon)) for lat, lon in zip(lats, lons)]
+        self.assertEqual(self.geofence.contains_many(lats, lons).tolist(), expected)
+
+    def test_large_fence_keeps_its_center(self):
+        center = GPSPoint(47.4979, 19.0402)
+        fence = CircularGeofence(center, radius_m=50000)
+        lats, lons = np.array([47.4979, 47.4979 + 0.6]), np.array([19.0402, 19.0402])
+
+        center.set_coordinates(GPSPoint(48.5, 19.0402))  # read once, at construction
+        expected = [fence.contains(GPSPoint(lat, lon)) for lat, lon in zip(lats, lons)]
+        self.assertEqual(expected, [True, False])
+        self.assertEqual(fence.contains_many(lats, lons).tolist(), expected)
+
 
 class TestPolygonalGeofence(unittest.TestCase):
 
@@ -54,6 +75,136 @@ class TestPolygonalGeofence(unittest.TestCase):
         edge_point = GPSPoint(47.4970, 19.0450)
         self.assertTrue(self.geofence._covers(edge_point))  # Accept as "inside"
 
+    def test_contains_many_matches_scalar(self):
+        lats = np.array([47.4999, 47.5100, 47.4970])
+        lons = np.array([19.0450, 19.0600, 19.0450])
+
+        expected = [self.geofence.contains(GPSPoint(lat, lon)) for lat, lon in zip(lats, lons)]
+        self.assertEqual(self.geofence.contains_many(lats, lons).tolist(), expected)
+
+
+class TestPolygonalGeofenceWithHoles(unittest.TestCase):
+
+    def setUp(self):
+        self.outer = [
+            GPSPoint(47.4970, 19.0400),
+            GPSPoint(47.4970, 19.0500),
+            GPSPoint(47.5030, 19.0500),
+            GPSPoint(47.5030, 19.0400)
+        ]
+        # Exclusion zone in the middle of the fence
+        self.hole = [
+            GPSPoint(47.4990, 19.0440),
+            GPSPoint(47.4990, 19.0460),
+            GPSPoint(47.5010, 19.0460),
+            GPSPoint(47.5010, 19.0440)
+        ]
+        self.geofence = PolygonalGeofence(self.outer, holes=[self.hole])
+
+    def test_point_in_hole_is_outside(self):
+        self.assertFalse(self.geofence.contains(GPSPoint(47.5000, 19.0450)))
+
+    def test_point_between_shell_and_hole(self):
+        self.assertTrue(self.geofence.contains(GPSPoint(47.4980, 19.0420)))
+
+    def test_small_hole_rejected(self):
+        with self.assertRaises(ValueError):
+            PolygonalGeofence(self.outer, holes=[self.hole[:2]])
+
+    def test_multi_part_fence(self):
+        second = [
+            GPSPoint(47.6000, 19.1000),
+            GPSPoint(47.6000, 19.1100),
+            GPSPoint(47.6100, 19.1100),
+        ]
+        geofence = PolygonalGeofence.from_parts([(self.outer, [self.hole]), second])
+
+        self.assertTrue(geofence.contains(GPSPoint(47.4980, 19.0420)))
+        self.assertTrue(geofence.contains(GPSPoint(47.6020, 19.1050)))
+        self.assertFalse(geofence.contains(GPSPoint(47.5000, 19.0450)))
+        self.assertFalse(geofence.contains(GPSPoint(47.5500, 19.0700)))
+
+        self.assertEqual(len(geofence.parts), 2)
+        self.assertIs(geofence.parts[1][0], second)
+        self.assertEqual(geofence.parts[1][1], [])
+        self.assertIs(geofence.vertices, self.outer)
+        self.assertEqual(geofence.holes, [self.hole])
+        self.assertEqual(len(geofence.geometry.geoms), 2)
+
+
+class TestLookAhead(unittest.TestCase):
+    """Fences laid out in meters around a local origin."""
+
+    def setUp(self):
+        self.plane = LocalProjection(46.9, 17.9)
+        self.origin = self.point(0, 0)
+
+    def point(self, east, north):
+        return GPSPoint(*self.plane.inverse(east, north))
+
+    def fence(self, shell, holes=()):
+        return PolygonalGeofence([self.point(*v) for v in shell], [[self.point(*v) for v in hole] for hole in holes])
+
+    def test_circle(self):
+        fence = CircularGeofence(self.origin, radius_m=300)
+
+        crossing = fence.time_to_boundary(self.point(0, 100), 0.0, 4.0)
+        self.assertAlmostEqual(crossing.time_s, 50.0, places=6)
+        self.assertAlmostEqual(crossing.distance_m, 200.0, places=6)
+        east, north = self.plane.forward(*crossing.get_coordinates())
+        self.assertAlmostEqual(east, 0.0, places=3)
+        self.assertAlmostEqual(north, 300.0, places=3)
+
+        # Straight away from the edge: the whole diameter plus the offset.
+        self.assertAlmostEqual(fence.time_to_boundary(self.point(0, 100), 180.0, 4.0).time_s, 100.0, places=6)
+
+    def test_scalar_heading(self):
+        square = self.fence([(-500, -500), (500, -500), (500, 500), (-500, 500)])
+        circle = CircularGeofence(self.origin, radius_m=300)
+
+        np.testing.assert_allclose(square.times_to_boundary(self.origin, 90.0, 5.0), [100.0])
+        np.testing.assert_allclose(circle.times_to_boundary(self.origin, 90.0, 5.0), [60.0])
+
+    def test_square_and_horizon(self):
+        fence = self.fence([(-500, -500), (500, -500), (500, 500), (-500, 500)])
+
+        times = fence.times_to_boundary(self.origin, [0, 45, 90, 180], 5.0)
+        np.testing.assert_allclose(times, [100.0, 100.0 * np.sqrt(2), 100.0, 100.0])
+        np.testing.assert_allclose(fence.times_to_boundary(self.origin, [0, 45], 5.0, horizon_s=120), [100.0, np.inf])
+        self.assertIsNone(fence.time_to_boundary(self.origin, 45, 5.0, horizon_s=120))
+
+    def test_hole_is_a_boundary(self):
+        fence = self.fence([(-500, -500), (500, -500), (500, 500), (-500, 500)],
+                           holes=[[(100, -50), (200, -50), (200, 50), (100, 50)]])
+
+        self.assertAlmostEqual(fence.time_to_boundary(self.origin, 90.0, 10.0).time_s, 10.0)
+        self.assertAlmostEqual(fence.time_to_boundary(self.origin, 270.0, 10.0).time_s, 50.0)
+
+    def test_outside_and_stopped(self):
+        fence = CircularGeofence(self.origin, radius_m=100)
+
+        crossing = fence.time_to_boundary(self.point(0, 200), 0.0, 3.0)
+        self.assertEqual((crossing.time_s, crossing.distance_m), (0.0, 0.0))
+        self.assertIsNone(fence.time_to_boundary(self.origin, 0.0, 0.0))
+
+    def test_large_fence_matches_exact_intersection(self):
+        angles = np.linspace(0, 2 * np.pi, 4 * INDEXED_EDGES, endpoint=False)
+        radii = 2000 * (1 + 0.2 * np.sin(7 * angles))
+        fence = self.fence(list(zip(radii * np.sin(angles), radii * np.cos(angles))))
+        start = self.point(150, -80)
+
+        headings = np.linspace(0, 360, 37)
+        times = fence.times_to_boundary(start, headings, 2.0)
+
+        boundary = fence.geometry.boundary
+        origin = fence.projection.forward(*start.get_coordinates())
+        for heading, time_s in zip(headings, times):
+            direction = np.radians(heading)
+            ray = LineString([origin, (origin[0] + 10000 * np.sin(direction), origin[1] + 10000 * np.cos(direction))])
+            hits = ray.intersection(boundary)
+            expected = min(Point(origin).distance(hit) for hit in getattr(hits, "geoms", [hits])) / 2.0
+            self.assertAlmostEqual(time_s, expected, places=6)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -3,7 +3,8 @@
 import unittest
 from copy import deepcopy as copy
 import threading
-from gps_coordinate import GPSPoint, ShipPosition, BuoyPosition, ObjectiveCoordinate
+import numpy as np
+from gps_coordinate import GPSPoint, ShipPosition, BuoyPosition, ObjectiveCoordinate, haversine_many
 from gps_coordinate.geofence.circular import CircularGeofence
 
 # Tihanyi rév
@@ -42,6 +43,19 @@ class TestGPSPoint(unittest.TestCase):
         p2 = GPSPoint(0, 1)
         self.assertTrue(110000 < p1.haversine_distance(p2) < 112000)
 
+    def test_haversine_many_matches_scalar(self):
+        origin = GPSPoint(TIHANY_LAN, TIHANY_LON)
+        others = [GPSPoint(SZANTOD_LAN, SZANTOD_LON), GPSPoint(BMEK_LAN, BMEK_LON), GPSPoint(0, 0)]
+
+        distances = haversine_many(
+            origin,
+            np.array([p.latitude for p in others]),
+            np.array([p.longitude for p in others])
+        )
+
+        expected = [origin.haversine_distance(p) for p in others]
+        np.testing.assert_allclose(distances, expected, rtol=1e-12)
+
 
 class TestShipPosition(unittest.TestCase):
     def test_singleton_property(self):
@@ -49,6 +63,29 @@ class TestShipPosition(unittest.TestCase):
         p2 = ShipPosition(3.0, 4.0)
         self.assertIs(p1, p2)  # if truly singleton -> this holds
 
+    def test_construction_keeps_the_state(self):
+        fence = CircularGeofence(GPSPoint(TIHANY_LAN, TIHANY_LON), 5000)
+        ship = ShipPosition(TIHANY_LAN, TIHANY_LON, fence)
+        before = ship.snapshot()
+
+        ShipPosition()
+        self.assertIs(ship.snapshot(), before)
+        self.assertIs(ship.geofence, fence)
+
+        ShipPosition(SZANTOD_LAN, SZANTOD_LON)
+        self.assertEqual(ship.get_coordinates(), (SZANTOD_LAN, SZANTOD_LON))
+        self.assertEqual(ship.snapshot().sequence, before.sequence + 1)
+        self.assertIs(ship.geofence, fence)
+
+    def test_fallback_setter_publishes(self):
+        ship = ShipPosition()
+        sequence = ship.snapshot().sequence
+
+        with self.assertWarns(DeprecationWarning):
+            ship._GPSPoint__set_coordinates(1.0, 2.0)
+        self.assertEqual(ship.get_coordinates(), (1.0, 2.0))
+        self.assertEqual(ship.snapshot().sequence, sequence + 1)
+
     def test_thread_safety_update(self):
         init_lat = copy(TIHANY_LAN)
         init_lon = copy(TIHANY_LON)
@@ -74,6 +111,63 @@ class TestShipPosition(unittest.TestCase):
         lat, lon = ship.get_coordinates()
         self.assertIn((lat, lon), [(copy(SZANTOD_LAN), copy(SZANTOD_LON))])
 
+    def test_publish_snapshot(self):
+        ship = ShipPosition()
+        before = ship.snapshot()
+
+        snapshot = ship.publish(1.0, 2.0, timestamp=123.0)
+
+        self.assertEqual(snapshot, ship.snapshot())
+        self.assertEqual(ship.get_coordinates(), (1.0, 2.0))
+        self.assertEqual(snapshot.timestamp, 123.0)
+        self.assertEqual(snapshot.sequence, before.sequence + 1)
+
+    def test_readers_never_see_torn_positions(self):
+        ship = ShipPosition()
+        stop = threading.Event()
+        torn = []
+
+        def writer():
+            k = 0
+            while not stop.is_set():
+                k += 1
+                ship.publish(float(k), float(k))
+
+        def reader():
+            for _ in range(20000):
+                lat, lon = ship.get_coordinates()
+                snapshot = ship.snapshot()
+                if lat != lon or snapshot.latitude != snapshot.longitude:
+                    torn.append((lat, lon))
+
+        writer_thread = threading.Thread(target=writer)
+        writer_thread.start()
+        readers = [threading.Thread(target=reader) for _ in range(4)]
+        for t in readers:
+            t.start()
+        for t in readers:
+            t.join()
+        stop.set()
+        writer_thread.join()
+
+        self.assertEqual(torn, [])
+
+    def test_sequence_is_monotonic_with_concurrent_writers(self):
+        ship = ShipPosition()
+        start = ship.snapshot().sequence
+
+        def writer():
+            for _ in range(1000):
+                ship.publish(1.0, 1.0)
+
+        threads = [threading.Thread(target=writer) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(ship.snapshot().sequence, start + 4000)
+
 
 class TestBuoyPosition(unittest.TestCase):
     def test_within_radius(self):
@@ -106,6 +200,15 @@ class TestBuoyPosition(unittest.TestCase):
 
         self.assertTrue(not buoy.is_within_radius(p))
 
+    def test_projection_follows_the_buoy(self):
+        buoy = BuoyPosition(TIHANY_LAN, TIHANY_LON, 100)
+        near_tihany = GPSPoint(TIHANY_LAN + 0.0005, TIHANY_LON)
+        self.assertTrue(buoy.is_within_radius(near_tihany))
+        self.assertIs(buoy._projection(), buoy._projection())
+
+        buoy.set_coordinates(GPSPoint(SZANTOD_LAN, SZANTOD_LON))
+        self.assertFalse(buoy.is_within_radius(near_tihany))
+
 
 class TestObjectiveCoordinate(unittest.TestCase):
 
@@ -0,0 +1,71 @@
+# tests/test_log_config.py
+
+import os
+import sys
+import tempfile
+import unittest
+from loguru import logger
+from runtime.log_config import ModuleFilter, configure_logging
+
+
+def make_record(name, level):
+    return {"name": name, "level": logger.level(level)}
+
+
+class TestModuleFilter(unittest.TestCase):
+
+    def test_default_level(self):
+        module_filter = ModuleFilter("INFO")
+
+        self.assertFalse(module_filter(make_record("gps_coordinate.base", "DEBUG")))
+        self.assertTrue(module_filter(make_record("gps_coordinate.base", "INFO")))
+
+    def test_longest_prefix_wins(self):
+        module_filter = ModuleFilter("INFO", module_levels={
+            "gps_coordinate": "WARNING",
+            "gps_coordinate.ship_position": "DEBUG",
+        })
+
+        self.assertFalse(module_filter(make_record("gps_coordinate.base", "INFO")))
+        self.assertTrue(module_filter(make_record("gps_coordinate.ship_position", "DEBUG")))
+        # Prefixes match whole module names only
+        self.assertFalse(module_filter(make_record("gps_coordinate_extra", "DEBUG")))
+        self.assertEqual(module_filter.min_level, logger.level("DEBUG").no)
+
+    def test_sampling(self):
+        module_filter = ModuleFilter("DEBUG", sample_rates={"can_bus": 5})
+
+        passed = sum(module_filter(make_record("can_bus.can_manager", "DEBUG")) for _ in range(100))
+
+        self.assertLessEqual(passed, 6)
+        self.assertGreaterEqual(module_filter.dropped()["can_bus"], 94)
+        # Other modules are not sampled
+        self.assertTrue(all(module_filter(make_record("main", "DEBUG")) for _ in range(100)))
+
+
+class TestConfigureLogging(unittest.TestCase):
+
+    def tearDown(self):
+        logger.remove()
+        logger.add(sys.stderr)
+
+    def test_file_sinks_split_by_module(self):
+        with tempfile.TemporaryDirectory() as log_dir:
+            configure_logging(
+                level="DEBUG",
+                log_dir=log_dir,
+                file_sinks={"tests": "tests.log", "nothing": "nothing.log"},
+                console=False,
+                enqueue=False,
+            )
+            logger.debug("hello {}", "sink")
+            logger.remove()
+
+            with open(os.path.join(log_dir, "tests.log")) as f:
+                self.assertIn("hello sink", f.read())
+            # Sinks are opened lazily: no records, no file
+            self.assertFalse(os.path.exists(os.path.join(log_dir, "nothing.log")))
+
+
+if __name__ == '__main__':
+    unittest.main()
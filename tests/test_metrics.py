@@ -0,0 +1,139 @@
+# tests/test_metrics.py
+
+import math
+import os
+import signal
+import tempfile
+import threading
+import time
+import unittest
+import urllib.request
+
+from runtime.metrics import METRICS, MetricsRegistry
+from runtime.profiler import SamplingProfiler, install_signal_toggle
+from runtime.scheduler import RateScheduler
+
+
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_get_or_create(self):
+        first = self.registry.counter("frames_total", "Frames", bus="can0")
+
+        self.assertIs(self.registry.counter("frames_total", bus="can0"), first)
+        self.assertIsNot(self.registry.counter("frames_total", bus="can1"), first)
+        with self.assertRaises(ValueError):
+            self.registry.gauge("frames_total")
+
+    def test_histogram(self):
+        histogram = self.registry.histogram("step_seconds", buckets=(0.001, 0.01, 0.1))
+        for value in (0.0005, 0.005, 0.005, 0.05, 5.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.counts, [1, 2, 1, 1])
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.max, 5.0)
+        self.assertEqual(histogram.quantile(0.5), 0.01)
+        self.assertEqual(histogram.quantile(1.0), math.inf)
+
+    def test_span(self):
+        with self.registry.span("work"):
+            spin(0.002)
+
+        histogram = self.registry.histogram("work_seconds")
+        self.assertEqual(histogram.count, 1)
+        self.assertGreaterEqual(histogram.sum, 0.002)
+
+    def test_prometheus_text(self):
+        self.registry.counter("can_frames_total", "Frames seen", path="rx").inc(3)
+        self.registry.gauge("queue_depth").set(7)
+        self.registry.histogram("step_seconds", "Step", buckets=(0.01, 0.1)).observe(0.05)
+        self.registry.add_collector(lambda: [("uptime_seconds", "gauge", "Uptime", {}, 12.5)])
+
+        text = self.registry.render_prometheus()
+
+        self.assertIn("# HELP can_frames_total Frames seen\n# TYPE can_frames_total counter\n", text)
+        self.assertIn('can_frames_total{path="rx"} 3\n', text)
+        self.assertIn("queue_depth 7\n", text)
+        self.assertIn('step_seconds_bucket{le="0.01"} 0\n', text)
+        self.assertIn('step_seconds_bucket{le="0.1"} 1\n', text)
+        self.assertIn('step_seconds_bucket{le="+Inf"} 1\n', text)
+        self.assertIn("step_seconds_count 1\n", text)
+        self.assertIn("uptime_seconds 12.5\n", text)
+
+    def test_snapshot(self):
+        self.registry.counter("errors_total").inc()
+        self.registry.histogram("step_seconds").observe(0.0002)
+
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot["errors_total"], 1)
+        self.assertEqual(snapshot["step_seconds"]["count"], 1)
+
+    def test_http_endpoint(self):
+        self.registry.counter("requests_total").inc()
+        profiler = SamplingProfiler(interval=0.001)
+        server = self.registry.serve(0, profiler=profiler)
+        try:
+            base = f"http://127.0.0.1:{server.port}"
+            with urllib.request.urlopen(f"{base}/metrics") as response:
+                self.assertIn("requests_total 1", response.read().decode())
+
+            with urllib.request.urlopen(f"{base}/profile?seconds=0.1") as response:
+                self.assertIn("MainThread", response.read().decode())
+        finally:
+            server.stop()
+
+    def test_scheduler_is_instrumented(self):
+        scheduler = RateScheduler()
+        scheduler.add_task("metrics_test_task", lambda: 1 / 0, 100)
+        scheduler.run_pending()
+
+        self.assertGreaterEqual(METRICS.counter("scheduler_task_errors_total", task="metrics_test_task").value, 1)
+        self.assertGreaterEqual(METRICS.histogram("scheduler_task_seconds", task="metrics_test_task").count, 1)
+
+
+class TestSamplingProfiler(unittest.TestCase):
+
+    def test_finds_hot_function(self):
+        profiler = SamplingProfiler(interval=0.001)
+        worker = threading.Thread(target=spin, args=(0.3,), name="worker")
+
+        profiler.start()
+        worker.start()
+        worker.join()
+        collapsed = profiler.stop()
+
+        self.assertFalse(profiler.running)
+        self.assertGreater(profiler.samples, 10)
+        self.assertTrue(any(line.startswith("worker;") and "spin (" in line for line in collapsed.splitlines()))
+        self.assertTrue(any(name.startswith("spin (") for name, _ in profiler.top(3)))
+
+    def test_signal_toggle(self):
+        profiler = SamplingProfiler(interval=0.001)
+        with tempfile.TemporaryDirectory() as directory:
+            previous = signal.getsignal(signal.SIGUSR1)
+            try:
+                install_signal_toggle(profiler, directory)
+                os.kill(os.getpid(), signal.SIGUSR1)
+                spin(0.05)
+                self.assertTrue(profiler.running)
+
+                os.kill(os.getpid(), signal.SIGUSR1)
+                spin(0.01)
+                self.assertFalse(profiler.running)
+                self.assertEqual(len(os.listdir(directory)), 1)
+            finally:
+                signal.signal(signal.SIGUSR1, previous)
+                profiler.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+# tests/test_nmea.py
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from gps_coordinate import ShipPosition
+from gps_coordinate.nmea import KNOTS_TO_MPS, NMEAIngest, NMEAParser, nmea_checksum
+
+GGA = b"$GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47\r\n"
+RMC = b"$GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W*6A\r\n"
+VTG = b"$GPVTG,054.7,T,034.4,M,005.5,N,010.2,K*48\r\n"
+
+
+def sentence(body: str) -> bytes:
+    raw = body.encode()
+    return b"$" + raw + b"*" + f"{nmea_checksum(raw):02X}".encode() + b"\r\n"
+
+
+def balaton_track(n: int) -> bytes:
+    # Heading north-east from Tihany
+    return b"".join(
+        sentence(f"GNGGA,1200{k:02d},4653.{321 + k:03d},N,01753.{503 + k:03d},E,1,09,0.8,104.0,M,40.0,M,,")
+        for k in range(n)
+    )
+
+
+class TestNMEAParser(unittest.TestCase):
+
+    def setUp(self):
+        self.fixes = []
+        self.parser = NMEAParser(on_fix=lambda fix: self.fixes.append((fix.latitude, fix.longitude)))
+
+    def test_gga(self):
+        self.parser.feed(GGA)
+
+        self.assertEqual(len(self.fixes), 1)
+        self.assertAlmostEqual(self.fixes[0][0], 48 + 7.038 / 60)
+        self.assertAlmostEqual(self.fixes[0][1], 11 + 31.0 / 60)
+        self.assertEqual(self.parser.fix.satellites, 8)
+
+    def test_rmc_and_vtg(self):
+        self.parser.feed(RMC)
+        self.assertAlmostEqual(self.parser.fix.speed_mps, 22.4 * KNOTS_TO_MPS)
+        self.assertAlmostEqual(self.parser.fix.course_deg, 84.4)
+
+        self.parser.feed(VTG)
+        self.assertAlmostEqual(self.parser.fix.speed_mps, 10.2 / 3.6)
+        self.assertAlmostEqual(self.parser.fix.course_deg, 54.7)
+
+    def test_byte_by_byte(self):
+        data = GGA + RMC + VTG
+        for k in range(len(data)):
+            self.parser.feed(data[k:k + 1])
+
+        # GGA and RMC of the same epoch: one fix
+        self.assertEqual(len(self.fixes), 1)
+        self.assertEqual(self.parser.sentences, 3)
+
+    def test_one_fix_per_epoch(self):
+        self.parser.feed(GGA + RMC)
+        self.assertEqual(len(self.fixes), 1)
+        # RMC's fields are merged into the fix GGA published
+        self.assertAlmostEqual(self.parser.fix.speed_mps, 22.4 * KNOTS_TO_MPS)
+        self.assertEqual(self.parser.fix.satellites, 8)
+
+        self.parser.feed(sentence("GPRMC,123520,A,4807.040,N,01131.000,E,022.4,084.4,230394,003.1,W"))
+        self.parser.feed(sentence("GPGGA,123520,4807.040,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,"))
+        self.assertEqual(len(self.fixes), 2)
+        self.assertAlmostEqual(self.fixes[1][0], 48 + 7.040 / 60)
+
+    def test_bad_checksum(self):
+        self.parser.feed(GGA.replace(b"*47", b"*48"))
+
+        self.assertEqual(self.fixes, [])
+        self.assertEqual(self.parser.checksum_errors, 1)
+
+    def test_southern_western_hemisphere(self):
+        self.parser.feed(sentence("GPGGA,000000,3352.000,S,15112.000,W,1,05,1.0,0.0,M,0.0,M,,"))
+
+        self.assertLess(self.fixes[0][0], 0)
+        self.assertLess(self.fixes[0][1], 0)
+
+    def test_no_fix_is_not_published(self):
+        self.parser.feed(sentence("GPGGA,000000,,,,,0,00,,,M,,M,,"))
+        self.parser.feed(sentence("GPRMC,000000,V,,,,,,,,,"))
+
+        self.assertEqual(self.fixes, [])
+        self.assertFalse(self.parser.fix.valid)
+
+    def test_garbage_is_discarded(self):
+        self.parser.feed(b"\x00\xff" * 200)
+        self.parser.feed(b"noise" + GGA)
+
+        self.assertEqual(len(self.fixes), 1)
+        self.assertGreater(self.parser.discarded_bytes, 0)
+
+
+class TestNMEAIngest(unittest.TestCase):
+
+    def setUp(self):
+        self.ship = ShipPosition()
+
+    def test_replay_file(self):
+        with tempfile.NamedTemporaryFile(suffix=".nmea", delete=False) as f:
+            f.write(balaton_track(20))
+        try:
+            ingest = NMEAIngest(f.name, self.ship)
+            start = self.ship.snapshot().sequence
+            ingest.start()
+            self.assertTrue(ingest.finished.wait(2.0))
+
+            self.assertEqual(ingest.fixes, 20)
+            self.assertEqual(self.ship.snapshot().sequence, start + 20)
+            self.assertAlmostEqual(self.ship.latitude, 46 + 53.340 / 60)
+        finally:
+            os.unlink(f.name)
+
+    def test_paced_replay_stamps_release_time(self):
+        with tempfile.NamedTemporaryFile(suffix=".nmea", delete=False) as f:
+            f.write(balaton_track(3))
+        try:
+            released = []
+            ingest = NMEAIngest(f.name, self.ship, replay_rate_hz=20.0,
+                                on_fix=lambda fix: released.append((fix.received_at, time.monotonic())))
+            ingest.start()
+            self.assertTrue(ingest.finished.wait(2.0))
+        finally:
+            os.unlink(f.name)
+
+        self.assertEqual(len(released), 3)
+        # Paced 50 ms apart, and each stamp is from after its wait, not from when it was parsed.
+        for (stamp, _), (next_stamp, _) in zip(released, released[1:]):
+            self.assertGreater(next_stamp - stamp, 0.04)
+        for stamp, seen in released:
+            self.assertLess(seen - stamp, 0.02)
+
+    def test_pty_receiver(self):
+        master, slave = os.openpty()
+        received = threading.Event()
+
+        def on_fix(fix):
+            if ingest.fixes == 5:
+                received.set()
+
+        ingest = NMEAIngest(os.ttyname(slave), self.ship, baudrate=4800, on_fix=on_fix)
+        ingest.start()
+        try:
+            os.write(master, balaton_track(5))
+            self.assertTrue(received.wait(2.0))
+            self.assertAlmostEqual(self.ship.longitude, 17 + 53.507 / 60)
+        finally:
+            ingest.stop()
+            os.close(master)
+            os.close(slave)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+# tests/test_path_planner.py
+
+import random
+import time
+import unittest
+
+import shapely
+from shapely.geometry import LineString, Point
+
+from gps_coordinate import BuoyPosition, CoordinateArray, GPSPoint, ObjectiveCoordinate, PathPlanner, ShipPosition
+from gps_coordinate.geofence import PolygonalGeofence
+from gps_coordinate.projection import LocalProjection
+from ship_manager import ShipManager
+
+# Tihanyi rév
+TIHANY_LAN = 46.88868997786068
+TIHANY_LON = 17.89171566948177
+
+CLEARANCE = 5.0
+
+
+class TestPathPlanner(unittest.TestCase):
+
+    def setUp(self):
+        self.projection = LocalProjection(TIHANY_LAN, TIHANY_LON)
+        # 2 x 2 km with a notch cut into the north side and an island in the south.
+        self.fence = PolygonalGeofence(
+            self.ring([(-1000, -1000), (1000, -1000), (1000, 1000), (100, 1000), (0, 200), (-100, 1000),
+                       (-1000, 1000)]),
+            [self.ring([(-300, -300), (300, -300), (300, -100), (-300, -100)])],
+        )
+
+    def ring(self, points):
+        return [GPSPoint(*self.projection.inverse(east, north)) for east, north in points]
+
+    def point(self, east, north, cls=GPSPoint, **kwargs):
+        return cls(*self.projection.inverse(east, north), **kwargs)
+
+    def buoy(self, east, north, radius):
+        return self.point(east, north, BuoyPosition, radius=radius)
+
+    def planar(self, route, start):
+        return [self.fence.projection.forward(*p.get_coordinates()) for p in [start, *route]]
+
+    def assert_safe(self, planner, route, start):
+        path = LineString(self.planar(route, start))
+        fence = self.fence.geometry
+        # Inside the fence, with the clearance kept from its edges and from every buoy.
+        self.assertTrue(fence.covers(path))
+        self.assertGreaterEqual(fence.boundary.distance(path), CLEARANCE - 1e-6)
+        for buoy in planner.buoys:
+            center = Point(self.fence.projection.forward(*buoy.get_coordinates()))
+            self.assertGreaterEqual(center.distance(path), buoy.radius + CLEARANCE - 1e-6)
+
+    def length(self, route, start):
+        return LineString(self.planar(route, start)).length
+
+    def test_straight_line_when_clear(self):
+        planner = PathPlanner(self.fence, clearance_m=CLEARANCE)
+        goal = self.point(800, -800, ObjectiveCoordinate, label="Mark")
+
+        route = planner.plan(self.point(-800, -800), goal)
+
+        self.assertEqual(route, [goal])
+
+    def test_around_island(self):
+        planner = PathPlanner(self.fence, clearance_m=CLEARANCE)
+        start = self.point(0, -600)
+        goal = self.point(0, 0)
+
+        route = planner.plan(start, goal)
+
+        self.assertEqual(len(route), 3)   # Around both corners of one end of the island
+        self.assert_safe(planner, route, start)
+        self.assertLess(self.length(route, start), 960)
+        for via in route:
+            self.assertIs(type(via.latitude), float)
+            self.assertIs(type(via.longitude), float)
+
+    def test_around_notch(self):
+        planner = PathPlanner(self.fence, clearance_m=CLEARANCE)
+        start = self.point(300, 800)
+        goal = self.point(-300, 800)
+
+        route = planner.plan(start, goal)
+
+        self.assert_safe(planner, route, start)
+        # Mitred clearance: the sharp tip is passed a bit wider than the clearance.
+        self.assertLess(self.length(route, start), 1400)
+
+    def test_around_buoys(self):
+        buoys = [self.buoy(-50, 500, 20), self.buoy(60, 500, 20)]
+        planner = PathPlanner(self.fence, buoys, clearance_m=CLEARANCE)
+        start = self.point(-500, 400)
+        goal = self.point(500, 600)
+
+        route = planner.plan(start, goal)
+
+        self.assertIsNotNone(route)
+        self.assert_safe(planner, route, start)
+        for via in route[:-1]:
+            self.assertEqual(via.acceptance_radius, CLEARANCE / 2)
+
+    def test_incremental_updates_match_rebuild(self):
+        rng = random.Random(3)
+        buoys = [self.buoy(rng.uniform(-900, 900), rng.uniform(-900, 900), rng.uniform(5, 20)) for _ in range(30)]
+        planner = PathPlanner(self.fence, buoys[:20], clearance_m=CLEARANCE)
+
+        for buoy in buoys[20:]:
+            planner.add_buoy(buoy)
+        for buoy in buoys[:5]:
+            planner.remove_buoy(buoy)
+        rebuilt = PathPlanner(self.fence, buoys[5:], clearance_m=CLEARANCE)
+
+        self.assertEqual((planner.node_count, planner.edge_count), (rebuilt.node_count, rebuilt.edge_count))
+        start, goal = self.point(-900, -900), self.point(900, 900)
+        route = planner.plan(start, goal)
+        self.assert_safe(planner, route, start)
+        self.assertAlmostEqual(self.length(route, start), self.length(rebuilt.plan(start, goal), start), places=6)
+
+    def test_add_and_remove_are_idempotent(self):
+        buoy = self.buoy(0, 500, 20)
+        planner = PathPlanner(self.fence, clearance_m=CLEARANCE)
+        counts = (planner.node_count, planner.edge_count)
+
+        planner.remove_buoy(buoy)
+        planner.add_buoy(buoy)
+        planner.add_buoy(buoy)
+        planner.remove_buoy(buoy)
+        planner.remove_buoy(buoy)
+
+        self.assertEqual((planner.node_count, planner.edge_count), counts)
+
+    def test_new_buoy_on_route_replans_within_a_tick(self):
+        rng = random.Random(1)
+        buoys = [self.buoy(rng.uniform(-900, 900), rng.uniform(-900, 900), rng.uniform(5, 20)) for _ in range(60)]
+        planner = PathPlanner(self.fence, buoys, clearance_m=CLEARANCE)
+        start, goal = self.point(-800, 600), self.point(-800, -600)
+        before = planner.plan(start, goal)
+
+        blocker = self.buoy(-800, 0, 30)
+        started = time.perf_counter()
+        planner.add_buoy(blocker)
+        after = planner.plan(start, goal)
+        elapsed = time.perf_counter() - started
+
+        self.assertNotEqual(self.planar(before, start), self.planar(after, start))
+        self.assert_safe(planner, after, start)
+        self.assertLess(elapsed, 0.2)  # 5 Hz control loop
+
+    def test_start_inside_clearance_escapes_first(self):
+        buoy = self.buoy(0, 500, 20)
+        planner = PathPlanner(self.fence, [buoy], clearance_m=CLEARANCE)
+        start = self.point(0, 478)   # 22 m from the center: outside the buoy, inside its clearance
+
+        route = planner.plan(start, self.point(0, -800))
+
+        escape = Point(self.fence.projection.forward(*route[0].get_coordinates()))
+        center = Point(self.fence.projection.forward(*buoy.get_coordinates()))
+        self.assertGreaterEqual(escape.distance(center), 20 + CLEARANCE)
+        self.assert_safe(planner, route[1:], route[0])
+
+    def test_no_route_between_separate_parts(self):
+        fence = PolygonalGeofence.from_parts([
+            self.ring([(-1000, -100), (-100, -100), (-100, 100), (-1000, 100)]),
+            self.ring([(100, -100), (1000, -100), (1000, 100), (100, 100)]),
+        ])
+        planner = PathPlanner(fence, clearance_m=CLEARANCE)
+
+        self.assertIsNone(planner.plan(self.point(-500, 0), self.point(500, 0)))
+
+    def test_plan_route_through_objectives(self):
+        planner = PathPlanner(self.fence, clearance_m=CLEARANCE)
+        marks = [self.point(0, -600, ObjectiveCoordinate), self.point(-300, 800, ObjectiveCoordinate)]
+        start = self.point(-800, -800)
+
+        route = planner.plan_route(start, marks)
+
+        self.assertIs(route[-1], marks[1])
+        self.assertIn(marks[0], route)
+        self.assert_safe(planner, route, start)
+
+    def test_ship_manager_follows_planned_route(self):
+        ship_manager = ShipManager()
+        position = ShipPosition()
+        position.publish(*self.projection.inverse(0, -600))
+        ship_manager.ship_state.current_position = position
+        ship_manager.path_planner = PathPlanner(self.fence, clearance_m=CLEARANCE)
+
+        try:
+            self.assertTrue(ship_manager.plan_route([self.point(0, 0, ObjectiveCoordinate)]))
+            self.assertGreater(len(ship_manager.ship_state.route), 1)
+            self.assertIs(ship_manager.get_next_objective_coo(), ship_manager.ship_state.route[0])
+        finally:
+            ship_manager.path_planner = None
+            ship_manager.ship_state.route = []
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+# tests/test_projection.py
+
+import unittest
+import numpy as np
+from gps_coordinate import CoordinateArray, GPSPoint, haversine_many
+from gps_coordinate.geofence import CircularGeofence, PolygonalGeofence
+from gps_coordinate.projection import LocalProjection, get_projection
+
+# Tihanyi rév
+TIHANY_LAN = 46.88868997786068
+TIHANY_LON = 17.89171566948177
+
+
+class TestLocalProjection(unittest.TestCase):
+
+    def setUp(self):
+        self.projection = LocalProjection(TIHANY_LAN, TIHANY_LON)
+
+    def test_roundtrip(self):
+        lat, lon = self.projection.inverse(1234.0, -567.0)
+        east, north = self.projection.forward(lat, lon)
+
+        self.assertAlmostEqual(east, 1234.0, places=6)
+        self.assertAlmostEqual(north, -567.0, places=6)
+
+    def test_matches_haversine(self):
+        lat, lon = self.projection.inverse(1000.0, 1000.0)
+        distance = GPSPoint(TIHANY_LAN, TIHANY_LON).haversine_distance(GPSPoint(lat, lon))
+
+        self.assertAlmostEqual(distance, 2 ** 0.5 * 1000.0, delta=0.5)
+
+    def test_vectorized_matches_scalar(self):
+        east = np.array([-3000.0, 0.0, 250.5, 4000.0])
+        north = np.array([100.0, 0.0, -999.0, 2500.0])
+
+        lats, lons = self.projection.inverse_many(east, north)
+        for k in range(len(east)):
+            self.assertEqual((lats[k], lons[k]), self.projection.inverse(east[k], north[k]))
+
+        east_back, north_back = self.projection.forward_many(lats, lons)
+        np.testing.assert_allclose(east_back, east, atol=1e-6)
+        np.testing.assert_allclose(north_back, north, atol=1e-6)
+
+    def test_cached(self):
+        self.assertIs(get_projection(TIHANY_LAN, TIHANY_LON), get_projection(TIHANY_LAN, TIHANY_LON))
+
+    def test_coordinate_array_to_local(self):
+        coords = CoordinateArray(*self.projection.inverse_many([10.0, 20.0], [30.0, 40.0]))
+        east, north = coords.to_local(self.projection)
+
+        np.testing.assert_allclose(east, [10.0, 20.0], atol=1e-6)
+        np.testing.assert_allclose(north, [30.0, 40.0], atol=1e-6)
+
+
+class TestPlanarGeofences(unittest.TestCase):
+
+    def setUp(self):
+        self.projection = LocalProjection(TIHANY_LAN, TIHANY_LON)
+        rng = np.random.default_rng(7)
+        self.lats, self.lons = self.projection.inverse_many(rng.uniform(-3000, 3000, 500),
+                                                            rng.uniform(-3000, 3000, 500))
+
+    def test_circle_agrees_with_haversine_away_from_the_edge(self):
+        center = GPSPoint(TIHANY_LAN, TIHANY_LON)
+        fence = CircularGeofence(center, 2000)
+
+        distances = haversine_many(center, self.lats, self.lons)
+        clear = np.abs(distances - 2000) > 2.0  # Planar error is well under 2 m at 2 km
+        np.testing.assert_array_equal(fence.contains_many(self.lats, self.lons)[clear], (distances <= 2000)[clear])
+
+    def test_large_circle_uses_haversine(self):
+        center = GPSPoint(TIHANY_LAN, TIHANY_LON)
+        fence = CircularGeofence(center, 100000)
+
+        self.assertFalse(fence._planar)
+        lats, lons = self.projection.inverse_many([0.0, 0.0], [99000.0, 101000.0])
+        np.testing.assert_array_equal(fence.contains_many(lats, lons), haversine_many(center, lats, lons) <= 100000)
+
+    def test_polygon_area_in_square_meters(self):
+        square = [GPSPoint(*self.projection.inverse(e, n)) for e, n in ((0, 0), (1000, 0), (1000, 1000), (0, 1000))]
+        fence = PolygonalGeofence(square)
+
+        self.assertAlmostEqual(fence.area_m2, 1e6, delta=1e6 * 1e-3)
+
+    def test_polygon_distance_to_boundary(self):
+        square = [GPSPoint(*self.projection.inverse(e, n)) for e, n in ((0, 0), (1000, 0), (1000, 1000), (0, 1000))]
+        fence = PolygonalGeofence(square)
+
+        inside = GPSPoint(*self.projection.inverse(100, 500))
+        self.assertAlmostEqual(fence.distance_to_boundary(inside), 100, delta=0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+# tests/test_route_progress.py
+
+import unittest
+from gps_coordinate import CoordinateArray, ObjectiveCoordinate, ShipPosition
+from gps_coordinate.projection import LocalProjection
+from ship_manager import ShipManager
+from ship_state.route_progress import RouteProgress
+from ship_state.ship_state import ShipState
+
+# Tihanyi rév
+TIHANY_LAN = 46.88868997786068
+TIHANY_LON = 17.89171566948177
+
+
+class TestRouteProgress(unittest.TestCase):
+
+    def setUp(self):
+        self.projection = LocalProjection(TIHANY_LAN, TIHANY_LON)
+        # Square course with 500 m sides: east, north, west
+        self.route = [
+            ObjectiveCoordinate(*self.projection.inverse(500, 0), "A"),
+            ObjectiveCoordinate(*self.projection.inverse(500, 500), "B", acceptance_radius=50),
+            ObjectiveCoordinate(*self.projection.inverse(0, 500), "C"),
+        ]
+        self.progress = RouteProgress(self.route, acceptance_radius=20)
+
+    def at(self, east, north):
+        return self.progress.update(*self.projection.inverse(east, north))
+
+    def test_cross_and_along_track(self):
+        self.at(0, 0)  # leg start
+        status = self.at(200, -30)  # 30 m south of an eastbound leg -> starboard
+
+        self.assertEqual(status.waypoint_index, 0)
+        self.assertAlmostEqual(status.along_track_m, 200, delta=0.5)
+        self.assertAlmostEqual(status.cross_track_m, 30, delta=0.5)
+        self.assertAlmostEqual(status.leg_remaining_m, 300, delta=0.5)
+
+        status = self.at(200, 30)
+        self.assertAlmostEqual(status.cross_track_m, -30, delta=0.5)
+
+    def test_advances_on_acceptance_radius(self):
+        self.at(0, 0)
+        self.assertFalse(self.at(470, 0).advanced)
+
+        status = self.at(490, 0)
+        self.assertTrue(status.advanced)
+        self.assertEqual(status.waypoint_index, 1)
+        self.assertIs(self.progress.active_waypoint, self.route[1])
+
+        # The new leg starts at waypoint A and goes north
+        status = self.at(510, 200)
+        self.assertAlmostEqual(status.along_track_m, 200, delta=0.5)
+        self.assertAlmostEqual(status.cross_track_m, 10, delta=0.5)
+
+    def test_per_waypoint_radius(self):
+        self.at(0, 0)
+        self.at(500, 0)
+        # B accepts within 50 m, the default would be 20 m
+        self.assertTrue(self.at(500, 460).advanced)
+
+    def test_skips_several_waypoints_in_one_update(self):
+        route = [ObjectiveCoordinate(*self.projection.inverse(5 * k, 0)) for k in range(1, 4)]
+        progress = RouteProgress(route, acceptance_radius=20)
+
+        status = progress.update(*self.projection.inverse(0, 0))
+
+        self.assertTrue(status.finished)
+        self.assertIsNone(progress.active_waypoint)
+
+    def test_finish(self):
+        self.at(0, 0)
+        self.at(500, 0)
+        self.at(500, 500)
+        status = self.at(0, 500)
+
+        self.assertTrue(status.finished)
+        self.assertTrue(self.progress.finished)
+
+    def test_coordinate_array_route(self):
+        route = CoordinateArray.from_points(self.route)
+        progress = RouteProgress(route, acceptance_radius=20)
+
+        progress.update(TIHANY_LAN, TIHANY_LON)
+        status = progress.update(*self.projection.inverse(495, 0))
+        self.assertEqual(status.waypoint_index, 1)
+
+    def test_empty_route(self):
+        self.assertTrue(RouteProgress([]).update(TIHANY_LAN, TIHANY_LON).finished)
+
+
+class TestShipManagerRoute(unittest.TestCase):
+    def test_step_follows_route(self):
+        projection = LocalProjection(TIHANY_LAN, TIHANY_LON)
+        position = ShipPosition(TIHANY_LAN, TIHANY_LON)
+
+        manager = ShipManager()
+        manager.ship_state = ShipState(position)
+        manager.ship_state.route = [ObjectiveCoordinate(*projection.inverse(100, 0), "A")]
+
+        manager.step()
+        self.assertEqual(manager.get_next_objective_coo().label, "A")
+
+        position.publish(*projection.inverse(95, 0))
+        manager.step()
+        self.assertIsNone(manager.get_next_objective_coo())
+        self.assertTrue(manager.route_status.finished)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+# tests/test_scheduler.py
+
+import unittest
+from runtime.scheduler import JitterHistogram, RateScheduler
+
+
+class FakeClock:
+    """Simulated monotonic clock: only moves when someone sleeps or does 'work'."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestRateScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = RateScheduler(clock=self.clock, sleep=self.clock.sleep)
+
+    def test_multiple_rates(self):
+        runs = {"gps": 0, "control": 0, "telemetry": 0}
+
+        def counter(name):
+            def job():
+                runs[name] += 1
+            return job
+
+        self.scheduler.add_task("gps", counter("gps"), 10)
+        self.scheduler.add_task("control", counter("control"), 5)
+        self.scheduler.add_task("telemetry", counter("telemetry"), 1)
+        self.scheduler.run(duration=2.0)
+
+        self.assertEqual(runs, {"gps": 20, "control": 10, "telemetry": 2})
+
+    def test_no_drift(self):
+        starts = []
+
+        def slow_job():
+            starts.append(self.clock.now)
+            self.clock.now += 0.05  # takes a quarter of the period
+
+        self.scheduler.add_task("control", slow_job, 5)
+        self.scheduler.run(duration=10.0)
+
+        self.assertEqual(len(starts), 50)
+        self.assertAlmostEqual(starts[-1], 9.8)
+
+    def test_deadline_miss_skips_releases(self):
+        calls = []
+
+        def overrunning_job():
+            calls.append(self.clock.now)
+            if len(calls) == 1:
+                self.clock.now += 0.45  # more than two 0.2 s periods
+
+        task = self.scheduler.add_task("control", overrunning_job, 5)
+        self.scheduler.run(duration=1.0)
+
+        self.assertEqual(task.deadline_misses, 1)
+        self.assertEqual(task.skipped_releases, 2)
+        self.assertAlmostEqual(calls[1], 0.6)
+
+    def test_exceptions_are_counted(self):
+        def broken():
+            raise RuntimeError("boom")
+
+        task = self.scheduler.add_task("broken", broken, 10)
+        self.scheduler.run(duration=0.5)
+
+        self.assertEqual(task.errors, 5)
+
+    def test_duplicate_name(self):
+        self.scheduler.add_task("control", lambda: None, 5)
+        with self.assertRaises(ValueError):
+            self.scheduler.add_task("control", lambda: None, 5)
+
+    def test_stop_from_task(self):
+        task = self.scheduler.add_task("once", self.scheduler.stop, 5)
+        self.scheduler.run()
+
+        self.assertEqual(task.runs, 1)
+
+
+class TestJitterHistogram(unittest.TestCase):
+
+    def test_buckets(self):
+        histogram = JitterHistogram(buckets=(0.001, 0.01))
+        for value in (0.0, 0.0005, 0.005, 0.5):
+            histogram.record(value)
+
+        self.assertEqual(histogram.counts, [2, 1, 1])
+        self.assertEqual(histogram.max, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,230 @@
+# tests/test_shared_memory.py
+
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import can
+import numpy as np
+
+from can_bus.device_drivers import CompassDriver, EngineDriver
+from can_bus.messages import COMPASS, ENGINE_COMMAND, default_registry
+from can_bus.shared_pool import SharedBusPool, run_can_io
+from runtime.shared_memory import SharedBlock, SharedRing
+from runtime.subsystems import POSITION_DTYPE, Subsystems
+from telemetry.records import CAN_FRAME_DTYPE
+from tests.test_can_drivers import wait_until
+from tests.test_nmea import balaton_track
+
+PAIR_DTYPE = np.dtype([("a", "<i8"), ("b", "<i8")])
+
+
+def _name(tag):
+    return f"sbtest{os.getpid()}-{tag}"
+
+
+def _write_pairs(name, count):
+    # Child process: the writer keeps the invariant b == -a.
+    block = SharedBlock(name, PAIR_DTYPE)
+    for i in range(1, count + 1):
+        block.write((i, -i))
+    block.close()
+
+
+def _produce(name, count):
+    ring = SharedRing(name, PAIR_DTYPE)
+    i = 0
+    while i < count:
+        if ring.put((i, -i)):
+            i += 1
+    ring.close()
+
+
+class FakePosition:
+
+    def __init__(self):
+        self.fixes = []
+
+    def publish(self, latitude, longitude, timestamp=None):
+        self.fixes.append((latitude, longitude, timestamp))
+
+
+class TestSharedBlock(unittest.TestCase):
+
+    def test_empty_until_written(self):
+        with SharedBlock(_name("empty"), POSITION_DTYPE, create=True) as block:
+            self.assertIsNone(block.read())
+            self.assertEqual(block.sequence, 0)
+
+    def test_attached_reader_sees_writes(self):
+        with SharedBlock(_name("attach"), POSITION_DTYPE, create=True) as writer, \
+                SharedBlock(_name("attach"), POSITION_DTYPE) as reader:
+            writer.write((46.9, 17.9, 12.5))
+            writer.write((47.0, 18.0, 13.0))
+
+            self.assertEqual(reader.sequence, 2)
+            self.assertEqual(reader.read().item(), (47.0, 18.0, 13.0))
+
+    def test_reads_are_consistent_across_processes(self):
+        context = multiprocessing.get_context("spawn")
+        with SharedBlock(_name("torn"), PAIR_DTYPE, create=True) as block:
+            writer = context.Process(target=_write_pairs, args=(block.name, 200000))
+            writer.start()
+            reads = 0
+            while writer.is_alive() or reads == 0:
+                record = block.read()
+                if record is not None:
+                    self.assertEqual(record["a"], -record["b"])
+                    reads += 1
+            writer.join()
+
+            self.assertEqual(writer.exitcode, 0)
+            self.assertEqual(block.read().item(), (200000, -200000))
+
+
+class TestSharedRing(unittest.TestCase):
+
+    def test_fifo_and_wraparound(self):
+        with SharedRing(_name("fifo"), PAIR_DTYPE, capacity=4, create=True) as ring:
+            for i in range(3):
+                ring.put((i, -i))
+            self.assertEqual(ring.get().item(), (0, 0))
+
+            for i in range(3, 5):
+                ring.put((i, -i))
+            self.assertEqual(len(ring), 4)
+            self.assertEqual(ring.drain()["a"].tolist(), [1, 2, 3, 4])
+            self.assertIsNone(ring.get())
+
+    def test_full_ring_drops_new_records(self):
+        with SharedRing(_name("full"), PAIR_DTYPE, capacity=3, create=True) as ring:
+            self.assertEqual(ring.capacity, 4)
+            results = [ring.put((i, -i)) for i in range(6)]
+
+            self.assertEqual(results, [True] * 4 + [False] * 2)
+            self.assertEqual(ring.dropped, 2)
+            self.assertEqual(ring.drain(max_records=3)["a"].tolist(), [0, 1, 2])
+            self.assertEqual(len(ring), 1)
+
+    def test_capacity_is_read_when_attaching(self):
+        with SharedRing(_name("attach"), CAN_FRAME_DTYPE, capacity=100, create=True) as owner, \
+                SharedRing(_name("attach"), CAN_FRAME_DTYPE) as attached:
+            self.assertEqual(attached.capacity, owner.capacity)
+
+    def test_cross_process_order(self):
+        context = multiprocessing.get_context("spawn")
+        count = 20000
+        with SharedRing(_name("order"), PAIR_DTYPE, capacity=64, create=True) as ring:
+            producer = context.Process(target=_produce, args=(ring.name, count))
+            producer.start()
+            received = []
+            deadline = time.monotonic() + 30
+            while len(received) < count and time.monotonic() < deadline:
+                records = ring.drain()
+                self.assertTrue(np.all(records["a"] == -records["b"]))
+                received.extend(records["a"].tolist())
+            producer.join()
+
+            self.assertEqual(received, list(range(count)))
+
+
+class TestSharedBusPool(unittest.TestCase):
+    """The I/O side runs on a thread here: virtual buses do not cross processes."""
+
+    def setUp(self):
+        self.prefix = _name("can")
+        self.pool = SharedBusPool(self.prefix, ["test_shm_vcan0", "test_shm_vcan1"])
+        self.registry = default_registry()
+        self.vcan0 = can.Bus(channel="test_shm_vcan0", interface="virtual")
+        self.vcan1 = can.Bus(channel="test_shm_vcan1", interface="virtual")
+        self.stop = threading.Event()
+        self.io = threading.Thread(target=run_can_io, args=(self.prefix, self.pool.channels, self.stop))
+        self.io.start()
+
+    def tearDown(self):
+        self.stop.set()
+        self.io.join()
+        self.pool.shutdown()
+        self.vcan0.shutdown()
+        self.vcan1.shutdown()
+
+    def test_drivers_receive_through_rings(self):
+        compass = CompassDriver(self.pool, "test_shm_vcan1")
+        seen = []
+        self.pool.add_tap("test_shm_vcan1", seen.append)
+        time.sleep(0.05)  # Let the I/O side pick up the filters
+
+        self.vcan1.send(can.Message(arbitration_id=0x7AB, data=b"\x00", is_extended_id=False))
+        self.vcan1.send(self.registry.encode(COMPASS, heading=123.45))
+
+        self.assertTrue(wait_until(lambda: self.pool.poll() or compass.heading is not None))
+        self.assertAlmostEqual(compass.heading, 123.45, places=2)
+        self.assertEqual([m.arbitration_id for m in seen], [self.registry[COMPASS].arbitration_id])
+
+    def test_actuator_commands_reach_the_bus(self):
+        engine = EngineDriver(self.pool, "test_shm_vcan0")
+
+        self.assertTrue(engine.set_throttle(42.0))
+
+        name, values = self.registry.decode(self.vcan0.recv(timeout=1.0))
+        self.assertEqual(name, ENGINE_COMMAND)
+        self.assertAlmostEqual(values["throttle"], 42.0, places=2)
+
+    def test_unknown_channel(self):
+        with self.assertRaises(ValueError):
+            CompassDriver(self.pool, "test_shm_vcan9")
+
+
+class TestSharedBusPoolShutdown(unittest.TestCase):
+
+    def test_last_frame_before_stop_reaches_the_bus(self):
+        prefix = _name("drain")
+        pool = SharedBusPool(prefix, ["test_shm_drain"])
+        vcan = can.Bus(channel="test_shm_drain", interface="virtual")
+        stop = threading.Event()
+        try:
+            engine = EngineDriver(pool, "test_shm_drain")
+            engine.stop()
+            stop.set()
+            # Stopped before it starts: whatever is sent, is sent by the final drain.
+            run_can_io(prefix, pool.channels, stop)
+
+            name, values = default_registry().decode(vcan.recv(timeout=1.0))
+            self.assertEqual(name, ENGINE_COMMAND)
+            self.assertEqual(values["enabled"], 0)
+        finally:
+            pool.shutdown()
+            vcan.shutdown()
+
+
+class TestSubsystems(unittest.TestCase):
+
+    def test_gps_process_publishes_fixes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "track.nmea")
+            with open(path, "wb") as f:
+                f.write(balaton_track(5))
+
+            subsystems = Subsystems(["test_subsystems_vcan"], gps_path=path, prefix=_name("sub"), log_level="WARNING")
+            position = FakePosition()
+            subsystems.start()
+
+            def synced():
+                subsystems.sync(position)
+                return position.fixes
+
+            try:
+                self.assertTrue(wait_until(synced, timeout=30))
+                self.assertTrue(subsystems.alive()["can-io"])
+            finally:
+                subsystems.stop()
+
+            self.assertAlmostEqual(position.fixes[-1][0], 46 + 53.321 / 60, delta=0.001)
+            self.assertFalse(any(subsystems.alive().values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@
 from copy import deepcopy as copy
 import unittest
 from gps_coordinate.base import GPSPoint
+from gps_coordinate.objective import ObjectiveCoordinate
 from ship_state.ship_state import ShipState
 
 # Szántódi rév
@@ -17,6 +18,17 @@ class TestGPSPoint(unittest.TestCase):
 
         self.assertTrue(True)
 
+    def test_construction_keeps_the_route(self):
+        state = ShipState()
+        state.route = [ObjectiveCoordinate(SZANTOD_LAN, SZANTOD_LON, "A")]
+
+        self.assertIs(ShipState(), state)
+        self.assertEqual(len(ShipState().route), 1)
+
+        position = GPSPoint(SZANTOD_LAN, SZANTOD_LON)
+        self.assertIs(ShipState(position).current_position, position)
+        self.assertEqual(len(state.route), 1)
+
 
 if __name__ == '__main__':
     unittest.main()
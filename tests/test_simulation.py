@@ -0,0 +1,102 @@
+# tests/test_simulation.py
+
+import tempfile
+import unittest
+import numpy as np
+
+from simulation import Mission, Simulation, VesselModel, random_missions, run_batch, run_mission
+from telemetry import TelemetryReader, TelemetryRecorder
+
+# Tihanyi rév
+TIHANY = (46.88868997786068, 17.89171566948177)
+
+
+class TestVesselModel(unittest.TestCase):
+
+    def test_straight_line(self):
+        vessel = VesselModel(heading=90.0)
+        vessel.command(throttle=100.0)
+        for _ in range(20 * 60):
+            vessel.step(0.05)
+
+        self.assertAlmostEqual(vessel.speed, vessel.params.max_speed, places=3)
+        self.assertAlmostEqual(vessel.north, 0.0, places=6)
+        self.assertGreater(vessel.east, 150.0)
+
+    def test_rudder_turns_starboard(self):
+        vessel = VesselModel(heading=0.0)
+        vessel.command(throttle=100.0, rudder=10.0)
+        for _ in range(100):
+            vessel.step(0.05)
+
+        self.assertGreater(vessel.heading, 0.0)
+        self.assertLess(vessel.heading, 180.0)
+
+    def test_no_turning_when_stopped(self):
+        vessel = VesselModel(heading=45.0)
+        vessel.command(rudder=30.0)
+        vessel.step(0.05)
+
+        self.assertEqual(vessel.heading, 45.0)
+
+    def test_command_limits(self):
+        vessel = VesselModel()
+        vessel.command(throttle=250.0, rudder=-90.0)
+
+        self.assertEqual((vessel.throttle, vessel.rudder), (100.0, -vessel.params.max_rudder))
+
+
+class TestSimulation(unittest.TestCase):
+
+    def setUp(self):
+        self.missions = random_missions(3, TIHANY, waypoints=2, spread_m=150.0, max_duration_s=600.0, seed=42)
+
+    def test_reaches_waypoints(self):
+        result = run_mission(self.missions[0])
+
+        self.assertTrue(result.finished)
+        self.assertEqual(result.waypoints_reached, 2)
+        self.assertGreater(result.control_ticks, 0)
+        self.assertAlmostEqual(len(result.track), result.sim_time_s * self.missions[0].gps_rate_hz, delta=1)
+
+    def test_faster_than_real_time(self):
+        result = run_mission(self.missions[0])
+
+        self.assertGreater(result.sim_time_s / result.wall_time_s, 10.0)
+
+    def test_deterministic(self):
+        first = run_mission(self.missions[1])
+        second = run_mission(self.missions[1])
+
+        self.assertEqual(first.sim_time_s, second.sim_time_s)
+        np.testing.assert_array_equal(first.track.lats, second.track.lats)
+        np.testing.assert_array_equal(first.track.lons, second.track.lons)
+
+    def test_gives_up_after_max_duration(self):
+        mission = Mission(start=TIHANY, route=((47.5, 19.0),), max_duration_s=30.0)
+        result = run_mission(mission)
+
+        self.assertFalse(result.finished)
+        self.assertAlmostEqual(result.sim_time_s, 30.0, delta=0.1)
+
+    def test_process_pool_matches_inline(self):
+        inline = run_batch(self.missions, processes=1)
+        pooled = run_batch(self.missions, processes=2)
+
+        self.assertEqual([r.seed for r in pooled], [m.seed for m in self.missions])
+        for a, b in zip(inline, pooled):
+            self.assertEqual((a.finished, a.sim_time_s, a.waypoints_reached), (b.finished, b.sim_time_s, b.waypoints_reached))
+            np.testing.assert_array_equal(a.track.lats, b.track.lats)
+
+    def test_records_telemetry(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with TelemetryRecorder(directory) as recorder:
+                result = Simulation(self.missions[2], recorder=recorder).run()
+
+            state = TelemetryReader(directory).read("state")
+            self.assertEqual(len(state), result.control_ticks)
+            self.assertTrue(np.all(np.diff(state["timestamp"]) > 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+# tests/test_startup.py
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous: about 0.2 s here, mostly loguru and numpy. Catches a heavy import creeping back in.
+IMPORT_BUDGET_S = 1.5
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def cold_import(*modules):
+    """
+    Import `modules` in a fresh interpreter. Returns (seconds, names of all loaded modules).
+    """
+    code = _PROBE.format(imports="\n".join(f"import {module}" for module in modules))
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO, capture_output=True, text=True, check=True)
+    probe = json.loads(result.stdout.splitlines()[-1])
+    return probe["elapsed"], set(probe["modules"])
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_control_path_skips_heavy_modules(self):
+        _, modules = cold_import("gps_coordinate", "gps_coordinate.estimator", "ship_manager", "runtime.metrics")
+
+        for heavy in ("shapely", "can", "runtime.shared_memory", "runtime.profiler"):
+            self.assertNotIn(heavy, modules)
+
+    def test_lazy_exports_still_resolve(self):
+        import gps_coordinate
+        import runtime
+        from gps_coordinate import geofence
+
+        self.assertEqual(gps_coordinate.PathPlanner.__name__, "PathPlanner")
+        self.assertEqual(geofence.PolygonalGeofence.__name__, "PolygonalGeofence")
+        self.assertEqual(runtime.SharedRing.__name__, "SharedRing")
+        with self.assertRaises(AttributeError):
+            gps_coordinate.NoSuchThing
+
+    def test_no_log_files_at_import(self):
+        log_dir = os.path.join(REPO, "logging")
+        before = set(os.listdir(log_dir)) if os.path.isdir(log_dir) else set()
+        cold_import("gps_coordinate", "can_bus.can_manager")
+        after = set(os.listdir(log_dir)) if os.path.isdir(log_dir) else set()
+
+        self.assertEqual(after, before)
+
+    def test_import_budget(self):
+        elapsed, _ = cold_import("main")
+
+        self.assertLess(elapsed, IMPORT_BUDGET_S)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# tests/test_telemetry.py
+
+import os
+import tempfile
+import unittest
+import can
+import numpy as np
+
+from telemetry import STATE_DTYPE, TelemetryReader, TelemetryRecorder
+from telemetry.records import HEADER_SIZE
+
+
+class TestTelemetry(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def record_states(self, count, **kwargs):
+        with TelemetryRecorder(self.directory, **kwargs) as recorder:
+            for i in range(count):
+                recorder.record_state(46.9 + i * 1e-5, 17.9, heading=i % 360, throttle=0.5, waypoint=i // 10,
+                                      timestamp=1000.0 + i * 0.05)
+
+    def test_roundtrip(self):
+        self.record_states(100)
+        state = TelemetryReader(self.directory).read("state")
+
+        self.assertEqual(len(state), 100)
+        np.testing.assert_allclose(state["latitude"], 46.9 + np.arange(100) * 1e-5)
+        np.testing.assert_array_equal(state["waypoint"], np.arange(100) // 10)
+        self.assertTrue(np.isnan(state["rudder"]).all())
+
+    def test_fixed_width_records(self):
+        self.record_states(10)
+        size = os.path.getsize(os.path.join(self.directory, "state-00000.tlm"))
+
+        self.assertEqual(size, HEADER_SIZE + 10 * STATE_DTYPE.itemsize)
+
+    def test_memory_mapped(self):
+        self.record_states(10)
+        state = TelemetryReader(self.directory).read("state")
+
+        self.assertIsInstance(state, np.memmap)
+        self.assertTrue(np.shares_memory(state["longitude"], state))
+
+    def test_chunk_rollover(self):
+        self.record_states(25, chunk_bytes=HEADER_SIZE + 10 * STATE_DTYPE.itemsize, buffer_records=4)
+        reader = TelemetryReader(self.directory)
+
+        self.assertEqual([len(chunk) for chunk in reader.chunks("state")], [10, 10, 5])
+        self.assertEqual(reader.count("state"), 25)
+        np.testing.assert_array_equal(reader.read("state")["heading"], np.arange(25))
+
+    def test_new_session_appends(self):
+        self.record_states(5)
+        self.record_states(5)
+
+        self.assertEqual(len(TelemetryReader(self.directory).chunks("state")), 2)
+
+    def test_truncated_record_is_ignored(self):
+        self.record_states(10)
+        with open(os.path.join(self.directory, "state-00000.tlm"), "ab") as file:
+            file.write(b"\x00" * (STATE_DTYPE.itemsize // 2))  # crash mid-write
+
+        self.assertEqual(TelemetryReader(self.directory).count("state"), 10)
+
+    def test_between(self):
+        self.record_states(25, chunk_bytes=HEADER_SIZE + 10 * STATE_DTYPE.itemsize)
+        reader = TelemetryReader(self.directory)
+
+        parts = list(reader.between("state", 1000.4, 1000.6))
+        np.testing.assert_array_equal(np.concatenate(parts)["heading"], [8, 9, 10, 11])
+
+    def test_can_frames(self):
+        frames = [
+            can.Message(timestamp=1.0, arbitration_id=0x101, data=b"\x01\x02\x03", is_extended_id=False),
+            can.Message(timestamp=2.0, arbitration_id=0x1ABCDEF, data=bytes(range(8)), is_extended_id=True),
+        ]
+        with TelemetryRecorder(self.directory) as recorder:
+            for frame in frames:
+                recorder.record_can(frame)
+
+        replayed = list(TelemetryReader(self.directory).can_messages())
+        self.assertEqual(len(replayed), 2)
+        for original, frame in zip(frames, replayed):
+            self.assertTrue(frame.equals(original, timestamp_delta=None))
+            self.assertEqual(frame.timestamp, original.timestamp)
+
+    def test_not_a_chunk(self):
+        with open(os.path.join(self.directory, "state-00000.tlm"), "wb") as file:
+            file.write(b"hello, world" * 10)
+
+        with self.assertRaises(ValueError):
+            TelemetryReader(self.directory)
+
+    def test_closed(self):
+        recorder = TelemetryRecorder(self.directory)
+        recorder.close()
+
+        with self.assertRaises(ValueError):
+            recorder.record_state(46.9, 17.9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+# tests/test_tx_scheduler.py
+
+import unittest
+
+import can
+
+from can_bus.tx_scheduler import TxPolicy, TxScheduler
+from tests.test_scheduler import FakeClock
+
+
+def frame(arbitration_id, *data):
+    return can.Message(arbitration_id=arbitration_id, data=bytes(data), is_extended_id=False)
+
+
+class TestTxScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sent = []
+        self.accept = True
+        self.scheduler = TxScheduler(self.send, default_policy=TxPolicy(heartbeat=1.0), clock=self.clock)
+
+    def send(self, message):
+        if self.accept:
+            self.sent.append((message.arbitration_id, bytes(message.data)))
+        return self.accept
+
+    def test_unchanged_frames_are_suppressed_until_heartbeat(self):
+        for _ in range(5):
+            self.scheduler.submit(frame(0x101, 1))
+            self.clock.sleep(0.2)
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(self.scheduler.suppressed, 4)
+
+        # Now 1.0 s after the first send
+        self.assertTrue(self.scheduler.submit(frame(0x101, 1)))
+        self.assertEqual(len(self.sent), 2)
+
+    def test_changes_go_out_immediately(self):
+        self.assertTrue(self.scheduler.submit(frame(0x101, 1)))
+        self.assertTrue(self.scheduler.submit(frame(0x101, 2)))
+        self.assertTrue(self.scheduler.submit(frame(0x102, 2)))
+
+        self.assertEqual(self.sent, [(0x101, b"\x01"), (0x101, b"\x02"), (0x102, b"\x02")])
+
+    def test_heartbeat_policies(self):
+        self.scheduler.set_policy(0x101, TxPolicy(heartbeat=None))
+        self.scheduler.set_policy(0x102, TxPolicy(heartbeat=0))
+        for _ in range(3):
+            self.scheduler.submit(frame(0x101, 1))
+            self.scheduler.submit(frame(0x102, 1))
+            self.clock.sleep(10.0)
+
+        self.assertEqual([arbitration_id for arbitration_id, _ in self.sent], [0x101, 0x102, 0x102, 0x102])
+
+    def test_min_interval_keeps_latest(self):
+        self.scheduler.set_policy(0x101, TxPolicy(min_interval=0.1))
+        self.scheduler.submit(frame(0x101, 1))
+        self.clock.sleep(0.02)
+        self.assertFalse(self.scheduler.submit(frame(0x101, 2)))
+        self.assertFalse(self.scheduler.submit(frame(0x101, 3)))
+
+        self.assertEqual(self.scheduler.flush(), 0)
+        self.clock.sleep(0.08)
+        self.assertEqual(self.scheduler.flush(), 1)
+
+        self.assertEqual(self.sent, [(0x101, b"\x01"), (0x101, b"\x03")])
+        self.assertEqual(self.scheduler.deferred, 1)
+
+    def test_reverting_to_sent_value_cancels_pending(self):
+        self.scheduler.set_policy(0x101, TxPolicy(min_interval=0.1))
+        self.scheduler.submit(frame(0x101, 1))
+        self.scheduler.submit(frame(0x101, 2))
+        self.scheduler.submit(frame(0x101, 1))
+        self.clock.sleep(0.2)
+
+        self.assertEqual(self.scheduler.flush(), 0)
+        self.assertEqual(len(self.sent), 1)
+
+    def test_flush_by_priority_within_budget(self):
+        for arbitration_id, priority in ((0x300, 5), (0x200, 0), (0x100, 9)):
+            self.scheduler.set_policy(arbitration_id, TxPolicy(min_interval=0.1, priority=priority))
+            self.scheduler.submit(frame(arbitration_id, 1))
+        self.sent.clear()
+        for arbitration_id in (0x300, 0x200, 0x100):
+            self.scheduler.submit(frame(arbitration_id, 2))
+        self.clock.sleep(0.1)
+
+        self.assertEqual(self.scheduler.flush(max_frames=2), 2)
+        self.assertEqual([arbitration_id for arbitration_id, _ in self.sent], [0x200, 0x300])
+        self.assertEqual(self.scheduler.pending, 1)
+
+    def test_refused_frame_is_not_remembered(self):
+        self.accept = False
+        self.assertFalse(self.scheduler.submit(frame(0x101, 1)))
+        self.accept = True
+        self.assertTrue(self.scheduler.submit(frame(0x101, 1)))
+
+    def test_forget(self):
+        self.scheduler.submit(frame(0x101, 1))
+        self.scheduler.forget(0x101)
+
+        self.assertTrue(self.scheduler.submit(frame(0x101, 1)))
+
+
+if __name__ == '__main__':
+    unittest.main()